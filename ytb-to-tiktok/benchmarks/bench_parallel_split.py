@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark du découpage parallèle (--split-mode parallel)
+contre le ré-encodage en un seul processus.
+
+Génère une source synthétique (testsrc2 + sine) en local, puis chronomètre
+split_video_ffmpeg en mode reencode et en mode parallel. Aucun accès réseau.
+
+    python benchmarks/bench_parallel_split.py --size 1280x720 --duration 300 \
+        --segment-seconds 30
+"""
+
+import argparse
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ytb_to_tiktok.cli import ensure_ffmpeg_in_path, split_video_ffmpeg  # noqa: E402
+
+
+def make_source(ffmpeg_path: str, path: Path, size: str, duration: int) -> None:
+    """Génère une vidéo H.264/AAC déterministe."""
+    cmd = [
+        ffmpeg_path,
+        "-y",
+        "-f",
+        "lavfi",
+        "-i",
+        f"testsrc2=size={size}:rate=30:duration={duration}",
+        "-f",
+        "lavfi",
+        "-i",
+        f"sine=frequency=440:duration={duration}",
+        "-c:v",
+        "libx264",
+        "-preset",
+        "ultrafast",
+        "-c:a",
+        "aac",
+        "-shortest",
+        str(path),
+    ]
+    proc = subprocess.run(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Génération de la source impossible:\n{proc.stderr}")
+
+
+def time_split(
+    source: Path, out_dir: Path, segment_seconds: int, **kwargs
+) -> tuple[float, int]:
+    """Chronomètre un découpage; renvoie (secondes, nombre de segments)."""
+    shutil.rmtree(out_dir, ignore_errors=True)
+    start = time.perf_counter()
+    parts = split_video_ffmpeg(
+        source, out_dir, segment_seconds=segment_seconds, **kwargs
+    )
+    return time.perf_counter() - start, len(parts)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark reencode vs parallel")
+    parser.add_argument(
+        "--size", default="1280x720", help="Résolution de la source synthétique"
+    )
+    parser.add_argument(
+        "--duration", type=int, default=180, help="Durée de la source (secondes)"
+    )
+    parser.add_argument(
+        "--segment-seconds", type=int, default=30, help="Durée des segments"
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=None, help="Encodages simultanés (défaut: auto)"
+    )
+    parser.add_argument(
+        "--threads", type=int, default=None, help="Threads par encodage (défaut: auto)"
+    )
+    args = parser.parse_args()
+
+    ffmpeg_path, _ = ensure_ffmpeg_in_path()
+    with tempfile.TemporaryDirectory(prefix="ytb2tt_bench_") as tmp:
+        tmp_dir = Path(tmp)
+        source = tmp_dir / "source.mp4"
+        print(f"Génération de la source {args.size}, {args.duration}s...")
+        make_source(ffmpeg_path, source, args.size, args.duration)
+
+        single_s, single_n = time_split(
+            source, tmp_dir / "reencode", args.segment_seconds
+        )
+        print(f"reencode : {single_s:7.2f}s ({single_n} segments)")
+
+        parallel_s, parallel_n = time_split(
+            source,
+            tmp_dir / "parallel",
+            args.segment_seconds,
+            mode="parallel",
+            jobs=args.jobs,
+            threads_per_job=args.threads,
+        )
+        print(f"parallel : {parallel_s:7.2f}s ({parallel_n} segments)")
+
+        if single_n != parallel_n:
+            print("✗ Nombre de segments différent entre les deux modes")
+            return 1
+        print(f"Accélération: x{single_s / parallel_s:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
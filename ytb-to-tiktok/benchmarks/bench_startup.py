@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Benchmark du démarrage: coût des imports (-X importtime) des chemins rapides de la CLI.
+
+Chaque scénario (import du module cli, --version, --plan) est lancé plusieurs fois
+dans un interpréteur neuf; on garde la médiane du temps total et du temps d'import
+par paquet. Le résultat est comparé à une référence JSON: le script échoue (code 1)
+si un paquet lourd (rich, yt_dlp, PIL, imageio_ffmpeg...) est importé, si un nouveau
+paquet tiers apparaît ou si le temps d'import dépasse la référence de plus de
+--tolerance. Aucun accès réseau.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 20 --update-baseline
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "startup.json"
+
+# Paquets qui ne doivent se charger qu'à l'étape qui s'en sert
+HEAVY_PACKAGES = (
+    "rich",
+    "yt_dlp",
+    "PIL",
+    "imageio_ffmpeg",
+    "imageio",
+    "numpy",
+    "tkinter",
+)
+
+
+def scenarios(tmp_dir: Path) -> dict[str, list[str]]:
+    url = "https://www.youtube.com/watch?v=XXXXXXXXXXX"
+    return {
+        "import": ["-c", "import ytb_to_tiktok.cli"],
+        "version": ["-m", "ytb_to_tiktok", "--version"],
+        "plan": ["-m", "ytb_to_tiktok", url, "--plan", "--label", "-o", str(tmp_dir)],
+    }
+
+
+def parse_importtime(stderr: str) -> dict[str, int]:
+    """Temps d'import propre (µs) cumulé par paquet de premier niveau."""
+    packages: dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        package = fields[2].strip().split(".")[0]
+        packages[package] = packages.get(package, 0) + int(fields[0])
+    return packages
+
+
+def measure(args: list[str], runs: int) -> dict:
+    """Médianes de `runs` lancements (ms): total, imports et détail par paquet."""
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    walls: list[float] = []
+    totals: list[float] = []
+    per_package: dict[str, list[float]] = {}
+    # Premier lancement non compté: écrit les .pyc
+    for run in range(runs + 1):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", *args],
+            cwd=ROOT,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        wall = (time.perf_counter() - start) * 1000
+        if proc.returncode != 0:
+            tail = "\n".join(
+                line
+                for line in proc.stderr.splitlines()
+                if not line.startswith("import time:")
+            )
+            raise RuntimeError(f"Échec de {' '.join(args)}:\n{tail}")
+        if run == 0:
+            continue
+        packages = parse_importtime(proc.stderr)
+        walls.append(wall)
+        totals.append(sum(packages.values()) / 1000)
+        for package, micros in packages.items():
+            per_package.setdefault(package, []).append(micros / 1000)
+    return {
+        "wall_ms": round(statistics.median(walls), 2),
+        "import_ms": round(statistics.median(totals), 2),
+        "packages": {
+            package: round(statistics.median(values + [0.0] * (runs - len(values))), 3)
+            for package, values in sorted(per_package.items())
+        },
+    }
+
+
+def compare(
+    name: str, result: dict, baseline: dict, tolerance: float, slack_ms: float
+) -> list[str]:
+    """Régressions d'un scénario par rapport à la référence (liste vide si aucune)."""
+    failures: list[str] = []
+    heavy = [package for package in HEAVY_PACKAGES if package in result["packages"]]
+    if heavy:
+        failures.append(f"{name}: paquets lourds importés: {', '.join(heavy)}")
+    reference = baseline.get(name)
+    if reference is None:
+        return failures
+    stdlib = getattr(sys, "stdlib_module_names", frozenset())
+    new = [
+        package
+        for package in result["packages"]
+        if package not in reference["packages"]
+        and package not in stdlib
+        and not package.startswith("_")
+    ]
+    if new:
+        failures.append(f"{name}: nouveaux paquets importés: {', '.join(new)}")
+    limit = reference["import_ms"] * (1 + tolerance) + slack_ms
+    if result["import_ms"] > limit:
+        failures.append(
+            f"{name}: imports {result['import_ms']:.1f} ms > {limit:.1f} ms "
+            f"(référence {reference['import_ms']:.1f} ms)"
+        )
+    return failures
+
+
+def print_deltas(name: str, result: dict, reference: Optional[dict], top: int) -> None:
+    base_import = f" (référence {reference['import_ms']:.1f} ms)" if reference else ""
+    print(
+        f"{name:8s}: {result['wall_ms']:7.1f} ms au total, "
+        f"imports {result['import_ms']:6.1f} ms{base_import}"
+    )
+    packages = result["packages"]
+    previous = reference["packages"] if reference else {}
+    names = set(packages) | set(previous)
+    deltas = sorted(
+        names,
+        key=lambda p: abs(packages.get(p, 0.0) - previous.get(p, 0.0)),
+        reverse=True,
+    )
+    for package in (
+        deltas[:top]
+        if reference
+        else sorted(packages, key=packages.get, reverse=True)[:top]
+    ):
+        now = packages.get(package, 0.0)
+        if reference:
+            before = previous.get(package, 0.0)
+            print(f"    {package:24s} {now:7.2f} ms  ({now - before:+.2f} ms)")
+        else:
+            print(f"    {package:24s} {now:7.2f} ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark du démarrage (-X importtime)"
+    )
+    parser.add_argument(
+        "--runs", type=int, default=10, help="Lancements par scénario (médiane)"
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=DEFAULT_BASELINE,
+        help="Fichier JSON de référence",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Enregistrer les mesures comme référence",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.3,
+        help="Hausse relative tolérée du temps d'import",
+    )
+    parser.add_argument(
+        "--slack-ms",
+        type=float,
+        default=5.0,
+        help="Marge absolue (bruit de mesure), en ms",
+    )
+    parser.add_argument(
+        "--top", type=int, default=8, help="Paquets affichés par scénario"
+    )
+    args = parser.parse_args()
+
+    try:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        baseline = {}
+
+    results: dict[str, dict] = {}
+    failures: list[str] = []
+    with tempfile.TemporaryDirectory(prefix="ytb2tt_startup_") as tmp:
+        for name, cmd in scenarios(Path(tmp)).items():
+            results[name] = measure(cmd, args.runs)
+            print_deltas(name, results[name], baseline.get(name), args.top)
+            failures += compare(
+                name, results[name], baseline, args.tolerance, args.slack_ms
+            )
+
+    if args.update_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(
+            json.dumps(results, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+        )
+        print(f"Référence enregistrée: {args.baseline}")
+    if failures:
+        print("\nRégressions:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,506 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks hors ligne sur des sources synthétiques.
+
+Génère des vidéos déterministes (lavfi testsrc2 + sine) à plusieurs résolutions et
+durées, puis chronomètre chaque étape: sonde, images clés, changements de plan,
+silences, chaque mode de découpage, label drawtext et Pillow, et le pipeline complet
+(main()) sur le fichier local (lu sur place) et servi par un serveur HTTP local
+(127.0.0.1). Pour chaque étape: durée, temps CPU (Python + processus ffmpeg), mémoire
+max des processus ffmpeg et octets produits. Les résultats sont comparés à une référence
+JSON; le script échoue (code 1) en cas de régression. Aucun accès réseau.
+
+    python benchmarks/bench_suite.py
+    python benchmarks/bench_suite.py --sizes 1280x720,1920x1080 --durations 60,300 \
+        --repeat 3
+    python benchmarks/bench_suite.py --update-baseline
+    python benchmarks/bench_suite.py --compare ancien.json nouveau.json
+"""
+
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ytb_to_tiktok import __version__  # noqa: E402
+from ytb_to_tiktok.cache import set_cache_dir  # noqa: E402
+from ytb_to_tiktok.cli import (  # noqa: E402
+    SPLIT_MODES,
+    _label_fontfile,
+    ensure_ffmpeg_in_path,
+    main as cli_main,
+    overlay_label_with_pillow,
+    overlay_text_on_video,
+    split_video_ffmpeg,
+)
+from ytb_to_tiktok.media import (  # noqa: E402
+    probe_keyframe_times,
+    probe_media_info,
+    probe_scene_changes,
+    probe_silences,
+)
+from ytb_to_tiktok.runner import ProgressEvent, progress_listener  # noqa: E402
+from ytb_to_tiktok.toolchain import get_toolchain  # noqa: E402
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "suite.json"
+
+# Métriques comparées à la référence; les octets produits signalent aussi une baisse
+TIMED_METRICS = ("wall_s", "cpu_s")
+
+
+def make_source(ffmpeg_path: str, path: Path, size: str, duration: int) -> None:
+    """Génère une vidéo H.264/AAC déterministe (un seul thread d'encodage).
+
+    GOP fixe de 3 s: les coupes toutes les 20 s tombent entre deux images clés, comme
+    sur une vraie source, et le mode smart doit ré-encoder le début de chaque segment.
+    """
+    cmd = [
+        ffmpeg_path,
+        "-y",
+        "-v",
+        "error",
+        "-f",
+        "lavfi",
+        "-i",
+        f"testsrc2=size={size}:rate=30:duration={duration}",
+        "-f",
+        "lavfi",
+        "-i",
+        f"sine=frequency=440:duration={duration}",
+        "-c:v",
+        "libx264",
+        "-preset",
+        "ultrafast",
+        "-threads",
+        "1",
+        "-g",
+        "90",
+        "-pix_fmt",
+        "yuv420p",
+        "-c:a",
+        "aac",
+        "-shortest",
+        "-fflags",
+        "+bitexact",
+        str(path),
+    ]
+    proc = subprocess.run(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Génération de la source impossible:\n{proc.stderr}")
+
+
+def _cpu_seconds() -> float:
+    """Temps CPU du processus et de ses enfants terminés (ffmpeg, ffprobe)."""
+    if resource is None:
+        return time.process_time()
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def measure(run: Callable[[], list[Path]]) -> dict:
+    """Exécute une étape et renvoie ses métriques.
+
+    Les sorties mesurées sont les chemins renvoyés par `run`.
+    """
+    peaks: list[int] = []
+
+    def on_progress(event: ProgressEvent) -> None:
+        if event.done and event.usage is not None and event.usage.max_rss is not None:
+            peaks.append(event.usage.max_rss)
+
+    cpu_before = _cpu_seconds()
+    start = time.perf_counter()
+    # La console rich écrit sur sys.stdout au moment de l'affichage:
+    # la sortie est mise de côté
+    with progress_listener(on_progress), contextlib.redirect_stdout(io.StringIO()):
+        outputs = run()
+    wall = time.perf_counter() - start
+    return {
+        "wall_s": round(wall, 3),
+        "cpu_s": round(_cpu_seconds() - cpu_before, 3),
+        "peak_rss": max(peaks) if peaks else None,
+        "output_bytes": sum(path.stat().st_size for path in outputs if path.is_file()),
+    }
+
+
+def median_metrics(samples: list[dict]) -> dict:
+    """Médiane des durées, maximum de la mémoire, octets du dernier passage."""
+    peaks = [sample["peak_rss"] for sample in samples if sample["peak_rss"] is not None]
+    return {
+        "wall_s": round(statistics.median(sample["wall_s"] for sample in samples), 3),
+        "cpu_s": round(statistics.median(sample["cpu_s"] for sample in samples), 3),
+        "peak_rss": max(peaks) if peaks else None,
+        "output_bytes": samples[-1]["output_bytes"],
+        "runs": len(samples),
+    }
+
+
+@contextlib.contextmanager
+def serve_directory(directory: Path):
+    """Serveur HTTP local (thread): la source du pipeline complet."""
+    handler = functools.partial(_QuietHandler, directory=str(directory))
+    server = _QuietServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+class _QuietServer(ThreadingHTTPServer):
+    def handle_error(self, request: object, client_address: object) -> None:
+        # yt-dlp ferme parfois la connexion avant la fin d'une réponse: sans intérêt ici
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def source_stages(
+    ffmpeg_path: str,
+    ffprobe_path: Optional[str],
+    source: Path,
+    work: Path,
+    base_url: str,
+    segment_seconds: int,
+) -> dict[str, Callable[[], list[Path]]]:
+    """Étapes chronométrées pour une source (chaque appel part d'un dossier vide)."""
+
+    def fresh(name: str) -> Path:
+        out = work / name
+        shutil.rmtree(out, ignore_errors=True)
+        out.mkdir(parents=True)
+        return out
+
+    def split(mode: str) -> Callable[[], list[Path]]:
+        return lambda: split_video_ffmpeg(
+            source, fresh(f"split-{mode}"), segment_seconds=segment_seconds, mode=mode
+        )
+
+    # Segment d'entrée des labels:
+    # premier segment d'un découpage copy (hors chronométrage)
+    label_input: list[Path] = []
+
+    def first_segment() -> Path:
+        if not label_input:
+            label_input.extend(
+                split_video_ffmpeg(
+                    source,
+                    fresh("label-input"),
+                    segment_seconds=segment_seconds,
+                    mode="copy",
+                )[:1]
+            )
+        return label_input[0]
+
+    def label_drawtext() -> list[Path]:
+        segment = first_segment()
+        output = fresh("label-drawtext") / segment.name
+        overlay_text_on_video(segment, output, "Partie 1")
+        return [output]
+
+    def label_pillow() -> list[Path]:
+        segment = first_segment()
+        output = fresh("label-pillow") / segment.name
+        overlay_label_with_pillow(segment, output, "Partie 1")
+        return [output]
+
+    def end_to_end(name: str, target: str) -> Callable[[], list[Path]]:
+        return lambda: run_main(name, target)
+
+    def run_main(name: str, target: str) -> list[Path]:
+        out = fresh(name)
+        argv = [
+            target,
+            "-o",
+            str(out),
+            "--segment-seconds",
+            str(segment_seconds),
+            "--label",
+            "--no-resume",
+            "--no-download-cache",
+            "--cache-dir",
+            str(fresh(f"{name}-cache")),
+        ]
+        try:
+            code = cli_main(argv)
+        finally:
+            # main() a pointé les caches sur <étape>-cache: revenir à ceux de la suite
+            set_cache_dir(work.parent / "cache")
+        if code != 0:
+            raise RuntimeError(f"main() a renvoyé {code}")
+        return sorted((out / "segments").glob("*.mp4"))
+
+    stages: dict[str, Callable[[], list[Path]]] = {
+        "probe": lambda: (probe_media_info(source, ffmpeg_path, ffprobe_path), [])[1],
+        "keyframes": lambda: (
+            probe_keyframe_times(source, ffmpeg_path, ffprobe_path),
+            [],
+        )[1],
+        "scenes": lambda: (probe_scene_changes(source, ffmpeg_path), [])[1],
+        "silences": lambda: (probe_silences(source, ffmpeg_path), [])[1],
+    }
+    for mode in SPLIT_MODES:
+        stages[f"split-{mode}"] = split(mode)
+    if get_toolchain().drawtext_usable(_label_fontfile()):
+        stages["label-drawtext"] = label_drawtext
+    else:
+        print("label-drawtext ignoré: ce ffmpeg n'a pas drawtext (ou aucune police)")
+    stages["label-pillow"] = label_pillow
+    stages["e2e"] = end_to_end("e2e", f"{base_url}/{source.name}")
+    stages["e2e-local"] = end_to_end("e2e-local", str(source))
+    return stages
+
+
+def run_suite(args: argparse.Namespace, work: Path) -> dict:
+    ffmpeg_path, ffprobe_path = ensure_ffmpeg_in_path()
+    sources_dir = args.sources_dir or work / "sources"
+    sources_dir.mkdir(parents=True, exist_ok=True)
+    # Caches (sonde, toolchain...) isolés de ceux de l'utilisateur
+    set_cache_dir(work / "cache")
+    wanted = set(args.stages.split(",")) if args.stages else None
+
+    results: dict[str, dict] = {}
+    with serve_directory(sources_dir) as base_url:
+        for size in args.sizes.split(","):
+            for duration in (int(value) for value in args.durations.split(",")):
+                source_id = f"{size}_{duration}s"
+                source = sources_dir / f"src_{source_id}.mp4"
+                if not source.exists():
+                    print(f"Génération de la source {source_id}...")
+                    make_source(ffmpeg_path, source, size, duration)
+                stages = source_stages(
+                    ffmpeg_path,
+                    ffprobe_path,
+                    source,
+                    work / source_id,
+                    base_url,
+                    args.segment_seconds,
+                )
+                for name, stage in stages.items():
+                    if wanted is not None and name not in wanted:
+                        continue
+                    samples = [measure(stage) for _ in range(args.repeat)]
+                    key = f"{source_id}/{name}"
+                    results[key] = median_metrics(samples)
+                    print(format_line(key, results[key]))
+                shutil.rmtree(work / source_id, ignore_errors=True)
+
+    return {
+        "meta": {
+            "version": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "ffmpeg": ffmpeg_version(ffmpeg_path),
+            "segment_seconds": args.segment_seconds,
+            "repeat": args.repeat,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "stages": results,
+    }
+
+
+def ffmpeg_version(ffmpeg_path: str) -> str:
+    proc = subprocess.run(
+        [ffmpeg_path, "-version"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    return proc.stdout.splitlines()[0] if proc.stdout else "?"
+
+
+def format_line(key: str, metrics: dict) -> str:
+    rss = (
+        f"{metrics['peak_rss'] / 1024 ** 2:7.1f} Mo"
+        if metrics["peak_rss"]
+        else "      - "
+    )
+    return (
+        f"{key:32s} {metrics['wall_s']:8.3f} s  cpu {metrics['cpu_s']:8.3f} s  "
+        f"rss {rss}  {metrics['output_bytes'] / 1024 ** 2:8.2f} Mo écrits"
+    )
+
+
+def compare(
+    baseline: dict, current: dict, tolerance: float, slack_s: float
+) -> list[str]:
+    """Régressions de `current` par rapport à `baseline` (liste vide si aucune)."""
+    failures: list[str] = []
+    cpu_count = baseline.get("meta", {}).get("cpu_count")
+    if cpu_count != current.get("meta", {}).get("cpu_count"):
+        print(
+            "Attention: référence mesurée sur une autre machine"
+            " (nombre de cœurs différent)"
+        )
+    reference = baseline.get("stages", {})
+    for key, metrics in current.get("stages", {}).items():
+        before = reference.get(key)
+        if before is None:
+            continue
+        deltas = []
+        for metric in TIMED_METRICS:
+            limit = before[metric] * (1 + tolerance) + slack_s
+            delta = metrics[metric] - before[metric]
+            deltas.append(f"{metric} {delta:+.3f}")
+            if metrics[metric] > limit:
+                failures.append(
+                    f"{key}: {metric} {metrics[metric]:.3f} > {limit:.3f} "
+                    f"(référence {before[metric]:.3f})"
+                )
+        if (
+            before.get("peak_rss")
+            and metrics.get("peak_rss")
+            and metrics["peak_rss"] > before["peak_rss"] * (1 + tolerance)
+        ):
+            failures.append(
+                f"{key}: mémoire max {metrics['peak_rss'] / 1024 ** 2:.1f} Mo "
+                f"(référence {before['peak_rss'] / 1024 ** 2:.1f} Mo)"
+            )
+        if (
+            before["output_bytes"]
+            and abs(metrics["output_bytes"] - before["output_bytes"])
+            > before["output_bytes"] * tolerance
+        ):
+            failures.append(
+                f"{key}: octets produits {metrics['output_bytes']} "
+                f"(référence {before['output_bytes']})"
+            )
+        print(f"  {key:32s} {', '.join(deltas)}")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks hors ligne sur sources synthétiques"
+    )
+    parser.add_argument(
+        "--sizes",
+        default="640x360,1280x720",
+        help="Résolutions des sources (liste séparée par des virgules)",
+    )
+    parser.add_argument(
+        "--durations", default="60", help="Durées des sources en secondes (liste)"
+    )
+    parser.add_argument(
+        "--segment-seconds", type=int, default=20, help="Durée des segments"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="Répétitions par étape (médiane)"
+    )
+    parser.add_argument(
+        "--stages",
+        default=None,
+        help="N'exécuter que ces étapes (ex: probe,split-smart,e2e)",
+    )
+    parser.add_argument(
+        "--sources-dir",
+        type=Path,
+        default=None,
+        help="Dossier où garder les sources générées",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=DEFAULT_BASELINE,
+        help="Fichier JSON de référence",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Enregistrer les mesures comme référence",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Enregistrer les mesures dans ce fichier JSON",
+    )
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        type=Path,
+        metavar=("REFERENCE", "MESURES"),
+        help="Comparer deux fichiers sans rien lancer",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Hausse relative tolérée (durée, CPU, mémoire, octets)",
+    )
+    parser.add_argument(
+        "--slack-s",
+        type=float,
+        default=0.1,
+        help="Marge absolue sur les durées (bruit de mesure)",
+    )
+    args = parser.parse_args()
+
+    if args.compare:
+        baseline, current = (
+            json.loads(path.read_text(encoding="utf-8")) for path in args.compare
+        )
+    else:
+        with tempfile.TemporaryDirectory(prefix="ytb2tt_suite_") as tmp:
+            current = run_suite(args, Path(tmp))
+        try:
+            baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            baseline = {}
+        if args.output is not None:
+            args.output.write_text(
+                json.dumps(current, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+            )
+        if args.update_baseline:
+            args.baseline.parent.mkdir(parents=True, exist_ok=True)
+            args.baseline.write_text(
+                json.dumps(current, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+            )
+            print(f"Référence enregistrée: {args.baseline}")
+            return 0
+
+    if not baseline:
+        print("Aucune référence: rien à comparer (--update-baseline pour en créer une)")
+        return 0
+    print("\nÉcarts par rapport à la référence:")
+    failures = compare(baseline, current, args.tolerance, args.slack_s)
+    if failures:
+        print("\nRégressions:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("Aucune régression")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
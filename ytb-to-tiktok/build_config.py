@@ -20,7 +20,9 @@ APP_LICENSE = "MIT"
 PYINSTALLER_CONFIG = {
     "script": "gui.py",
     "name": APP_NAME,
-    "onefile": True,
+    # onedir: un exécutable onefile se décompresse dans un dossier temporaire
+    # à chaque lancement
+    "onefile": False,
     "console": False,
     "icon": "icon.ico",
     "version_file": "version.txt",
@@ -29,11 +31,12 @@ PYINSTALLER_CONFIG = {
     "specpath": ".",
     "clean": True,
     "noconfirm": True,
-    "upx": True,
+    # UPX ralentit chaque démarrage (DLL décompressées au chargement)
+    "upx": False,
     "upx_exclude": [],
     "debug": False,
     "strip": False,
-    "noupx": False,
+    "noupx": True,
     "uac_admin": False,
     "uac_uiaccess": False,
     "win_private_assemblies": False,
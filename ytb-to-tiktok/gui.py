@@ -15,7 +15,7 @@ import sys
 
 # Ajouter le répertoire parent au path pour importer ytb_to_tiktok
 sys.path.insert(0, str(Path(__file__).parent))
-from ytb_to_tiktok.cli import main as cli_main, parse_args
+from ytb_to_tiktok.cancel import CancelToken  # noqa: E402
 
 
 class ModernTkinterApp:
@@ -154,11 +154,12 @@ class ModernTkinterApp:
         
         row = 0
         
-        # URL YouTube
-        ttk.Label(parent, text="URL YouTube:", style='Heading.TLabel').grid(
-            row=row, column=0, sticky="w", padx=(0, 10), pady=10)
-        
-        self.url_entry = ttk.Entry(parent, font=('Segoe UI', 10))
+        # URL YouTube (ou fichier vidéo local)
+        ttk.Label(parent, text="URL ou fichier:", style="Heading.TLabel").grid(
+            row=row, column=0, sticky="w", padx=(0, 10), pady=10
+        )
+
+        self.url_entry = ttk.Entry(parent, font=("Segoe UI", 10))
         self.url_entry.grid(row=row, column=1, sticky="ew", padx=(0, 10), pady=10)
         
         row += 1
@@ -445,7 +446,9 @@ class ModernTkinterApp:
         # Validation des champs obligatoires
         url = self.url_entry.get().strip()
         if not url:
-            messagebox.showerror("Erreur", "Veuillez saisir une URL YouTube")
+            messagebox.showerror(
+                "Erreur", "Veuillez saisir une URL YouTube ou un fichier vidéo"
+            )
             self.url_entry.focus()
             return
         
@@ -455,9 +458,14 @@ class ModernTkinterApp:
             self.output_dir.focus()
             return
         
-        # Validation de l'URL YouTube
-        if not url.startswith(('http://', 'https://')) or 'youtube.com' not in url and 'youtu.be' not in url:
-            messagebox.showerror("Erreur", "Veuillez saisir une URL YouTube valide")
+        # Validation de la source: URL http(s) ou fichier/dossier local existant
+        if (
+            not url.startswith(("http://", "https://"))
+            and not Path(url).expanduser().exists()
+        ):
+            messagebox.showerror(
+                "Erreur", "Veuillez saisir une URL valide ou un fichier vidéo existant"
+            )
             self.url_entry.focus()
             return
         
@@ -485,7 +493,8 @@ class ModernTkinterApp:
             self.processing_finished()
             return
         
-        # Démarrer le traitement dans un thread séparé
+        # Démarrer le traitement dans un thread séparé (arrêt via le jeton d'annulation)
+        self.cancel_token = CancelToken()
         self.processing_thread = threading.Thread(target=self.run_cli, args=(args,))
         self.processing_thread.daemon = True
         self.processing_thread.start()
@@ -520,34 +529,15 @@ class ModernTkinterApp:
         self.root.after(100, lambda: self.status_var.set("Arrêt effectué"))
     
     def force_stop_cli(self):
-        """Essaie de forcer l'arrêt du processus CLI"""
-        try:
-            # Importer os pour la gestion des processus
-            import os
-            import signal
-            
-            # Sur Windows, on ne peut pas envoyer de signal SIGTERM
-            # mais on peut essayer d'interrompre le processus principal
-            if os.name == 'nt':  # Windows
-                # Essayer d'interrompre le processus Python en cours
-                try:
-                    # Envoyer un signal d'interruption (Ctrl+C équivalent)
-                    os.kill(os.getpid(), signal.CTRL_C_EVENT)
-                    self.log_queue.put(("info", "Signal d'interruption envoyé au processus"))
-                except:
-                    # Si ça ne marche pas, on note juste
-                    self.log_queue.put(("info", "Arrêt demandé (Windows - arrêt progressif)"))
-            else:
-                # Sur Unix/Linux, on peut envoyer SIGTERM
-                try:
-                    os.kill(os.getpid(), signal.SIGTERM)
-                    self.log_queue.put(("info", "Signal SIGTERM envoyé au processus"))
-                except:
-                    self.log_queue.put(("info", "Arrêt demandé (Unix - arrêt progressif)"))
-                    
-        except Exception as e:
-            self.log_queue.put(("warning", f"Impossible de forcer l'arrêt: {str(e)}"))
-            self.log_queue.put(("info", "L'arrêt se fera progressivement"))
+        """Annule le traitement: le téléchargement s'arrête au prochain bloc,
+        ffmpeg est arrêté (puis tué s'il ne répond pas) et les fichiers partiels
+        sont supprimés."""
+        token = getattr(self, "cancel_token", None)
+        if token is None:
+            self.log_queue.put(("info", "Aucun traitement à arrêter"))
+            return
+        token.cancel("arrêt demandé depuis l'interface")
+        self.log_queue.put(("info", "Annulation envoyée au traitement en cours"))
     
     def build_cli_args(self):
         """Construit la liste d'arguments pour la CLI"""
@@ -636,11 +626,14 @@ class ModernTkinterApp:
                 self.log_queue.put(("warning", "Traitement annulé avant démarrage"))
                 return
             
-            # Rediriger stdout/stderr pour capturer les logs
+            # Import au premier traitement: la fenêtre s'ouvre sans attendre le pipeline
+            from ytb_to_tiktok.cli import main as cli_main, parse_args
+
+            # La console de la CLI est mise de côté:
+            # le journal est alimenté en direct par les événements
             import io
             import contextlib
             
-            # Capturer la sortie
             output = io.StringIO()
             with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
                 # Parser les arguments et exécuter
@@ -650,27 +643,16 @@ class ModernTkinterApp:
                 if not self.is_processing:
                     self.log_queue.put(("warning", "Traitement annulé après parsing des arguments"))
                     return
-                
-                result = cli_main(args)
-            
+
+                result = cli_main(
+                    args, cancel=self.cancel_token, on_event=self.on_pipeline_event
+                )
+
             # Vérifier si l'arrêt a été demandé pendant le traitement
             if not self.is_processing:
                 self.log_queue.put(("warning", "Traitement interrompu par l'utilisateur"))
                 return
             
-            # Récupérer la sortie capturée
-            output_text = output.getvalue()
-            if output_text.strip():
-                # Envoyer les logs capturés ligne par ligne
-                for line in output_text.strip().split('\n'):
-                    if line.strip():
-                        if 'error' in line.lower() or 'erreur' in line.lower():
-                            self.log_queue.put(("error", line.strip()))
-                        elif 'warning' in line.lower() or 'attention' in line.lower():
-                            self.log_queue.put(("warning", line.strip()))
-                        else:
-                            self.log_queue.put(("info", line.strip()))
-            
             # Envoyer le message de succès seulement si pas d'arrêt
             if self.is_processing:
                 self.log_queue.put(("success", f"Traitement terminé avec succès (code: {result})"))
@@ -711,11 +693,65 @@ class ModernTkinterApp:
             # Traitement normal terminé
             self.status_var.set("Prêt")
     
+    def on_pipeline_event(self, event):
+        """Traduit un événement du pipeline en ligne de journal"""
+        job = f"[{event.job}] " if event.job and event.type != "job_start" else ""
+        data = event.data
+        if event.type == "progress":
+            fraction = data.get("fraction")
+            if fraction is not None:
+                eta = data.get("eta")
+                suffix = f" · reste ~{int(eta)} s" if eta is not None else ""
+                self.log_queue.put(
+                    ("status", f"{event.stage}: {fraction * 100:.0f}%{suffix}")
+                )
+        elif event.type == "job_start":
+            self.log_queue.put(("info", f"Vidéo: {event.job}"))
+        elif event.type == "job_end":
+            if data.get("status") == "ok":
+                self.log_queue.put(
+                    ("success", f"{job}Vidéo traitée en {data.get('seconds', 0):.1f} s")
+                )
+            elif data.get("status") == "error":
+                self.log_queue.put(("error", f"{job}Échec: {data.get('error', '')}"))
+        elif event.type == "stage_start":
+            self.log_queue.put(("info", f"{job}Étape {event.stage}..."))
+        elif event.type == "stage_end":
+            status = data.get("status")
+            if status in ("ok", "skipped"):
+                detail = (
+                    " (déjà faite)"
+                    if status == "skipped"
+                    else f" en {data.get('seconds', 0):.1f} s"
+                )
+                self.log_queue.put(
+                    ("info", f"{job}Étape {event.stage} terminée{detail}")
+                )
+        elif event.type == "segment":
+            self.log_queue.put(
+                (
+                    "info",
+                    f"{job}Segment {data.get('index')}/{data.get('total')}: "
+                    f"{data.get('path')}",
+                )
+            )
+        elif event.type == "warning":
+            self.log_queue.put(("warning", f"{job}{data.get('message', '')}"))
+        elif event.type == "error":
+            self.log_queue.put(
+                ("error", f"{job}Erreur ({event.stage}): {data.get('message', '')}")
+            )
+
     def check_log_queue(self):
         """Vérifie la queue de logs et met à jour l'interface"""
         try:
             while True:
                 log_type, message = self.log_queue.get_nowait()
+
+                # Avancement: barre de statut seulement, pas de ligne de journal
+                if log_type == "status":
+                    self.status_var.set(message)
+                    continue
                 
                 # Ajouter le log à l'interface
                 self.log_text.insert(tk.END, f"{message}\n", log_type)
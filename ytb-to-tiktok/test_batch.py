@@ -0,0 +1,39 @@
+"""Tests du mode lot: segments propres à chaque job."""
+
+from pathlib import Path
+
+from ytb_to_tiktok.cli import _job_segments_dir, _segment_pattern
+
+
+def test_segment_pattern_matches_only_its_own_segments(tmp_path):
+    for name in (
+        "clip_0000.mp4",
+        "clip_0001.mp4",
+        "clip_2_0000.mp4",
+        "clip_final.mp4",
+        "clip_0000.jpg",
+    ):
+        (tmp_path / name).write_bytes(b"")
+    assert [path.name for path in sorted(tmp_path.glob(_segment_pattern("clip")))] == [
+        "clip_0000.mp4",
+        "clip_0001.mp4",
+    ]
+    assert [path.name for path in tmp_path.glob(_segment_pattern("clip_2"))] == [
+        "clip_2_0000.mp4"
+    ]
+
+
+def test_segment_pattern_escapes_glob_characters(tmp_path):
+    (tmp_path / "live [HD]_0000.mp4").write_bytes(b"")
+    assert [path.name for path in tmp_path.glob(_segment_pattern("live [HD]"))] == [
+        "live [HD]_0000.mp4"
+    ]
+
+
+def test_job_segments_dir_is_per_url_and_stable(tmp_path):
+    video = Path("downloads/Même titre.mp4")
+    first = _job_segments_dir(tmp_path, "https://youtu.be/aaa", video)
+    second = _job_segments_dir(tmp_path, "https://youtu.be/bbb", video)
+    assert first != second
+    assert first.parent == tmp_path and first.name.startswith("Même titre_")
+    assert _job_segments_dir(tmp_path, "https://youtu.be/aaa", video) == first
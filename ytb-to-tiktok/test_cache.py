@@ -0,0 +1,77 @@
+"""Tests des caches locaux: sondes média (mémoire, SQLite), téléchargements."""
+
+from ytb_to_tiktok.cache import DownloadStore, MediaInfoCache, StoredDownload
+from ytb_to_tiktok.media import MediaInfo
+
+
+def _files(tmp_path, count):
+    paths = []
+    for index in range(count):
+        path = tmp_path / f"video{index}.mp4"
+        path.write_bytes(b"x" * (index + 1))
+        paths.append(path)
+    return paths
+
+
+def test_media_cache_memory_is_lru(tmp_path):
+    first, second, third = _files(tmp_path, 3)
+    cache = MediaInfoCache(tmp_path / "media.sqlite", max_entries=2)
+    cache.put(first, MediaInfo(1.0))
+    cache.put(second, MediaInfo(2.0))
+    assert cache.get(first).duration == 1.0
+    cache.put(third, MediaInfo(3.0))
+    assert [key[0] for key in cache._memory] == [
+        str(first.resolve()),
+        str(third.resolve()),
+    ]
+
+
+def test_media_cache_persists_and_evicts(tmp_path):
+    first, second, third = _files(tmp_path, 3)
+    cache = MediaInfoCache(tmp_path / "media.sqlite", max_entries=2)
+    for index, path in enumerate((first, second, third)):
+        cache.put(path, MediaInfo(float(index)))
+    fresh = MediaInfoCache(tmp_path / "media.sqlite", max_entries=2)
+    assert fresh.get(first) is None
+    assert fresh.get(third).duration == 2.0
+
+
+def test_media_cache_misses_modified_file(tmp_path):
+    (path,) = _files(tmp_path, 1)
+    cache = MediaInfoCache(tmp_path / "media.sqlite")
+    cache.put(path, MediaInfo(1.0))
+    path.write_bytes("modifié".encode())
+    assert cache.get(path) is None
+
+
+def _store_file(store, name, size):
+    path = store.root / "youtube" / f"{name}.mp4"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"v" * size)
+    store.put("youtube", name, "best", StoredDownload(path, name, name, "18", size))
+    return path
+
+
+def test_download_store_evicts_least_recently_used(tmp_path):
+    store = DownloadStore(tmp_path / "downloads", max_bytes=250)
+    old = _store_file(store, "old", 100)
+    recent = _store_file(store, "recent", 100)
+    assert store.get("youtube", "old", "best") is not None
+    newest = _store_file(store, "newest", 100)
+    assert old.is_file() and newest.is_file()
+    assert not recent.exists()
+    assert store.get("youtube", "recent", "best") is None
+
+
+def test_download_store_keeps_new_entry_over_budget(tmp_path):
+    store = DownloadStore(tmp_path / "downloads", max_bytes=50)
+    path = _store_file(store, "big", 100)
+    assert path.is_file()
+    assert store.get("youtube", "big", "best").size == 100
+
+
+def test_download_store_forgets_truncated_file(tmp_path):
+    store = DownloadStore(tmp_path / "downloads")
+    path = _store_file(store, "clip", 100)
+    path.write_bytes(b"v" * 10)
+    assert store.get("youtube", "clip", "best") is None
@@ -0,0 +1,33 @@
+"""Tests de l'annulation: jetons enfants et nettoyage des sorties partielles."""
+
+import os
+import time
+
+import pytest
+
+from ytb_to_tiktok.cancel import Cancelled, CancelToken, remove_partial_outputs
+
+
+def test_child_follows_parent_but_not_the_reverse():
+    parent = CancelToken()
+    child = parent.child()
+    child.cancel("une autre plage a échoué")
+    assert child.cancelled and not parent.cancelled
+
+    other = parent.child()
+    parent.cancel("arrêt demandé")
+    assert other.cancelled and other.reason == "arrêt demandé"
+    with pytest.raises(Cancelled):
+        other.raise_if_cancelled()
+    assert parent.child().cancelled
+
+
+def test_remove_partial_outputs_keeps_files_from_previous_runs(tmp_path):
+    since = time.time()
+    previous = tmp_path / "base_0000.mp4"
+    previous.write_bytes(b"x")
+    os.utime(previous, (since - 60.0, since - 60.0))
+    partial = tmp_path / "base_0001.mp4"
+    partial.write_bytes(b"x")
+    remove_partial_outputs([tmp_path / "base_*.mp4"], since)
+    assert previous.exists() and not partial.exists()
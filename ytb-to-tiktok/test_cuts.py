@@ -0,0 +1,94 @@
+"""Tests du placement des coupes: images clés, plan fixe, scènes et silences."""
+
+from ytb_to_tiktok.cli import (
+    _plan_cut_times,
+    _snap_cuts_to_boundaries,
+    _snap_to_keyframes,
+)
+
+
+def test_snap_to_keyframes_nearest_within_tolerance():
+    keyframes = [0.0, 9.5, 19.0, 21.5, 30.0]
+    assert _snap_to_keyframes([10.0, 20.0], keyframes, 2.0) == ([9.5, 19.0], 0, [])
+
+
+def test_snap_to_keyframes_out_of_tolerance_uses_next():
+    assert _snap_to_keyframes([20.0], [0.0, 10.0, 26.0, 40.0], 2.0) == ([26.0], 1, [])
+
+
+def test_snap_to_keyframes_reports_dropped_cuts():
+    # Deux coupes sur la même image clé, puis une coupe sans image clé après elle
+    snapped, out_of_tolerance, dropped = _snap_to_keyframes(
+        [20.0, 21.0, 50.0], [0.0, 20.4, 30.0], 2.0
+    )
+    assert snapped == [20.4]
+    assert out_of_tolerance == 1
+    assert dropped == [21.0, 50.0]
+
+
+def test_snap_to_keyframes_ignores_first_keyframe():
+    assert _snap_to_keyframes([0.5], [0.0, 4.0], 1.0) == ([4.0], 1, [])
+
+
+def test_plan_cut_times_keeps_last_segment_long_enough():
+    assert _plan_cut_times(750.0, 60) == [60.0 * i for i in range(1, 12)]
+    assert _plan_cut_times(45.0, 20) == [20.0]
+    assert _plan_cut_times(15.0, 20) == []
+
+
+def test_snap_moves_cut_to_best_boundary():
+    boundaries = [[18.5, 18.5, 0.3], [21.0, 21.0, 0.9]]
+    assert _snap_cuts_to_boundaries([20.0], boundaries, 3.0, 100.0) == ([21.0], 1)
+
+
+def test_snap_boundary_outside_tolerance_keeps_cut():
+    assert _snap_cuts_to_boundaries([20.0, 40.0], [[30.0, 30.0, 1.0]], 3.0, 100.0) == (
+        [20.0, 40.0],
+        0,
+    )
+
+
+def test_snap_boundary_on_cut_is_not_counted_as_moved():
+    # Point sur la coupe, et silence qui la contient
+    assert _snap_cuts_to_boundaries([20.0], [[20.0, 20.0, 1.0]], 3.0, 100.0) == (
+        [20.0],
+        0,
+    )
+    assert _snap_cuts_to_boundaries([20.0], [[18.0, 22.0, 2.0]], 3.0, 100.0) == (
+        [20.0],
+        0,
+    )
+
+
+def test_snap_into_silence_interval_nearest_point():
+    assert _snap_cuts_to_boundaries([20.0], [[22.5, 23.0, 1.0]], 3.0, 100.0) == (
+        [22.5],
+        1,
+    )
+
+
+def test_snap_colliding_cuts_keep_every_cut():
+    # Une tolérance plus large que l'écart entre coupes:
+    # aucune coupe fusionnée ni perdue
+    snapped, moved = _snap_cuts_to_boundaries(
+        [20.0, 40.0], [[44.0, 44.0, 1.0]], 25.0, 42.0
+    )
+    assert snapped == [20.0, 40.0]
+    assert moved == 0
+
+
+def test_snap_two_cuts_same_boundary():
+    snapped, moved = _snap_cuts_to_boundaries(
+        [20.0, 24.0], [[22.0, 22.0, 1.0]], 5.0, 100.0
+    )
+    assert len(snapped) == 2
+    assert snapped[0] < snapped[1]
+    assert snapped == [22.0, 24.0]
+    assert moved == 1
+
+
+def test_snap_last_cut_not_past_latest():
+    assert _snap_cuts_to_boundaries([20.0], [[22.0, 22.0, 1.0]], 3.0, 21.0) == (
+        [20.0],
+        0,
+    )
@@ -0,0 +1,41 @@
+"""Tests des événements: contexte du job, segments publiés une fois finalisés."""
+
+from ytb_to_tiktok import events
+from ytb_to_tiktok.runner import ProgressEvent
+
+
+def _progress(done=False):
+    return ProgressEvent(
+        stage="découpage · clip", out_time=1.0, duration=10.0, elapsed=1.0, done=done
+    )
+
+
+def test_reporter_tags_ffmpeg_progress_with_job():
+    received = []
+    with events.event_listener(received.append):
+        events.JobReporter("https://example.com/v", "split").progress(
+            _progress(done=True)
+        )
+    assert [(event.type, event.job) for event in received] == [
+        ("progress", "https://example.com/v")
+    ]
+
+
+def test_segment_watcher_publishes_each_segment_once_finalized(tmp_path):
+    received = []
+    with events.event_listener(received.append):
+        on_progress = events.JobReporter("job", "split").segment_watcher(
+            tmp_path, "clip_[0-9][0-9][0-9][0-9].mp4", 2
+        )
+        (tmp_path / "clip_0000.mp4").write_bytes(b"x")
+        on_progress(_progress())
+        # Le segment en cours d'écriture n'est pas encore publié
+        assert not [event for event in received if event.type == "segment"]
+        (tmp_path / "clip_0001.mp4").write_bytes(b"x")
+        on_progress(_progress())
+        (tmp_path / "clip_0002.mp4").write_bytes(b"x")
+        on_progress(_progress(done=True))
+    segments = [event.data for event in received if event.type == "segment"]
+    # clip_0002 dépasse le total demandé (--limit): non publié
+    assert [(data["index"], data["total"]) for data in segments] == [(1, 2), (2, 2)]
+    assert segments[0]["path"] == str(tmp_path / "clip_0000.mp4")
@@ -0,0 +1,95 @@
+"""Tests des polices: lecture de la table 'name' (sfnt) et index persisté."""
+
+import struct
+from unittest import mock
+
+from ytb_to_tiktok import fonts
+from ytb_to_tiktok.fonts import FontRegistry, read_font_names
+
+
+def _name_table(records):
+    """Table 'name' format 0: records (plateforme, encodage, langue, nameID, octets)."""
+    header_size = 6 + 12 * len(records)
+    entries, strings = b"", b""
+    for platform, encoding, language, name_id, raw in records:
+        entries += struct.pack(
+            ">6H", platform, encoding, language, name_id, len(raw), len(strings)
+        )
+        strings += raw
+    return struct.pack(">HHH", 0, len(records), header_size) + entries + strings
+
+
+def _sfnt(records, collection=False):
+    table = _name_table(records)
+    # En-tête de collection (16 octets) avant la police; les décalages sont absolus
+    offset = 12 + 16 + (16 if collection else 0)
+    font = struct.pack(">IHHHH", 0x00010000, 1, 16, 0, 0)
+    font += struct.pack(">4sIII", b"name", 0, offset, len(table)) + table
+    if collection:
+        return b"ttcf" + struct.pack(">HHII", 1, 0, 1, 16) + font
+    return font
+
+
+def _utf16(text):
+    return text.encode("utf-16-be")
+
+
+def test_read_font_names_windows_records(tmp_path):
+    path = tmp_path / "font.ttf"
+    path.write_bytes(
+        _sfnt([(3, 1, 0x409, 1, _utf16("Test Sans")), (3, 1, 0x409, 2, _utf16("Bold"))])
+    )
+    assert read_font_names(path) == ("Test Sans", "Bold")
+
+
+def test_read_font_names_prefers_typographic_and_english(tmp_path):
+    path = tmp_path / "font.otf"
+    records = [
+        (1, 0, 0, 1, b"Mac Family"),
+        (3, 1, 0x40C, 1, _utf16("Famille")),
+        (3, 1, 0x409, 1, _utf16("Test Sans Light")),
+        (3, 1, 0x409, 16, _utf16("Test Sans")),
+        (3, 1, 0x409, 17, _utf16("Light")),
+    ]
+    path.write_bytes(_sfnt(records))
+    assert read_font_names(path) == ("Test Sans", "Light")
+
+
+def test_read_font_names_mac_roman_and_default_style(tmp_path):
+    path = tmp_path / "font.ttf"
+    path.write_bytes(_sfnt([(1, 0, 0, 1, b"Old Mac")]))
+    assert read_font_names(path) == ("Old Mac", "Regular")
+
+
+def test_read_font_names_collection(tmp_path):
+    path = tmp_path / "fonts.ttc"
+    path.write_bytes(_sfnt([(3, 1, 0x409, 1, _utf16("Coll Sans"))], collection=True))
+    assert read_font_names(path) == ("Coll Sans", "Regular")
+
+
+def test_read_font_names_invalid(tmp_path):
+    path = tmp_path / "broken.ttf"
+    path.write_bytes(b"\x00\x01\x00\x00\x00")
+    assert read_font_names(path) is None
+    assert read_font_names(tmp_path / "absent.ttf") is None
+
+
+def test_registry_indexes_and_resolves(tmp_path):
+    root = tmp_path / "fonts"
+    root.mkdir()
+    (root / "TestSans-Bold.ttf").write_bytes(
+        _sfnt([(3, 1, 0x409, 1, _utf16("Test Sans")), (3, 1, 0x409, 2, _utf16("Bold"))])
+    )
+    registry = FontRegistry([root], tmp_path / "fonts.json")
+    assert registry.resolve("test sans bold").family == "Test Sans"
+    assert registry.resolve("TestSans-Bold").style == "Bold"
+
+
+def test_registry_reuses_empty_index(tmp_path):
+    root = tmp_path / "fonts"
+    root.mkdir()
+    assert FontRegistry([root], tmp_path / "fonts.json").fonts() == []
+    with mock.patch.object(
+        fonts.os, "walk", side_effect=AssertionError("nouveau parcours")
+    ):
+        assert FontRegistry([root], tmp_path / "fonts.json").fonts() == []
@@ -0,0 +1,59 @@
+"""Tests du manifeste de job: enregistrement, relecture et reprise des étapes."""
+
+from ytb_to_tiktok.manifest import JobManifest
+
+
+def test_manifest_round_trip(tmp_path):
+    output = tmp_path / "video.mp4"
+    output.write_bytes(b"video" * 100)
+    manifest = JobManifest.for_url(tmp_path, "https://youtu.be/abc")
+    params = {"url": "https://youtu.be/abc", "downloads_dir": str(tmp_path)}
+    manifest.complete("download", params, [output], title="Titre")
+
+    reloaded = JobManifest.for_url(tmp_path, "https://youtu.be/abc")
+    assert reloaded.path == manifest.path
+    assert reloaded.is_complete("download", params)
+    record = reloaded.stage("download")
+    assert record is not None and record["title"] == "Titre"
+    assert record["outputs"][0]["path"] == str(output)
+
+
+def test_manifest_resume_checks_params_and_outputs(tmp_path):
+    output = tmp_path / "part_0000.mp4"
+    output.write_bytes(b"a" * 64)
+    manifest = JobManifest(tmp_path / "job.json")
+    manifest.complete("split", {"segment_seconds": 60}, [output])
+    assert manifest.is_complete("split", {"segment_seconds": 60})
+    assert not manifest.is_complete("split", {"segment_seconds": 30})
+    # Sortie modifiée (même taille) puis supprimée: l'étape est à refaire
+    output.write_bytes(b"b" * 64)
+    assert not JobManifest(tmp_path / "job.json").is_complete(
+        "split", {"segment_seconds": 60}
+    )
+    output.unlink()
+    assert not manifest.is_complete("split", {"segment_seconds": 60})
+
+
+def test_manifest_invalidate_prefix(tmp_path):
+    output = tmp_path / "part.mp4"
+    output.write_bytes(b"x")
+    manifest = JobManifest(tmp_path / "job.json")
+    for name in ("split", "label/part_0000", "label/part_0001"):
+        manifest.complete(name, {}, [output])
+    manifest.invalidate("label/")
+    assert JobManifest(tmp_path / "job.json").stage_names() == ["split"]
+
+
+def test_manifest_disabled_never_resumes(tmp_path):
+    output = tmp_path / "part.mp4"
+    output.write_bytes(b"x")
+    JobManifest(tmp_path / "job.json").complete("split", {}, [output])
+    disabled = JobManifest(tmp_path / "job.json", enabled=False)
+    assert disabled.stage("split") is None
+    assert not disabled.is_complete("split", {})
+
+
+def test_manifest_ignores_corrupt_file(tmp_path):
+    path = tmp_path / "job.json"
+    path.write_text("{pas du json", encoding="utf-8")
+    assert JobManifest(path).stage_names() == []
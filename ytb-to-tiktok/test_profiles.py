@@ -0,0 +1,121 @@
+"""Tests des profils d'encodage: arguments ffmpeg, profil 'auto', déclinaisons."""
+
+import pytest
+
+from ytb_to_tiktok import profiles
+from ytb_to_tiktok.profiles import (
+    DEFAULT_PROFILE,
+    PROFILES,
+    EncoderProfile,
+    Rendition,
+    autotune_profile,
+    parse_rendition,
+)
+
+
+def test_profile_video_args_and_overrides():
+    profile = EncoderProfile("test", preset="medium", crf=21, tune="film", threads=4)
+    assert profile.video_args() == [
+        "-c:v",
+        "libx264",
+        "-preset",
+        "medium",
+        "-crf",
+        "21",
+        "-tune",
+        "film",
+        "-threads",
+        "4",
+    ]
+    assert profile.video_args(crf=18, threads=2)[-6:] == [
+        "-crf",
+        "18",
+        "-tune",
+        "film",
+        "-threads",
+        "2",
+    ]
+    assert PROFILES["fast"].video_args() == [
+        "-c:v",
+        "libx264",
+        "-preset",
+        "veryfast",
+        "-crf",
+        "23",
+    ]
+
+
+def test_profile_audio_args_and_relabel_crf():
+    assert PROFILES["archive"].audio_args() == ["-c:a", "aac", "-b:a", "192k"]
+    assert PROFILES["fast"].relabel_crf() == 20
+    assert EncoderProfile("lossless", preset="fast", crf=1).relabel_crf() == 0
+
+
+def test_autotune_picks_slowest_fast_enough_preset_and_caches(tmp_path, monkeypatch):
+    # Vitesse simulée: 0,5x pour "slow", +0,25x par preset plus rapide
+    # ("fast" atteint 1,0x)
+    calls = []
+
+    def fake_speed(ffmpeg_path, input_path, profile, **kwargs):
+        calls.append(profile.preset)
+        return 0.5 + 0.25 * (profiles.X264_PRESETS.index(profile.preset) - 2)
+
+    monkeypatch.setattr(profiles, "measure_speed", fake_speed)
+    monkeypatch.setattr(
+        profiles, "_autotune_state_path", lambda: tmp_path / "autotune.json"
+    )
+    chosen = autotune_profile("ffmpeg", tmp_path / "source.mp4", 60.0, target_speed=1.0)
+    assert (chosen.name, chosen.preset, chosen.crf) == (
+        "auto",
+        "fast",
+        PROFILES["balanced"].crf,
+    )
+    assert len(calls) <= 4
+
+    calls.clear()
+    assert (
+        autotune_profile(
+            "ffmpeg", tmp_path / "source.mp4", 60.0, target_speed=1.0
+        ).preset
+        == "fast"
+    )
+    assert calls == []
+
+
+def test_parse_rendition_with_bitrate():
+    rendition = parse_rendition(" tiktok=1080x1920@6M ")
+    assert rendition == Rendition("tiktok", 1080, 1920, "6M")
+    args = rendition.video_args(DEFAULT_PROFILE)
+    assert args[-4:] == ["-maxrate", "6M", "-bufsize", "12M"]
+
+
+def test_parse_rendition_without_bitrate():
+    rendition = parse_rendition("apercu=540x960")
+    assert rendition.max_bitrate is None
+    assert rendition.video_args(DEFAULT_PROFILE) == DEFAULT_PROFILE.video_args()
+    assert rendition.scale_filter().startswith("scale=540:960:")
+
+
+@pytest.mark.parametrize(
+    "spec",
+    [
+        "tiktok",
+        "tiktok=1080",
+        "=1080x1920",
+        "a b=2x2",
+        "t=1x1920",
+        "t=2x2@fast",
+        "t=2x2@0k",
+    ],
+)
+def test_parse_rendition_rejects_invalid(spec):
+    with pytest.raises(ValueError):
+        parse_rendition(spec)
+
+
+def test_rendition_validates_bitrate():
+    with pytest.raises(ValueError):
+        Rendition("tiktok", 1080, 1920, "1.2.3M")
+    assert (
+        Rendition("tiktok", 1080, 1920, "2.5M").video_args(DEFAULT_PROFILE)[-1] == "5M"
+    )
@@ -0,0 +1,131 @@
+"""Tests du découpage intelligent: plan des coupes et source à images B.
+
+La source à images B place une coupe juste avant une image clé.
+"""
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from ytb_to_tiktok.smartcut import SmartCutBoundary, SmartCutPlan, plan_smart_cut
+
+FPS = 30000 / 1001
+
+
+def test_plan_aligned_when_no_frame_before_next_keyframe():
+    # Images clés toutes les 4,004 s (GOP 120 à 29,97 i/s):
+    # 20,02 s suit la coupe à 20 s de 20 ms
+    keyframes = [round(i * 4.004, 3) for i in range(12)]
+    plan = plan_smart_cut([20.0], keyframes, 45.0, FPS)
+    assert plan is not None
+    boundary = plan.boundaries[0]
+    assert boundary.aligned
+    assert boundary.cut == pytest.approx(20.02)
+    assert boundary.keyframe_before == boundary.keyframe_after == pytest.approx(20.02)
+
+
+def test_plan_keyframe_half_frame_before_is_aligned():
+    plan = plan_smart_cut([20.0], [0.0, 10.0, 19.99, 30.0], 40.0, FPS)
+    assert plan is not None and plan.boundaries[0].aligned
+
+
+def test_plan_unaligned_cut_reencodes_its_gop():
+    plan = plan_smart_cut([20.0], [0.0, 10.0, 25.0, 30.0], 40.0, FPS)
+    assert plan is not None
+    boundary = plan.boundaries[0]
+    assert not boundary.aligned
+    assert (boundary.keyframe_before, boundary.keyframe_after) == (10.0, 25.0)
+    assert plan.copy_points == [10.0, 25.0]
+
+
+def test_plan_two_cuts_in_one_gop():
+    assert plan_smart_cut([20.0, 22.0], [0.0, 10.0, 30.0], 40.0, FPS) is None
+
+
+def test_plan_without_keyframes():
+    assert plan_smart_cut([20.0], [], 40.0, FPS) is None
+
+
+@pytest.fixture(scope="module")
+def bframe_source(tmp_path_factory):
+    """H.264 High à images B, 29,97 i/s, image clé toutes les 120 images (4,004 s)."""
+    from ytb_to_tiktok.cli import ensure_ffmpeg_in_path
+
+    try:
+        ffmpeg_path, _ = ensure_ffmpeg_in_path()
+    except Exception:
+        pytest.skip("ffmpeg indisponible")
+    source = tmp_path_factory.mktemp("smartcut") / "bframes.mp4"
+    cmd = [
+        ffmpeg_path,
+        "-y",
+        "-loglevel",
+        "error",
+        "-f",
+        "lavfi",
+        "-i",
+        "testsrc2=size=320x240:rate=30000/1001",
+        "-f",
+        "lavfi",
+        "-i",
+        "sine=frequency=440",
+        "-t",
+        "45",
+        "-c:v",
+        "libx264",
+        "-profile:v",
+        "high",
+        "-bf",
+        "2",
+        "-g",
+        "120",
+        "-keyint_min",
+        "120",
+        "-sc_threshold",
+        "0",
+        "-pix_fmt",
+        "yuv420p",
+        "-c:a",
+        "aac",
+        str(source),
+    ]
+    if subprocess.run(cmd).returncode != 0:
+        pytest.skip("libx264 indisponible")
+    return ffmpeg_path, source
+
+
+def _durations(ffmpeg_path: str, parts: list) -> list:
+    from ytb_to_tiktok.media import probe_media_info
+
+    return [probe_media_info(Path(part), ffmpeg_path).duration for part in parts]
+
+
+def test_smart_split_keyframe_just_after_cut(bframe_source, tmp_path):
+    from ytb_to_tiktok.cli import split_video_ffmpeg
+
+    ffmpeg_path, source = bframe_source
+    parts = split_video_ffmpeg(source, tmp_path, segment_seconds=20, mode="smart")
+    assert [part.name for part in parts] == ["bframes_0000.mp4", "bframes_0001.mp4"]
+    first, second = _durations(ffmpeg_path, parts)
+    assert first == pytest.approx(20.02, abs=0.05)
+    assert second == pytest.approx(24.98, abs=0.1)
+
+
+def test_smart_cut_skips_empty_gop_half(bframe_source, tmp_path):
+    # Plan d'avant le correctif: coupe non alignée,
+    # sans image entre elle et l'image clé suivante
+    from ytb_to_tiktok.media import probe_media_info
+    from ytb_to_tiktok.smartcut import smart_cut
+
+    ffmpeg_path, source = bframe_source
+    stream = probe_media_info(source, ffmpeg_path).video
+    assert stream is not None
+    plan = SmartCutPlan(
+        boundaries=[SmartCutBoundary(20.0, 16.016, 20.02, False)],
+        copy_points=[16.016, 20.02],
+        duration=45.0,
+    )
+    parts = smart_cut(ffmpeg_path, source, tmp_path, "bframes", plan, stream)
+    assert len(parts) == 2
+    assert all(duration > 19 for duration in _durations(ffmpeg_path, parts))
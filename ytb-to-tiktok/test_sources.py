@@ -0,0 +1,30 @@
+"""Tests de la détection du type de source (yt-dlp, fichier local, URL HTTP directe)."""
+
+import pytest
+
+from ytb_to_tiktok.sources import source_kind
+
+
+@pytest.mark.parametrize(
+    "entry, kind",
+    [
+        ("https://www.youtube.com/watch?v=abc", "ytdlp"),
+        ("https://vimeo.com/123", "ytdlp"),
+        ("ytsearch:chats", "ytdlp"),
+        ("dQw4w9WgXcQ", "ytdlp"),
+        ("https://cdn.example.com/media/clip.MP4?token=1", "http"),
+        ("http://example.com/a%20b.webm", "http"),
+        ("file:///tmp/video.mp4", "file"),
+        ("videos/*.mp4", "file"),
+        ("clip.mkv", "file"),
+        ("C:\\videos\\clip.mp4", "file"),
+    ],
+)
+def test_source_kind(entry, kind):
+    assert source_kind(entry) == kind
+
+
+def test_source_kind_existing_path(tmp_path):
+    folder = tmp_path / "sans_extension"
+    folder.mkdir()
+    assert source_kind(str(folder)) == "file"
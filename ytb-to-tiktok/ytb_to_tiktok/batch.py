@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import queue
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+from .cancel import Cancelled, CancelToken
+
+# Fin de file pour les workers d'encodage
+_DONE = object()
+
+
+@dataclass
+class BatchJob:
+    """Suivi d'une vidéo du lot: état courant, durées de chaque étape et résultat."""
+
+    index: int
+    url: str
+    title: Optional[str] = None
+    video_path: Optional[Path] = None
+    parts: list[Path] = field(default_factory=list)
+    status: str = "en attente"  # ... "terminé", "échec" ou "annulé"
+    error: Optional[str] = None
+    download_seconds: Optional[float] = None
+    encode_seconds: Optional[float] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "terminé"
+
+
+def read_url_list(source: str) -> list[str]:
+    """Lit une liste d'URL (une par ligne) d'un fichier, ou de stdin si source vaut '-'.
+
+    Les lignes vides et les commentaires (#) sont ignorés.
+    """
+    if source == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        lines = Path(source).read_text(encoding="utf-8").splitlines()
+    return [
+        line.strip()
+        for line in lines
+        if line.strip() and not line.strip().startswith("#")
+    ]
+
+
+def expand_playlist_urls(url: str, ydl_opts: dict, max_depth: int = 2) -> list[str]:
+    """URL des vidéos d'une playlist ou d'une chaîne (l'URL seule pour une vidéo).
+
+    La liste est lue à plat (extract_flat): aucune page vidéo n'est téléchargée ici.
+    Les onglets d'une chaîne (vidéos, shorts, ...) sont eux-mêmes des playlists,
+    d'où la récursion.
+    """
+    from yt_dlp import YoutubeDL  # type: ignore[import-untyped]
+
+    opts = dict(ydl_opts, noplaylist=False, extract_flat="in_playlist")
+    urls: list[str] = []
+    seen: set[str] = set()
+
+    def visit(ydl: "YoutubeDL", target: str, depth: int) -> None:
+        info = ydl.extract_info(target, download=False)
+        entries = info.get("entries") if info else None
+        if entries is None:
+            found = (info or {}).get("webpage_url") or target
+            if found not in seen:
+                seen.add(found)
+                urls.append(found)
+            return
+        for entry in entries:
+            if not entry:
+                continue
+            entry_url = entry.get("url") or entry.get("webpage_url")
+            if not entry_url:
+                continue
+            nested = (
+                entry.get("_type") == "playlist" or entry.get("ie_key") == "YoutubeTab"
+            )
+            if nested and depth < max_depth:
+                visit(ydl, entry_url, depth + 1)
+            elif entry_url not in seen:
+                seen.add(entry_url)
+                urls.append(entry_url)
+
+    with YoutubeDL(opts) as ydl:
+        visit(ydl, url, 0)
+    return urls
+
+
+def run_batch(
+    urls: list[str],
+    download: Callable[[str], tuple[Path, str]],
+    encode: Callable[[str, Path], list[Path]],
+    *,
+    download_jobs: int = 2,
+    encode_jobs: int = 1,
+    queue_size: int = 2,
+    on_update: Optional[Callable[[BatchJob], None]] = None,
+    cancel: Optional[CancelToken] = None,
+) -> list[BatchJob]:
+    """Traite un lot de vidéos avec deux pools indépendants reliés par une file bornée.
+
+    Les workers de téléchargement (réseau) appellent `download(url) -> (chemin, titre)`
+    et déposent chaque vidéo dans une file d'au plus `queue_size` éléments; les workers
+    d'encodage (CPU) appellent `encode(url, chemin) -> segments`. Quand la file est
+    pleine, les téléchargements attendent: le disque ne se remplit pas de vidéos en
+    retard d'encodage. Une erreur n'arrête que la vidéo concernée. Renvoie les jobs dans
+    l'ordre des URL. Après `cancel`, les étapes en cours s'interrompent et les vidéos
+    restantes passent en "annulé".
+    """
+    jobs = [BatchJob(index=index, url=url) for index, url in enumerate(urls, start=1)]
+    if not jobs:
+        return jobs
+    download_jobs = max(1, min(download_jobs, len(jobs)))
+    encode_jobs = max(1, min(encode_jobs, len(jobs)))
+
+    pending: "queue.Queue[BatchJob]" = queue.Queue()
+    for job in jobs:
+        pending.put(job)
+    ready: "queue.Queue[object]" = queue.Queue(maxsize=max(1, queue_size))
+    update_lock = threading.Lock()
+
+    def notify(job: BatchJob, status: str, error: Optional[str] = None) -> None:
+        with update_lock:
+            job.status = status
+            job.error = error
+            if on_update is not None:
+                on_update(job)
+
+    def is_cancelled() -> bool:
+        return cancel is not None and cancel.cancelled
+
+    def download_worker() -> None:
+        while True:
+            try:
+                job = pending.get_nowait()
+            except queue.Empty:
+                return
+            if is_cancelled():
+                notify(job, "annulé")
+                continue
+            notify(job, "téléchargement")
+            start = time.perf_counter()
+            try:
+                job.video_path, job.title = download(job.url)
+            except Cancelled:
+                job.download_seconds = time.perf_counter() - start
+                notify(job, "annulé")
+                continue
+            except Exception as exc:
+                job.download_seconds = time.perf_counter() - start
+                notify(job, "échec", f"téléchargement: {exc}")
+                continue
+            job.download_seconds = time.perf_counter() - start
+            notify(job, "téléchargé")
+            ready.put(job)
+
+    def encode_worker() -> None:
+        while True:
+            item = ready.get()
+            if item is _DONE:
+                return
+            job = item
+            assert isinstance(job, BatchJob) and job.video_path is not None
+            if is_cancelled():
+                notify(job, "annulé")
+                continue
+            notify(job, "encodage")
+            start = time.perf_counter()
+            try:
+                job.parts = encode(job.url, job.video_path)
+            except Cancelled:
+                job.encode_seconds = time.perf_counter() - start
+                notify(job, "annulé")
+                continue
+            except Exception as exc:
+                job.encode_seconds = time.perf_counter() - start
+                notify(job, "échec", f"encodage: {exc}")
+                continue
+            job.encode_seconds = time.perf_counter() - start
+            notify(job, "terminé")
+
+    downloaders = [
+        threading.Thread(target=download_worker, name=f"download-{i}", daemon=True)
+        for i in range(download_jobs)
+    ]
+    encoders = [
+        threading.Thread(target=encode_worker, name=f"encode-{i}", daemon=True)
+        for i in range(encode_jobs)
+    ]
+    for thread in downloaders + encoders:
+        thread.start()
+    for thread in downloaders:
+        thread.join()
+    for _ in encoders:
+        ready.put(_DONE)
+    for thread in encoders:
+        thread.join()
+    return jobs
@@ -0,0 +1,396 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from .cancel import CancelToken
+from .media import (
+    MediaInfo,
+    probe_keyframe_times,
+    probe_media_info,
+    probe_scene_changes,
+    probe_silences,
+)
+
+_cache_dir_override: Optional[Path] = None
+
+
+def set_cache_dir(path: Optional[Path]) -> None:
+    """Impose le dossier des caches de ce processus (None: valeur par défaut)."""
+    global _cache_dir_override
+    _cache_dir_override = path
+
+
+def default_cache_dir() -> Path:
+    """Dossier des caches locaux.
+
+    --cache-dir, sinon YTB_TO_TIKTOK_CACHE_DIR, sinon ~/.cache/ytb-to-tiktok.
+    """
+    if _cache_dir_override is not None:
+        return _cache_dir_override
+    env = os.environ.get("YTB_TO_TIKTOK_CACHE_DIR")
+    if env:
+        return Path(env)
+    base = os.environ.get("XDG_CACHE_HOME") or os.environ.get("LOCALAPPDATA")
+    return (Path(base) if base else Path.home() / ".cache") / "ytb-to-tiktok"
+
+
+def _content_hash(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Empreinte rapide: début et fin du fichier (1 Mio chacun) plus sa taille."""
+    digest = hashlib.sha1()
+    size = path.stat().st_size
+    digest.update(str(size).encode())
+    with path.open("rb") as fh:
+        digest.update(fh.read(chunk_size))
+        if size > chunk_size:
+            fh.seek(max(size - chunk_size, chunk_size))
+            digest.update(fh.read(chunk_size))
+    return digest.hexdigest()
+
+
+class MediaInfoCache:
+    """Index SQLite des sondes média, éviction LRU.
+
+    Clé: (chemin, taille, mtime[, empreinte]). Une copie en mémoire évite même la
+    requête SQLite pour les lectures répétées dans un processus. Si la base est
+    inaccessible, le cache se limite silencieusement à la mémoire.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        max_entries: int = 1024,
+        hash_content: bool = False,
+    ) -> None:
+        self._db_path = db_path
+        self.max_entries = max_entries
+        self.hash_content = hash_content
+        self._memory: OrderedDict[tuple[str, int, int, str], MediaInfo] = OrderedDict()
+        self._lock = threading.Lock()
+        self._persistent = True
+
+    @property
+    def db_path(self) -> Path:
+        return self._db_path or (default_cache_dir() / "media_info.sqlite")
+
+    def _key(self, input_path: Path) -> tuple[str, int, int, str]:
+        resolved = Path(input_path).resolve()
+        stat = resolved.stat()
+        content_hash = _content_hash(resolved) if self.hash_content else ""
+        return (str(resolved), stat.st_size, stat.st_mtime_ns, content_hash)
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if not self._persistent:
+            return None
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=5.0)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS media_info ("
+                " path TEXT NOT NULL, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,"
+                " content_hash TEXT NOT NULL, info TEXT NOT NULL,"
+                " last_access REAL NOT NULL,"
+                " PRIMARY KEY (path, size, mtime_ns, content_hash))"
+            )
+            return conn
+        except (OSError, sqlite3.Error):
+            self._persistent = False
+            return None
+
+    def _remember(self, key: tuple[str, int, int, str], info: MediaInfo) -> None:
+        """Copie en mémoire, bornée comme la base (appelé sous le verrou)."""
+        self._memory[key] = info
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, input_path: Path) -> Optional[MediaInfo]:
+        key = self._key(input_path)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                with conn:
+                    row = conn.execute(
+                        "SELECT info FROM media_info"
+                        " WHERE path=? AND size=? AND mtime_ns=? AND content_hash=?",
+                        key,
+                    ).fetchone()
+                    if row is None:
+                        return None
+                    conn.execute(
+                        "UPDATE media_info SET last_access=?"
+                        " WHERE path=? AND size=? AND mtime_ns=? AND content_hash=?",
+                        (time.time(), *key),
+                    )
+                info = MediaInfo.from_dict(json.loads(row[0]))
+            except (sqlite3.Error, ValueError, TypeError):
+                return None
+            finally:
+                conn.close()
+            self._remember(key, info)
+            return info
+
+    def put(self, input_path: Path, info: MediaInfo) -> None:
+        key = self._key(input_path)
+        with self._lock:
+            self._remember(key, info)
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                with conn:
+                    # Une seule entrée par chemin:
+                    # les versions précédentes du fichier sont obsolètes
+                    conn.execute("DELETE FROM media_info WHERE path=?", (key[0],))
+                    conn.execute(
+                        "INSERT INTO media_info"
+                        " (path, size, mtime_ns, content_hash, info, last_access)"
+                        " VALUES (?, ?, ?, ?, ?, ?)",
+                        (*key, json.dumps(info.to_dict()), time.time()),
+                    )
+                    conn.execute(
+                        "DELETE FROM media_info WHERE rowid IN ("
+                        " SELECT rowid FROM media_info ORDER BY last_access DESC"
+                        " LIMIT -1 OFFSET ?)",
+                        (self.max_entries,),
+                    )
+            except sqlite3.Error:
+                pass
+            finally:
+                conn.close()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                with conn:
+                    conn.execute("DELETE FROM media_info")
+            except sqlite3.Error:
+                pass
+            finally:
+                conn.close()
+
+
+_media_cache: Optional[MediaInfoCache] = MediaInfoCache()
+
+
+def configure_media_cache(
+    enabled: bool = True, db_path: Optional[Path] = None, hash_content: bool = False
+) -> None:
+    """Remplace le cache média du processus (enabled=False: sonde à chaque appel)."""
+    global _media_cache
+    _media_cache = (
+        MediaInfoCache(db_path, hash_content=hash_content) if enabled else None
+    )
+
+
+def get_media_info(
+    input_path: Path,
+    ffmpeg_path: str,
+    ffprobe_path: Optional[str] = None,
+    *,
+    with_keyframes: bool = False,
+    with_scenes: bool = False,
+    with_silences: bool = False,
+    cancel: Optional[CancelToken] = None,
+) -> MediaInfo:
+    """Infos média depuis le cache; sonde (et enrichit l'entrée) si nécessaire.
+
+    L'index des changements de plan (with_scenes) et la carte des silences
+    (with_silences) demandent un décodage (vidéo ou audio seul): `cancel` peut
+    l'interrompre.
+    """
+    cache = _media_cache
+    info = cache.get(input_path) if cache is not None else None
+    updated = False
+    if info is None:
+        info = probe_media_info(input_path, ffmpeg_path, ffprobe_path)
+        updated = True
+    if with_keyframes and info.keyframes is None:
+        info.keyframes = probe_keyframe_times(input_path, ffmpeg_path, ffprobe_path)
+        updated = True
+    if with_scenes and info.scenes is None:
+        info.scenes = probe_scene_changes(
+            input_path, ffmpeg_path, info.duration, cancel=cancel
+        )
+        updated = True
+    if with_silences and info.silences is None:
+        info.silences = probe_silences(
+            input_path, ffmpeg_path, info.duration, cancel=cancel
+        )
+        updated = True
+    if updated and cache is not None:
+        cache.put(input_path, info)
+    return info
+
+
+@dataclass
+class StoredDownload:
+    path: Path
+    title: str
+    stem: str
+    format_id: str
+    size: int
+
+
+class DownloadStore:
+    """Vidéos téléchargées, éviction LRU par taille.
+
+    Clé: (extracteur, ID vidéo, format demandé). Les fichiers vivent dans
+    <cache>/downloads/<extracteur>/; l'index SQLite garde le titre et le nom de fichier
+    lisible pour les recopier (lien physique) dans le dossier de sortie.
+    """
+
+    def __init__(
+        self, root: Optional[Path] = None, max_bytes: int = 20 * 1024**3
+    ) -> None:
+        self._root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @property
+    def root(self) -> Path:
+        return self._root or (default_cache_dir() / "downloads")
+
+    def _connect(self) -> sqlite3.Connection:
+        self.root.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.root / "index.sqlite"), timeout=5.0)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS downloads ("
+            " extractor TEXT NOT NULL, video_id TEXT NOT NULL,"
+            " format_spec TEXT NOT NULL, format_id TEXT NOT NULL, path TEXT NOT NULL,"
+            " size INTEGER NOT NULL, title TEXT NOT NULL, stem TEXT NOT NULL,"
+            " last_access REAL NOT NULL,"
+            " PRIMARY KEY (extractor, video_id, format_spec))"
+        )
+        return conn
+
+    def get(
+        self, extractor: str, video_id: str, format_spec: str
+    ) -> Optional[StoredDownload]:
+        """Entrée du store si son fichier est présent et complet (sinon oubliée)."""
+        key = (extractor, video_id, format_spec)
+        with self._lock:
+            try:
+                conn = self._connect()
+            except (OSError, sqlite3.Error):
+                return None
+            try:
+                with conn:
+                    row = conn.execute(
+                        "SELECT path, title, stem, format_id, size FROM downloads"
+                        " WHERE extractor=? AND video_id=? AND format_spec=?",
+                        key,
+                    ).fetchone()
+                    if row is None:
+                        return None
+                    entry = StoredDownload(Path(row[0]), row[1], row[2], row[3], row[4])
+                    try:
+                        valid = entry.path.stat().st_size == entry.size
+                    except OSError:
+                        valid = False
+                    if not valid:
+                        conn.execute(
+                            "DELETE FROM downloads"
+                            " WHERE extractor=? AND video_id=? AND format_spec=?",
+                            key,
+                        )
+                        return None
+                    conn.execute(
+                        "UPDATE downloads SET last_access=?"
+                        " WHERE extractor=? AND video_id=? AND format_spec=?",
+                        (time.time(), *key),
+                    )
+                    return entry
+            except sqlite3.Error:
+                return None
+            finally:
+                conn.close()
+
+    def put(
+        self, extractor: str, video_id: str, format_spec: str, entry: StoredDownload
+    ) -> None:
+        """Indexe un téléchargement, puis évince les plus anciens (LRU, max_bytes)."""
+        with self._lock:
+            try:
+                conn = self._connect()
+            except (OSError, sqlite3.Error):
+                return
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO downloads"
+                        " (extractor, video_id, format_spec, format_id, path, size,"
+                        " title, stem, last_access)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            extractor,
+                            video_id,
+                            format_spec,
+                            entry.format_id,
+                            str(entry.path),
+                            entry.size,
+                            entry.title,
+                            entry.stem,
+                            time.time(),
+                        ),
+                    )
+                    self._evict(conn, keep=str(entry.path))
+            except sqlite3.Error:
+                pass
+            finally:
+                conn.close()
+
+    def _evict(self, conn: sqlite3.Connection, keep: str) -> None:
+        rows = conn.execute(
+            "SELECT rowid, path, size FROM downloads ORDER BY last_access DESC"
+        ).fetchall()
+        total = 0
+        for rowid, path, size in rows:
+            total += size
+            if total <= self.max_bytes or path == keep:
+                continue
+            try:
+                Path(path).unlink()
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue
+            conn.execute("DELETE FROM downloads WHERE rowid=?", (rowid,))
+            total -= size
+
+
+_download_store: Optional[DownloadStore] = DownloadStore()
+
+
+def configure_download_store(
+    enabled: bool = True, max_bytes: Optional[int] = None
+) -> None:
+    """Remplace le store de téléchargements (enabled=False: toujours retélécharger)."""
+    global _download_store
+    if not enabled:
+        _download_store = None
+    elif max_bytes is None:
+        _download_store = DownloadStore()
+    else:
+        _download_store = DownloadStore(max_bytes=max_bytes)
+
+
+def get_download_store() -> Optional[DownloadStore]:
+    return _download_store
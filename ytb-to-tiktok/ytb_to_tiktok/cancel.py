@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import threading
+import weakref
+from pathlib import Path
+from typing import Iterable, Optional
+
+
+class Cancelled(RuntimeError):
+    """Traitement interrompu à la demande (CancelToken.cancel)."""
+
+    def __init__(self, reason: str = "annulé") -> None:
+        super().__init__(f"Traitement interrompu: {reason}")
+        self.reason = reason
+
+
+class CancelToken:
+    """Demande d'arrêt partagée entre threads.
+
+    Téléchargement, processus ffmpeg et pools du mode lot la consultent. cancel() est
+    non bloquant (utilisable depuis un gestionnaire de signal ou le thread de
+    l'interface); chaque étape consulte le jeton et lève Cancelled au plus tôt. Un jeton
+    enfant (child) est annulé avec son parent mais peut l'être seul, pour arrêter un
+    groupe de tâches.
+    """
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._children: weakref.WeakSet[CancelToken] = weakref.WeakSet()
+        self.reason: Optional[str] = None
+
+    def cancel(self, reason: str = "annulé par l'utilisateur") -> None:
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            children = list(self._children)
+        for child in children:
+            child.cancel(reason)
+
+    def child(self) -> CancelToken:
+        """Jeton annulé avec celui-ci; sa propre annulation ne remonte pas au parent."""
+        token = CancelToken()
+        with self._lock:
+            if not self._event.is_set():
+                self._children.add(token)
+                return token
+        token.cancel(self.reason or "annulé")
+        return token
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Attend l'annulation au plus `timeout` secondes; True si annulé."""
+        return self._event.wait(timeout)
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise Cancelled(self.reason or "annulé")
+
+
+def remove_partial_outputs(targets: Iterable[Path], since: float) -> None:
+    """Supprime les sorties d'un traitement interrompu ou en échec.
+
+    `targets` contient des chemins ou des motifs glob sur le nom
+    (ex: dossier/base_*.mp4). Seuls les fichiers écrits depuis `since` (time.time())
+    sont supprimés: les segments d'une exécution précédente restent en place pour la
+    reprise (manifeste).
+    """
+    for target in targets:
+        for path in target.parent.glob(target.name):
+            try:
+                # Marge d'une seconde:
+                # résolution des mtime de certains systèmes de fichiers
+                if path.is_file() and path.stat().st_mtime >= since - 1.0:
+                    path.unlink()
+            except OSError:
+                pass
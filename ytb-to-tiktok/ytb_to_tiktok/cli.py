@@ -1,19 +1,130 @@
 from __future__ import annotations
 
 import argparse
+import bisect
+import glob
+import hashlib
 import os
 import sys
-import subprocess
 import math
-from dataclasses import dataclass
+import time
+import signal
+import threading
+import shutil
+from contextlib import ExitStack, contextmanager
+from dataclasses import asdict, dataclass, replace
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Optional, Sequence
 from uuid import uuid4
 
-from rich.console import Console
-from rich.progress import Progress, BarColumn, TimeElapsedColumn, TextColumn
+# Exécution directe: python ytb_to_tiktok/cli.py
+if __package__ in (None, ""):  # pragma: no cover
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    __package__ = "ytb_to_tiktok"
+
+from . import __version__, events
+from .cancel import Cancelled, CancelToken
+from .cache import (
+    StoredDownload,
+    configure_download_store,
+    configure_media_cache,
+    get_download_store,
+    get_media_info,
+    set_cache_dir,
+)
+from .fonts import get_font_registry, reset_font_registry
+from .manifest import JobManifest, file_record, record_matches
+from .media import SCENE_SAMPLE_FPS, MediaInfo, read_segment_list
+from .profiles import (
+    DEFAULT_PROFILE,
+    PROFILE_NAMES,
+    PROFILES,
+    EncoderProfile,
+    Rendition,
+    autotune_profile,
+    parse_rendition,
+)
+from .runner import (
+    ProgressCallback,
+    ProgressEvent,
+    configure_runner,
+    progress_listener,
+    run_ffmpeg,
+)
+from .smartcut import plan_smart_cut, smart_cut, smartcut_encoder_for
+from .sources import (
+    expand_local_sources,
+    is_local_collection,
+    local_path,
+    open_local_file,
+    source_kind,
+)
+from .thumbnails import (
+    THUMBNAIL_CHOICES,
+    THUMBNAIL_FORMATS,
+    ThumbnailBranch,
+    ThumbnailOptions,
+    copy_thumbnails,
+    extract_thumbnails,
+    paired_thumbnails,
+    thumbnail_path,
+)
+from .toolchain import get_toolchain
+
+if TYPE_CHECKING:
+    from PIL import Image, ImageFont
+    from rich.console import Console
+    from rich.progress import TaskID
+
+
+class _LazyConsole:
+    """Console rich créée au premier usage.
+
+    Importer ce module (--version, --plan, GUI) ne charge donc pas rich.
+    """
+
+    _console: Optional[Console]
+
+    def __init__(self) -> None:
+        object.__setattr__(self, "_console", None)
+
+    @property
+    def rich(self) -> Console:
+        console = self._console
+        if console is None:
+            from rich.console import Console
+
+            console = Console()
+            object.__setattr__(self, "_console", console)
+        return console
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.rich, name)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        setattr(self.rich, name, value)
+
 
-console = Console()
+console = _LazyConsole()
+
+
+def _warn(message: str, *, job: Optional[str] = None) -> None:
+    """Avertissement affiché en console et publié comme événement "warning"."""
+    console.print(f"[yellow]Attention:[/] {message}")
+    events.emit("warning", job=job, message=message)
+
+
+# Moteurs de découpage disponibles pour split_video_ffmpeg
+SPLIT_MODES = ("reencode", "copy", "smart", "parallel")
+
+# Placement des coupes:
+# multiples exacts de segment_seconds, ou frontière proche (changement de plan, silence)
+CUT_STRATEGIES = ("fixed", "scene", "silence")
+
+# Recadrages verticaux (--reframe) et taille de sortie TikTok
+REFRAME_MODES = ("crop-center", "pad", "blurred-background")
+REFRAME_SIZE = (1080, 1920)
 
 
 @dataclass
@@ -22,48 +133,162 @@ class DownloadResult:
     title: str
 
 
-def ensure_ffmpeg_in_path() -> tuple[str, str]:
+@dataclass
+class LabelOptions:
+    """Style de la surimpression 'Partie X' (drawtext, ou image Pillow si rounded)."""
+
+    template: str = "Partie {i}"
+    fontsize: int = 54
+    fontcolor: str = "black"
+    position: str = "tc"
+    box: bool = True
+    boxcolor: str = "white@0.8"
+    boxborderw: int = 14
+    rounded: bool = False
+    radius: int = 24
+    padding: int = 18
+    font: Optional[str] = (
+        None  # nom ou fichier (--label-font); None: police par défaut du registre
+    )
+
+    def text_for(self, index: int, total: int) -> str:
+        return self.template.format(i=index, n=index, total=total)
+
+
+def _format_eta(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "--:--"
+    minutes, secs = divmod(int(round(seconds)), 60)
+    return (
+        f"{minutes}:{secs:02d}"
+        if minutes < 60
+        else f"{minutes // 60}h{minutes % 60:02d}"
+    )
+
+
+class _ProgressBoard:
+    """Barres de progression par étape (téléchargement, ffmpeg) pendant un bloc `with`.
+
+    Chaque processus lancé via run_ffmpeg a sa propre barre, nommée par son étape et
+    retirée quand il se termine; plusieurs barres coexistent en mode parallèle ou lot.
+    Le téléchargement yt-dlp passe par `download_hook` (à donner à download_youtube).
+    """
+
+    def __init__(self) -> None:
+        from rich.progress import (
+            BarColumn,
+            Progress,
+            TaskProgressColumn,
+            TextColumn,
+            TimeElapsedColumn,
+        )
+
+        self._progress = Progress(
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TaskProgressColumn(),
+            TextColumn("{task.fields[detail]}"),
+            TimeElapsedColumn(),
+            transient=True,
+            console=console.rich,
+        )
+        self._tasks: dict[str, TaskID] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "_ProgressBoard":
+        self._progress.start()
+        self._listener = progress_listener(self.on_ffmpeg_progress)
+        self._listener.__enter__()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._listener.__exit__(*exc_info)
+        self._progress.stop()
+
+    def _task(self, stage: str, total: Optional[float]) -> TaskID:
+        task = self._tasks.get(stage)
+        if task is None:
+            task = self._progress.add_task(stage, total=total, detail="")
+            self._tasks[stage] = task
+        return task
+
+    def _finish(self, stage: str) -> None:
+        task = self._tasks.pop(stage, None)
+        if task is not None:
+            self._progress.remove_task(task)
+
+    def on_ffmpeg_progress(self, event: ProgressEvent) -> None:
+        with self._lock:
+            if event.done:
+                self._finish(event.stage)
+                return
+            task = self._task(event.stage, event.duration)
+            details = []
+            if event.fps:
+                details.append(f"{event.fps:.0f} img/s")
+            if event.speed:
+                details.append(f"x{event.speed:.2f}")
+            if event.duration:
+                details.append(f"reste {_format_eta(event.eta)}")
+            self._progress.update(
+                task,
+                completed=min(event.out_time, event.duration or event.out_time),
+                detail=" · ".join(details),
+            )
+
+    def download_hook(self, status: dict) -> None:
+        """progress_hook yt-dlp: octets reçus / taille (ou estimée), par fichier."""
+        name = Path(status.get("filename") or status.get("tmpfilename") or "vidéo").name
+        stage = f"téléchargement · {name}"
+        with self._lock:
+            if status.get("status") != "downloading":
+                self._finish(stage)
+                return
+            total = status.get("total_bytes") or status.get("total_bytes_estimate")
+            task = self._task(stage, total)
+            speed = status.get("speed")
+            detail = (
+                f"{speed / 1024**2:.1f} Mo/s · reste {_format_eta(status.get('eta'))}"
+                if speed
+                else ""
+            )
+            self._progress.update(
+                task,
+                total=total,
+                completed=status.get("downloaded_bytes") or 0,
+                detail=detail,
+            )
+
+
+_toolchain_warning_shown = False
+
+
+def ensure_ffmpeg_in_path() -> tuple[str, Optional[str]]:
     """Ensure ffmpeg is available. imageio-ffmpeg provides a binary path we can expose.
 
-    Returns tuple of (ffmpeg_path, ffprobe_path) for direct use in subprocess calls.
+    Returns tuple of (ffmpeg_path, ffprobe_path or None) for direct use in subprocess
+    calls. La résolution est faite une seule fois par processus (et mémorisée sur
+    disque), voir toolchain.py.
     """
-    try:
-        import imageio_ffmpeg
-
-        ffmpeg_path = imageio_ffmpeg.get_ffmpeg_exe()
-        ffmpeg_dir = Path(ffmpeg_path).parent
-        
-        # Construire le chemin vers ffprobe (même répertoire que ffmpeg)
-        ffprobe_path = ffmpeg_dir / "ffprobe-win-x86_64-v7.1.exe"
-        if not ffprobe_path.exists():
-            # Essayer d'autres noms possibles
-            for name in ["ffprobe.exe", "ffprobe"]:
-                candidate = ffmpeg_dir / name
-                if candidate.exists():
-                    ffprobe_path = candidate
-                    break
-            else:
-                # Si ffprobe n'est pas trouvé, utiliser ffmpeg avec -i pour obtenir la durée
-                ffprobe_path = None
-        
-        return str(ffmpeg_path), str(ffprobe_path) if ffprobe_path else None
-    except Exception as exc:  # pragma: no cover - defensive
-        console.print(f"[yellow]Attention:[/] ffmpeg introuvable automatiquement ({exc}). Assurez-vous qu'il est installé et dans PATH.")
-        return "ffmpeg", "ffprobe"  # Fallback aux commandes système
+    global _toolchain_warning_shown
+    toolchain = get_toolchain()
+    if toolchain.resolve_error is not None and not _toolchain_warning_shown:
+        _toolchain_warning_shown = True
+        _warn(
+            f"ffmpeg introuvable automatiquement ({toolchain.resolve_error}). "
+            "Assurez-vous qu'il est installé et dans PATH."
+        )
+    return toolchain.ffmpeg, toolchain.ffprobe
 
 
-def download_youtube(
-    url: str,
+def _ydl_options(
     out_dir: Path,
     cookies_file: Optional[Path] = None,
     cookies_from_browser: Optional[str] = None,
     user_agent: Optional[str] = None,
     proxy: Optional[str] = None,
-) -> DownloadResult:
-    from yt_dlp import YoutubeDL
-
-    out_dir.mkdir(parents=True, exist_ok=True)
-
+) -> dict:
+    """Options yt-dlp communes au téléchargement et à la lecture en flux."""
     ydl_opts = {
         "outtmpl": str(out_dir / "%(title)s.%(ext)s"),
         "format": "mp4/bestvideo+bestaudio/best",
@@ -71,6 +296,9 @@ def download_youtube(
         "noplaylist": True,
         "quiet": True,
         "no_warnings": True,
+        # La progression passe par progress_hooks (barres rich),
+        # pas par la sortie texte de yt-dlp
+        "noprogress": True,
         # Améliore la compat YouTube en utilisant le client Android par défaut
         "extractor_args": {"youtube": {"player_client": ["android"]}},
     }
@@ -84,32 +312,444 @@ def download_youtube(
         ydl_opts["http_headers"] = {"User-Agent": user_agent}
     if proxy is not None:
         ydl_opts["proxy"] = proxy
+    return ydl_opts
 
-    with YoutubeDL(ydl_opts) as ydl:
-        info = ydl.extract_info(url, download=True)
-        title = info.get("title") or "video"
-        # Compute actual output path. yt-dlp may choose ext.
-        # Prefer mp4; fall back to first matching file by title.
-        candidate_mp4 = out_dir / f"{title}.mp4"
-        if candidate_mp4.exists():
-            video_path = candidate_mp4
-        else:
-            # Search any file with the exact title prefix
-            matches = list(out_dir.glob(f"{title}.*"))
-            if not matches:
-                raise FileNotFoundError("Fichier vidéo téléchargé introuvable")
-            video_path = matches[0]
 
+def _video_key(url: str) -> Optional[tuple[str, str]]:
+    """(extracteur, ID vidéo) déduits de l'URL seule, sans réseau (None si inconnu)."""
+    from yt_dlp.extractor import gen_extractor_classes  # type: ignore[import-untyped]
+
+    for ie in gen_extractor_classes():
+        if ie.suitable(url):
+            video_id = ie.get_temp_id(url)
+            return (ie.ie_key(), video_id) if video_id else None
+    return None
+
+
+def _place_download(stored: Path, target: Path) -> Path:
+    """Expose un fichier du store dans le dossier de sortie (lien, sinon copie)."""
+    if target.exists():
+        try:
+            if target.samefile(stored):
+                return target
+        except OSError:
+            pass
+        target.unlink()
+    target.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(stored, target)
+    except OSError:
+        shutil.copy2(stored, target)
+    return target
+
+
+def _downloaded_path(ydl: Any, info: dict) -> Path:
+    """Chemin réel du fichier final d'après le dict yt-dlp.
+
+    Tient compte d'une éventuelle fusion audio/vidéo.
+    """
+    for download in info.get("requested_downloads") or []:
+        if download.get("filepath"):
+            return Path(download["filepath"])
+    if info.get("filepath"):
+        return Path(info["filepath"])
+    path = Path(ydl.prepare_filename(info))
+    if not path.exists() and info.get("ext"):
+        path = path.with_suffix("." + info["ext"])
+    if not path.exists():
+        raise FileNotFoundError("Fichier vidéo téléchargé introuvable")
+    return path
+
+
+def download_youtube(
+    url: str,
+    out_dir: Path,
+    cookies_file: Optional[Path] = None,
+    cookies_from_browser: Optional[str] = None,
+    user_agent: Optional[str] = None,
+    proxy: Optional[str] = None,
+    progress_hook: Optional[Callable[[dict], None]] = None,
+    cancel: Optional[CancelToken] = None,
+) -> DownloadResult:
+    """Télécharge la vidéo dans out_dir/<titre>.<ext>.
+
+    Avec le store de téléchargements (cache.py), la vidéo est d'abord cherchée par
+    (extracteur, ID, format demandé) à partir de la seule URL: un succès ne fait aucune
+    requête réseau. Sinon elle est téléchargée dans le store puis liée dans out_dir.
+    `progress_hook` reçoit les dicts de progression yt-dlp (octets reçus, total,
+    vitesse, ETA). `cancel` interrompt le téléchargement au prochain bloc reçu; les
+    fichiers partiels sont supprimés.
+    """
+    from yt_dlp import YoutubeDL
+    from yt_dlp.utils import DownloadCancelled  # type: ignore[import-untyped]
+
+    if cancel is not None:
+        cancel.raise_if_cancelled()
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    ydl_opts = _ydl_options(
+        out_dir, cookies_file, cookies_from_browser, user_agent, proxy
+    )
+    format_spec = ydl_opts["format"]
+    hooks: list[Callable[[dict], None]] = (
+        [progress_hook] if progress_hook is not None else []
+    )
+    written: set[Path] = set()
+    if cancel is not None:
+
+        def check_cancel(status: dict) -> None:
+            for key in ("tmpfilename", "filename"):
+                if status.get(key):
+                    written.add(Path(status[key]))
+            if cancel.cancelled:
+                raise DownloadCancelled(cancel.reason)
+
+        hooks.append(check_cancel)
+        # La fusion audio/vidéo (ffmpeg lancé par yt-dlp)
+        # est elle aussi un point d'arrêt
+        ydl_opts["postprocessor_hooks"] = [check_cancel]
+    ydl_opts["progress_hooks"] = hooks
+    store = get_download_store()
+    key = _video_key(url) if store is not None else None
+    if store is not None and key is not None:
+        hit = store.get(key[0], key[1], format_spec)
+        if hit is not None:
+            video_path = _place_download(
+                hit.path, out_dir / f"{hit.stem}{hit.path.suffix}"
+            )
+            return DownloadResult(video_path=video_path, title=hit.title)
+    if store is not None:
+        ydl_opts["outtmpl"] = str(
+            store.root / "%(extractor_key)s" / "%(id)s.%(format_id)s.%(ext)s"
+        )
+
+    try:
+        with YoutubeDL(ydl_opts) as ydl:
+            if store is not None and key is None:
+                # ID non déductible de l'URL:
+                # on lit d'abord les métadonnées (sans le média)
+                info = ydl.extract_info(url, download=False)
+                key = (info.get("extractor_key") or "Generic", str(info.get("id")))
+                hit = store.get(key[0], key[1], format_spec)
+                if hit is not None:
+                    video_path = _place_download(
+                        hit.path, out_dir / f"{hit.stem}{hit.path.suffix}"
+                    )
+                    return DownloadResult(video_path=video_path, title=hit.title)
+                info = ydl.process_ie_result(info, download=True)
+            else:
+                info = ydl.extract_info(url, download=True)
+            title = info.get("title") or "video"
+            video_path = _downloaded_path(ydl, info)
+            stem = Path(ydl.prepare_filename(info, outtmpl="%(title)s.%(ext)s")).stem
+    except DownloadCancelled:
+        for path in written:
+            for leftover in (
+                path,
+                path.with_name(path.name + ".part"),
+                path.with_name(path.name + ".ytdl"),
+            ):
+                try:
+                    leftover.unlink()
+                except OSError:
+                    pass
+        raise Cancelled(
+            cancel.reason if cancel is not None and cancel.reason else "annulé"
+        ) from None
+
+    if store is not None and key is not None:
+        store.put(
+            info.get("extractor_key") or key[0],
+            str(info.get("id") or key[1]),
+            format_spec,
+            StoredDownload(
+                path=video_path,
+                title=title,
+                stem=stem,
+                format_id=str(info.get("format_id") or ""),
+                size=video_path.stat().st_size,
+            ),
+        )
+        video_path = _place_download(video_path, out_dir / f"{stem}{video_path.suffix}")
     return DownloadResult(video_path=video_path, title=title)
 
 
-def split_video_ffmpeg(input_path: Path, out_dir: Path, segment_seconds: int = 60, limit: Optional[int] = None) -> list[Path]:
+def download_http(
+    url: str,
+    out_dir: Path,
+    user_agent: Optional[str] = None,
+    proxy: Optional[str] = None,
+    progress_hook: Optional[Callable[[dict], None]] = None,
+    cancel: Optional[CancelToken] = None,
+) -> DownloadResult:
+    """Télécharge une URL HTTP(S) directe vers un fichier vidéo, sans passer par yt-dlp.
+
+    Même store que download_youtube (clé: hash de l'URL). Le fichier est écrit en .part
+    puis renommé; `progress_hook` reçoit des dicts au format yt-dlp. `cancel` interrompt
+    la lecture au prochain bloc et supprime le fichier partiel.
+    """
+    import urllib.request
+    from urllib.parse import unquote, urlparse
+
+    if cancel is not None:
+        cancel.raise_if_cancelled()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    name = Path(unquote(urlparse(url).path)).name or "video.mp4"
+    title = Path(name).stem
+    store = get_download_store()
+    video_id = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+    if store is not None:
+        hit = store.get("HTTP", video_id, "direct")
+        if hit is not None:
+            video_path = _place_download(
+                hit.path, out_dir / f"{hit.stem}{hit.path.suffix}"
+            )
+            return DownloadResult(video_path=video_path, title=hit.title)
+        target = store.root / "HTTP" / f"{video_id}{Path(name).suffix}"
+    else:
+        target = out_dir / name
+    target.parent.mkdir(parents=True, exist_ok=True)
+    partial = target.with_name(target.name + ".part")
+
+    handlers = (
+        [urllib.request.ProxyHandler({"http": proxy, "https": proxy})]
+        if proxy is not None
+        else []
+    )
+    request = urllib.request.Request(
+        url, headers={"User-Agent": user_agent} if user_agent is not None else {}
+    )
+    started = time.perf_counter()
+    downloaded = 0
+    total: Optional[int] = None
+
+    def report(status: str) -> None:
+        if progress_hook is None:
+            return
+        elapsed = time.perf_counter() - started
+        speed = downloaded / elapsed if elapsed > 0 else None
+        eta = (total - downloaded) / speed if total and speed else None
+        progress_hook(
+            {
+                "status": status,
+                "filename": str(target),
+                "downloaded_bytes": downloaded,
+                "total_bytes": total,
+                "speed": speed,
+                "eta": eta,
+            }
+        )
+
+    try:
+        with urllib.request.build_opener(*handlers).open(
+            request, timeout=30
+        ) as response, open(partial, "wb") as handle:
+            total = int(response.headers.get("Content-Length") or 0) or None
+            while True:
+                if cancel is not None and cancel.cancelled:
+                    raise Cancelled(cancel.reason or "annulé")
+                chunk = response.read(1 << 20)
+                if not chunk:
+                    break
+                handle.write(chunk)
+                downloaded += len(chunk)
+                report("downloading")
+        if total is not None and downloaded != total:
+            raise RuntimeError(
+                f"Téléchargement incomplet: {downloaded}/{total} octets reçus"
+            )
+        os.replace(partial, target)
+    except BaseException:
+        try:
+            partial.unlink()
+        except OSError:
+            pass
+        raise
+    report("finished")
+
+    if store is not None:
+        store.put(
+            "HTTP",
+            video_id,
+            "direct",
+            StoredDownload(
+                path=target,
+                title=title,
+                stem=title,
+                format_id="direct",
+                size=downloaded,
+            ),
+        )
+        target = _place_download(target, out_dir / name)
+    return DownloadResult(video_path=target, title=title)
+
+
+@dataclass
+class StreamInput:
+    url: str
+    headers: dict[str, str]
+
+
+@dataclass
+class StreamSource:
+    """Flux distant(s) lisibles directement par ffmpeg (vidéo et, si séparé, audio)."""
+
+    inputs: list[StreamInput]
+    title: str
+    stem: str
+    duration: Optional[float]
+    proxy: Optional[str] = None
+
+
+def resolve_youtube_stream(
+    url: str,
+    out_dir: Path,
+    cookies_file: Optional[Path] = None,
+    cookies_from_browser: Optional[str] = None,
+    user_agent: Optional[str] = None,
+    proxy: Optional[str] = None,
+) -> StreamSource:
+    """Résout les URL média (sans télécharger) que ffmpeg lira pendant le découpage."""
+    from yt_dlp import YoutubeDL
+
+    ydl_opts = _ydl_options(
+        out_dir, cookies_file, cookies_from_browser, user_agent, proxy
+    )
+    with YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+        stem = Path(ydl.prepare_filename(info)).stem
+
+    formats = info.get("requested_formats") or [info]
+    inputs: list[StreamInput] = []
+    for fmt in formats:
+        media_url = fmt.get("url")
+        if not media_url:
+            raise RuntimeError("URL du flux introuvable (format non lisible en flux)")
+        headers = dict(fmt.get("http_headers") or {})
+        if fmt.get("cookies"):
+            headers["Cookie"] = fmt["cookies"]
+        inputs.append(StreamInput(url=media_url, headers=headers))
+    duration = info.get("duration")
+    return StreamSource(
+        inputs=inputs,
+        title=info.get("title") or "video",
+        stem=stem,
+        duration=float(duration) if duration else None,
+        proxy=proxy,
+    )
+
+
+def _segment_pattern(base: str) -> str:
+    """Motif glob des segments <base>_%04d.mp4, et d'eux seuls.
+
+    Les segments de <base>_2 ou d'un autre titre ne correspondent pas.
+    """
+    return f"{glob.escape(base)}_[0-9][0-9][0-9][0-9].mp4"
+
+
+def resolve_http_stream(
+    url: str, user_agent: Optional[str] = None, proxy: Optional[str] = None
+) -> StreamSource:
+    """URL HTTP(S) directe lue telle quelle par ffmpeg (durée: sonde du flux)."""
+    from urllib.parse import unquote, urlparse
+
+    from .media import probe_media_info
+
+    ffmpeg_path, ffprobe_path = ensure_ffmpeg_in_path()
+    info = probe_media_info(url, ffmpeg_path, ffprobe_path)
+    stem = Path(unquote(urlparse(url).path)).stem or "video"
+    headers = {"User-Agent": user_agent} if user_agent is not None else {}
+    return StreamSource(
+        inputs=[StreamInput(url=url, headers=headers)],
+        title=stem,
+        stem=stem,
+        duration=info.duration,
+        proxy=proxy,
+    )
+
+
+def split_video_ffmpeg(
+    input_path: Path,
+    out_dir: Path,
+    segment_seconds: int = 60,
+    limit: Optional[int] = None,
+    *,
+    mode: str = "reencode",
+    keyframe_tolerance: float = 2.0,
+    cut_strategy: str = "fixed",
+    cut_tolerance: float = 3.0,
+    label: Optional[LabelOptions] = None,
+    reframe: Optional[str] = None,
+    jobs: Optional[int] = None,
+    threads_per_job: Optional[int] = None,
+    profile: Optional[EncoderProfile] = None,
+    renditions: Optional[Sequence[Rendition]] = None,
+    thumbnail: Optional[ThumbnailOptions] = None,
+    cancel: Optional[CancelToken] = None,
+    report: Optional[events.JobReporter] = None,
+) -> list[Path]:
+    """Découpe la vidéo en segments <titre>_%04d.mp4.
+
+    mode="reencode" ré-encode tout (coupes exactes); mode="copy" aligne chaque coupe sur
+    l'image clé la plus proche (dans keyframe_tolerance secondes) et copie les flux sans
+    ré-encodage; mode="smart" garde des coupes exactes en ne ré-encodant que le GOP qui
+    contient chaque coupe; mode="parallel" ré-encode chaque segment dans son propre
+    processus ffmpeg (`jobs` en parallèle, `threads_per_job` threads chacun), avec un
+    résultat identique au mode reencode.
+
+    cut_strategy="scene" déplace chaque coupe sur le meilleur changement de plan à moins
+    de `cut_tolerance` secondes, cut_strategy="silence" dans le meilleur silence
+    (audio seul décodé); l'analyse est faite une fois par source puis gardée dans le
+    cache média.
+
+    Si `label` est fourni, la surimpression "Partie X" est appliquée pendant l'encodage
+    du découpage (une seule passe décodage/encodage); cela force un chemin de
+    ré-encodage. De même pour `reframe` (voir REFRAME_MODES): le passage en vertical
+    1080x1920 se fait dans le graphe de filtres du découpage, avant le label. `profile`
+    fixe les réglages de tous les ré-encodages (défaut: DEFAULT_PROFILE). Avec
+    `renditions`, la source n'est décodée qu'une fois: après recadrage et label, le
+    graphe se divise (split) vers un encodeur par déclinaison, et chacune écrit ses
+    segments dans out_dir/<nom>/ (ré-encodage en un seul processus, quel que soit
+    `mode`). Les segments sont alors renvoyés déclinaison par déclinaison, dans l'ordre
+    de `renditions`. `thumbnail` écrit une miniature par segment, à côté de lui (voir
+    thumbnail_path et paired_thumbnails). Le ré-encodage en un processus la prend dans
+    son propre décodage (branche du graphe, après recadrage et label, avant les
+    déclinaisons qui la partagent); les autres modes n'ont pas ce décodage et font une
+    passe dédiée, arrêtée après la dernière image utile. `cancel` interrompt l'encodage
+    en cours; les segments à moitié écrits sont supprimés. `report` reçoit l'avancement
+    ffmpeg et chaque segment dès que son fichier est finalisé.
+    """
+    if mode not in SPLIT_MODES:
+        raise ValueError(
+            f"Mode de découpage inconnu: {mode} (attendu: {', '.join(SPLIT_MODES)})"
+        )
+    if reframe is not None and reframe not in REFRAME_MODES:
+        raise ValueError(
+            f"Recadrage inconnu: {reframe} (attendu: {', '.join(REFRAME_MODES)})"
+        )
+    if cut_strategy not in CUT_STRATEGIES:
+        raise ValueError(
+            f"Stratégie de coupe inconnue: {cut_strategy}"
+            f" (attendu: {', '.join(CUT_STRATEGIES)})"
+        )
+    filtered = label is not None or reframe is not None or bool(renditions)
+    profile = profile or DEFAULT_PROFILE
+    if filtered and (mode != "parallel" or renditions):
+        mode = "reencode"
     ffmpeg_path, ffprobe_path = ensure_ffmpeg_in_path()
+    if (
+        thumbnail is not None
+        and thumbnail.format == "webp"
+        and not get_toolchain().has_encoder("libwebp")
+    ):
+        raise RuntimeError(
+            "Miniatures WebP impossibles: "
+            "ffmpeg n'a pas l'encodeur libwebp (utiliser jpg)"
+        )
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    # Build segment pattern: basename_0001.mp4
+    # Segments nommés basename_0001.mp4
     base = input_path.stem
-    output_pattern = str(out_dir / f"{base}_%04d.mp4")
 
     # Probe duration
     duration = probe_duration_seconds(input_path)
@@ -118,7 +758,11 @@ def split_video_ffmpeg(input_path: Path, out_dir: Path, segment_seconds: int = 6
 
     # Si vidéo plus courte que la durée de segment demandée: produire un seul clip
     if duration <= float(segment_seconds):
-        console.print("[yellow]La vidéo est plus courte que la durée de segment demandée; un seul clip sera produit.[/]")
+        _warn(
+            "la vidéo est plus courte que la durée de segment demandée; "
+            "un seul clip sera produit."
+        )
+    if duration <= float(segment_seconds) and not filtered:
         single_out = str(out_dir / f"{base}_0000.mp4")
         cmd_single = [
             ffmpeg_path,
@@ -129,22 +773,46 @@ def split_video_ffmpeg(input_path: Path, out_dir: Path, segment_seconds: int = 6
             "copy",
             single_out,
         ]
-        proc_single = subprocess.run(cmd_single, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        proc_single = run_ffmpeg(
+            cmd_single,
+            stage=f"copie · {base}",
+            duration=duration,
+            on_progress=report.progress if report is not None else None,
+            cancel=cancel,
+            partial_outputs=[Path(single_out)],
+        )
         if proc_single.returncode != 0:
             raise RuntimeError(f"ffmpeg a échoué:\n{proc_single.stderr}")
+        if report is not None:
+            report.segment(Path(single_out), 1, 1)
+        if thumbnail is not None:
+            _thumbnails_pass(
+                ffmpeg_path,
+                input_path,
+                [Path(single_out)],
+                [0.0],
+                thumbnail,
+                duration,
+                cancel=cancel,
+            )
         return [Path(single_out)]
 
-    # Calculer des points de coupe garantissant un dernier segment >= segment_seconds
-    # Exemple: pour 12m30s et 60s -> coupes à 60,120,..., (N-1)*60 ; le dernier sera >=60s
     total_seconds = float(duration)
-    n_full = int(total_seconds // float(segment_seconds))
-    remainder = total_seconds - (n_full * float(segment_seconds))
-
-    # Générer les temps de segment uniquement jusqu'à (n_full - 1) * S si remainder > 0
-    cut_count = max(n_full - 1, 0) if remainder > 0 else max(n_full - 1, 0)
-    cut_times = [float(segment_seconds) * i for i in range(1, cut_count + 1)]
+    cut_times = _plan_cut_times(total_seconds, segment_seconds)
+    if cut_strategy != "fixed" and cut_times:
+        cut_times = _strategy_cut_times(
+            input_path,
+            cut_times,
+            cut_strategy,
+            cut_tolerance,
+            total_seconds - segment_seconds,
+            on_keyframes=mode == "copy",
+            cancel=cancel,
+        )
+    n_segments = len(cut_times) + 1
+    total = n_segments if limit is None else min(limit, n_segments)
 
-    if not cut_times:
+    if not cut_times and not filtered:
         # Il n'y a qu'un seul segment (>= segment_seconds), copier tel quel
         single_out = str(out_dir / f"{base}_0000.mp4")
         cmd_single = [
@@ -156,162 +824,1088 @@ def split_video_ffmpeg(input_path: Path, out_dir: Path, segment_seconds: int = 6
             "copy",
             single_out,
         ]
-        proc_single = subprocess.run(cmd_single, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        proc_single = run_ffmpeg(
+            cmd_single,
+            stage=f"copie · {base}",
+            duration=duration,
+            on_progress=report.progress if report is not None else None,
+            cancel=cancel,
+            partial_outputs=[Path(single_out)],
+        )
         if proc_single.returncode != 0:
             raise RuntimeError(f"ffmpeg a échoué:\n{proc_single.stderr}")
+        if report is not None:
+            report.segment(Path(single_out), 1, 1)
+        if thumbnail is not None:
+            _thumbnails_pass(
+                ffmpeg_path,
+                input_path,
+                [Path(single_out)],
+                [0.0],
+                thumbnail,
+                duration,
+                cancel=cancel,
+            )
         return [Path(single_out)]
 
+    if mode == "copy":
+        produced = _split_stream_copy(
+            ffmpeg_path,
+            ffprobe_path,
+            input_path,
+            out_dir,
+            base,
+            cut_times,
+            keyframe_tolerance,
+            cancel=cancel,
+            on_progress=(
+                report.segment_watcher(out_dir, _segment_pattern(base), limit)
+                if report is not None
+                else None
+            ),
+        )
+        for path, start, end in produced:
+            console.print(f"  [dim]{path.name}[/]: {end - start:.2f}s")
+        copied = [path for path, _, _ in produced]
+        copied = copied[:limit] if limit is not None else copied
+        if thumbnail is not None and copied:
+            starts = [start for _, start, _ in produced]
+            _thumbnails_pass(
+                ffmpeg_path,
+                input_path,
+                copied,
+                starts,
+                thumbnail,
+                total_seconds,
+                cancel=cancel,
+            )
+        return copied
+
+    if mode == "smart":
+        stream = get_media_info(input_path, ffmpeg_path, ffprobe_path).video
+        plan = None
+        encoder = smartcut_encoder_for(stream)
+        if (
+            stream is not None
+            and encoder is not None
+            and get_toolchain().has_encoder(encoder)
+        ):
+            fps = stream.fps
+            if fps is not None:
+                keyframes = (
+                    get_media_info(
+                        input_path, ffmpeg_path, ffprobe_path, with_keyframes=True
+                    ).keyframes
+                    or []
+                )
+                plan = plan_smart_cut(cut_times, keyframes, total_seconds, fps)
+        if stream is None or plan is None:
+            _warn(
+                "découpage intelligent impossible pour cette source; "
+                "ré-encodage complet."
+            )
+        else:
+            try:
+                smart_parts = smart_cut(
+                    ffmpeg_path,
+                    input_path,
+                    out_dir,
+                    base,
+                    plan,
+                    stream,
+                    limit=limit,
+                    profile=profile,
+                    cancel=cancel,
+                    report=report,
+                )
+            except Cancelled:
+                raise
+            except RuntimeError as exc:
+                # Source atypique (morceau manquant, concat refusé...):
+                # le ré-encodage reste sûr
+                _warn(
+                    "découpage intelligent en échec "
+                    f"({str(exc).splitlines()[0]}); ré-encodage complet."
+                )
+            else:
+                if thumbnail is not None and smart_parts:
+                    _thumbnails_pass(
+                        ffmpeg_path,
+                        input_path,
+                        smart_parts,
+                        [0.0] + cut_times,
+                        thumbnail,
+                        total_seconds,
+                        cancel=cancel,
+                    )
+                return smart_parts
+
+    if mode == "parallel":
+        encoded = _split_parallel(
+            ffmpeg_path,
+            input_path,
+            out_dir,
+            base,
+            cut_times,
+            limit=limit,
+            label=label,
+            reframe=reframe,
+            jobs=jobs,
+            threads_per_job=threads_per_job,
+            profile=profile,
+            duration=total_seconds,
+            cancel=cancel,
+            report=report,
+        )
+        if thumbnail is not None and encoded:
+            _thumbnails_pass(
+                ffmpeg_path,
+                input_path,
+                encoded,
+                [0.0] + cut_times,
+                thumbnail,
+                total_seconds,
+                cancel=cancel,
+            )
+        return encoded
+
     # Re-encodage avec -segment_times pour garantir des coupes exactes et dernier segment >= S
-    segment_times_arg = ",".join(f"{t:.3f}" for t in cut_times)
     cmd_segment = [
         ffmpeg_path,
         "-y",
         "-i",
         str(input_path),
-        "-c:v",
-        "libx264",
-        "-preset",
-        "veryfast",
-        "-crf",
-        "23",
-        "-c:a",
-        "aac",
-        "-b:a",
-        "128k",
-        "-f",
-        "segment",
-        "-segment_times",
-        segment_times_arg,
-        "-reset_timestamps",
-        "1",
-        output_pattern,
     ]
-    proc_segment = subprocess.run(cmd_segment, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-    if proc_segment.returncode != 0:
-        raise RuntimeError(f"ffmpeg a échoué:\n{proc_segment.stderr}")
-
-    parts = sorted(out_dir.glob(f"{base}_*.mp4"))
-    if limit is not None:
-        parts = parts[:limit]
-    return parts
+    label_frames: Optional[bytes] = None
+    filter_graph = ""
+    n_segments = len(cut_times) + 1
+    total = n_segments if limit is None else min(limit, n_segments)
+    windows: list[tuple[float, Optional[float]]] = list(
+        zip([0.0] + cut_times, cut_times + [None])
+    )[:total]
+    if label is not None or reframe is not None:
+        # Recadrage et surimpression fusionnés:
+        # chaque segment reçoit son label dans le même encodage
+        extra_inputs, filter_graph, label_frames = _segment_filter_graph(
+            label, reframe, windows
+        )
+        cmd_segment += extra_inputs
+    # Script du graphe et images candidates des miniatures
+    # (créé seulement s'il y a un graphe)
+    work_dir = out_dir / f".{base}_graph_{uuid4().hex}"
+    video_source = "[v]" if filter_graph else "[0:v:0]"
+    thumbs: Optional[ThumbnailBranch] = None
+    if thumbnail is not None:
+        # Miniatures prises dans le même décodage,
+        # sur l'image finale (recadrée, labellisée)
+        thumbs = ThumbnailBranch(
+            thumbnail,
+            windows,
+            total_seconds,
+            work_dir,
+            blurdetect=get_toolchain().has_filter("blurdetect"),
+        )
+        thumb_source = video_source
+        if filter_graph:
+            filter_graph += ";[v]split=2[vseg][vthumb]"
+            video_source, thumb_source = "[vseg]", "[vthumb]"
+        filter_graph = ";".join(
+            filter(None, [filter_graph, thumbs.graph(thumb_source)])
+        )
+    # (dossier des segments, étiquette vidéo du graphe, options d'encodage vidéo)
+    targets: list[tuple[Path, Optional[str], list[str]]]
+    if renditions:
+        # Un seul décodage: le graphe se divise vers un encodeur par déclinaison
+        fan = f"{video_source}split={len(renditions)}"
+        fan += "".join(f"[fan{i}]" for i in range(len(renditions)))
+        fan += "".join(
+            f";[fan{i}]{rendition.scale_filter()}[r{i}]"
+            for i, rendition in enumerate(renditions)
+        )
+        filter_graph = f"{filter_graph};{fan}" if filter_graph else fan
+        targets = [
+            (out_dir / rendition.name, f"[r{i}]", rendition.video_args(profile))
+            for i, rendition in enumerate(renditions)
+        ]
+    elif video_source != "[0:v:0]":
+        targets = [(out_dir, video_source, profile.video_args())]
+    else:
+        targets = [(out_dir, "0:v:0" if filter_graph else None, profile.video_args())]
+    if filter_graph:
+        work_dir.mkdir(parents=True, exist_ok=True)
+        filter_script = work_dir / "filters.txt"
+        filter_script.write_text(filter_graph, encoding="utf-8")
+        cmd_segment += ["-filter_complex_script", str(filter_script)]
+    # Images clés forcées sur les coupes (marge d'1 ms), sinon:
+    # le muxer segment attend l'image clé suivante de l'encodeur,
+    # et une coupe posée sur un changement de plan peut glisser d'un GOP
+    segment_times_arg = ",".join(f"{max(t - 0.001, 0.0):.6f}" for t in cut_times)
+    for target_dir, video_label, video_args in targets:
+        target_dir.mkdir(parents=True, exist_ok=True)
+        if video_label is not None:
+            cmd_segment += ["-map", video_label, "-map", "0:a:0?"]
+        cmd_segment += [*video_args, *profile.audio_args()]
+        if cut_times:
+            cmd_segment += [
+                "-force_key_frames",
+                segment_times_arg,
+                "-f",
+                "segment",
+                "-segment_times",
+                segment_times_arg,
+                "-reset_timestamps",
+                "1",
+                str(target_dir / f"{base}_%04d.mp4"),
+            ]
+        else:
+            cmd_segment.append(str(target_dir / f"{base}_0000.mp4"))
+    if thumbs is not None:
+        cmd_segment += thumbs.output_args()
+    # Chaque déclinaison publie ses segments finalisés dans son propre dossier
+    watchers = (
+        [
+            report.segment_watcher(target_dir, _segment_pattern(base), total)
+            for target_dir, _, _ in targets
+        ]
+        if report is not None
+        else []
+    )
 
+    def on_progress(event: ProgressEvent) -> None:
+        for watcher in watchers:
+            watcher(event)
 
-def probe_duration_seconds(input_path: Path) -> Optional[float]:
-    ffmpeg_path, ffprobe_path = ensure_ffmpeg_in_path()
-    
-    # Si ffprobe n'est pas disponible, utiliser ffmpeg avec -i pour obtenir la durée
-    if ffprobe_path is None:
-        return _get_duration_with_ffmpeg(input_path, ffmpeg_path)
-    
-    cmd = [
-        ffprobe_path,
-        "-v",
-        "error",
-        "-show_entries",
-        "format=duration",
-        "-of",
-        "default=noprint_wrappers=1:nokey=1",
-        str(input_path),
-    ]
-    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-    if proc.returncode != 0:
-        return None
+    parts: list[Path] = []
     try:
-        return float(proc.stdout.strip())
-    except ValueError:
-        return None
+        proc_segment = run_ffmpeg(
+            cmd_segment,
+            stage=f"découpage · {base}",
+            duration=total_seconds,
+            on_progress=on_progress if watchers else None,
+            cancel=cancel,
+            partial_outputs=[
+                target_dir / _segment_pattern(base) for target_dir, _, _ in targets
+            ],
+            stdin_data=label_frames,
+            on_stderr_line=thumbs.on_stderr_line if thumbs is not None else None,
+        )
+        if proc_segment.returncode != 0:
+            raise RuntimeError(f"ffmpeg a échoué:\n{proc_segment.stderr}")
+        written: list[Optional[Path]] = []
+        for target_dir, _, _ in targets:
+            segments = sorted(target_dir.glob(_segment_pattern(base)))
+            segments = segments[:limit] if limit is not None else segments
+            if thumbs is not None:
+                # Une miniature par segment,
+                # reprise telle quelle dans chaque déclinaison
+                if not written:
+                    written = thumbs.finish(segments)
+                else:
+                    copy_thumbnails(written, segments, thumbs.options)
+            parts += segments
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return parts
 
 
-def _get_duration_with_ffmpeg(input_path: Path, ffmpeg_path: str) -> Optional[float]:
-    """Obtenir la durée d'une vidéo en utilisant ffmpeg -i (fallback si ffprobe n'est pas disponible)."""
-    cmd = [
+def _thumbnails_pass(
+    ffmpeg_path: str,
+    input_path: Path,
+    parts: list[Path],
+    starts: list[float],
+    thumbnail: ThumbnailOptions,
+    duration: float,
+    cancel: Optional[CancelToken] = None,
+) -> None:
+    """Miniatures des segments découpés sans décodage complet (une passe dédiée)."""
+    windows: list[tuple[float, Optional[float]]] = list(
+        zip(starts, list(starts[1:]) + [None])
+    )
+    written = extract_thumbnails(
         ffmpeg_path,
-        "-i",
-        str(input_path),
-    ]
-    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-    if proc.returncode != 0:
-        # ffmpeg -i retourne toujours un code d'erreur, mais la durée est dans stderr
-        stderr_output = proc.stderr
-        
-        # Chercher la ligne "Duration: HH:MM:SS.xx"
-        import re
-        duration_match = re.search(r"Duration: (\d{2}):(\d{2}):(\d{2})\.(\d{2})", stderr_output)
-        if duration_match:
-            hours = int(duration_match.group(1))
-            minutes = int(duration_match.group(2))
-            seconds = int(duration_match.group(3))
-            centiseconds = int(duration_match.group(4))
-            
-            total_seconds = hours * 3600 + minutes * 60 + seconds + centiseconds / 100.0
-            return total_seconds
-    
-    return None
+        input_path,
+        parts,
+        windows,
+        thumbnail,
+        duration,
+        blurdetect=get_toolchain().has_filter("blurdetect"),
+        cancel=cancel,
+    )
+    console.print(
+        f"  [dim]{sum(1 for path in written if path is not None)} miniature(s)"
+        f" ({thumbnail.choice})[/]"
+    )
 
 
-def _escape_drawtext_text(text: str) -> str:
-    """Échapper les caractères spéciaux pour ffmpeg drawtext."""
-    escaped = text.replace('\\', '\\\\')
-    escaped = escaped.replace(':', '\\:')
-    escaped = escaped.replace("'", "\\'")
-    return escaped
+def _plan_cut_times(duration: float, segment_seconds: int) -> list[float]:
+    """Calculer des points de coupe garantissant un dernier segment >= segment_seconds.
 
+    Exemple: pour 12m30s et 60s -> coupes à 60,120,..., (N-1)*60 ; le dernier sera >=60s
+    """
+    total_seconds = float(duration)
+    n_full = int(total_seconds // float(segment_seconds))
+    remainder = total_seconds - (n_full * float(segment_seconds))
 
-def _find_default_fontfile() -> Optional[str]:
-    """Essaye de trouver une police par défaut sur Windows; renvoie un chemin POSIX pour ffmpeg."""
-    candidates = [
-        Path("C:/Windows/Fonts/arial.ttf"),
-        Path("C:/Windows/Fonts/ARIAL.TTF"),
-        Path("C:/Windows/Fonts/segoeui.ttf"),
-        Path("C:/Windows/Fonts/SegoeUI.ttf"),
-    ]
-    for path in candidates:
-        if path.exists():
-            # drawtext utilise ':' comme séparateur d'options -> échapper le ':' du lecteur Windows
-            posix_path = path.as_posix().replace(":", "\\:")
-            return posix_path
-    return None
+    # Générer les temps de segment uniquement jusqu'à (n_full - 1) * S si remainder > 0
+    cut_count = max(n_full - 1, 0) if remainder > 0 else max(n_full - 1, 0)
+    return [float(segment_seconds) * i for i in range(1, cut_count + 1)]
+
+
+def _snap_cuts_to_boundaries(
+    cut_times: list[float],
+    boundaries: list[list[float]],
+    tolerance: float,
+    latest: float,
+) -> tuple[list[float], int]:
+    """Déplace chaque coupe sur la meilleure frontière à moins de `tolerance` secondes.
+
+    Une frontière est un intervalle [début, fin, score] trié (début == fin pour un
+    instant): la coupe s'y pose au point le plus proche de la coupe prévue. La meilleure
+    est celle de plus haut score, pénalisé jusqu'à moitié au bord de la fenêtre. Aucune
+    coupe n'est perdue: chacune reste au moins 1 s après la précédente et 1 s avant la
+    coupe prévue suivante (garder la coupe prévue reste donc toujours possible), et la
+    dernière ne dépasse pas `latest` (le dernier segment garde sa durée minimale). Sans
+    frontière dans la fenêtre, la coupe reste en place. Renvoie (coupes, nb de coupes
+    réellement déplacées).
+    """
+    ends = [boundary[1] for boundary in boundaries]
+    snapped: list[float] = []
+    moved = 0
+    for index, cut in enumerate(cut_times):
+        low = max(cut - tolerance, snapped[-1] + 1.0 if snapped else 1.0)
+        if index == len(cut_times) - 1:
+            high = min(cut + tolerance, latest)
+        else:
+            high = min(cut + tolerance, cut_times[index + 1] - 1.0)
+        best: Optional[tuple[float, float]] = None
+        if low <= high:
+            for start, end, score in boundaries[bisect.bisect_left(ends, low) :]:
+                if start > high:
+                    break
+                position = min(max(cut, start, low), end, high)
+                weight = (
+                    score * (1 - 0.5 * abs(position - cut) / tolerance)
+                    if tolerance > 0
+                    else score
+                )
+                if best is None or weight > best[0]:
+                    best = (weight, round(position, 3))
+        position = best[1] if best is not None else cut
+        if position != cut:
+            moved += 1
+        snapped.append(position)
+    return snapped, moved
+
+
+def _cut_boundaries(info: MediaInfo, strategy: str) -> list[list[float]]:
+    """Frontières [début, fin, score] candidates pour `strategy` (cache média).
+
+    scene: chaque changement de plan, score = score de scène. silence: l'intérieur de
+    chaque silence (0,1 s de marge de chaque côté quand il est assez long), score =
+    durée du silence plafonnée à 2 s (au-delà, une pause plus longue n'est pas une
+    meilleure coupe).
+    """
+    if strategy == "scene":
+        return [[time_, time_, score] for time_, score in info.scenes or []]
+    boundaries: list[list[float]] = []
+    for start, end in info.silences or []:
+        margin = min(0.1, (end - start) / 2)
+        boundaries.append([start + margin, end - margin, min(end - start, 2.0)])
+    return boundaries
 
 
-def _position_expressions(position: str) -> tuple[str, str]:
-    """Renvoie les expressions x,y drawtext pour une position donnée."""
-    if position == "tl":
-        return ("20", "20")
-    if position == "tr":
-        return ("w-text_w-20", "20")
-    if position == "tc":
-        return ("(w-text_w)/2", "20")
-    if position == "bl":
-        return ("20", "h-text_h-20")
-    if position == "br":
-        return ("w-text_w-20", "h-text_h-20")
-    return ("(w-text_w)/2", "(h-text_h)/2")
+def _strategy_cut_times(
+    input_path: Path,
+    cut_times: list[float],
+    strategy: str,
+    tolerance: float,
+    latest: float,
+    on_keyframes: bool = False,
+    cancel: Optional[CancelToken] = None,
+) -> list[float]:
+    """Coupes du plan fixe recalées selon `strategy` (voir CUT_STRATEGIES).
+
+    L'analyse (changements de plan, ou silences sur l'audio seul) n'est faite qu'une
+    fois par source: elle est gardée dans le cache média avec la sonde. Avec
+    `on_keyframes` (découpage copy), seules les images clés de la source situées sur une
+    frontière sont candidates: une autre coupe serait de toute façon reportée sur
+    l'image clé suivante.
+    """
+    ffmpeg_path, ffprobe_path = ensure_ffmpeg_in_path()
+    info = get_media_info(
+        input_path,
+        ffmpeg_path,
+        ffprobe_path,
+        with_keyframes=on_keyframes,
+        with_scenes=strategy == "scene",
+        with_silences=strategy == "silence",
+        cancel=cancel,
+    )
+    boundaries = _cut_boundaries(info, strategy)
+    if on_keyframes:
+        keyframes = info.keyframes or []
+        # Un changement de plan est daté à une image d'analyse près
+        pad = 1 / SCENE_SAMPLE_FPS if strategy == "scene" else 0.0
+        aligned: list[list[float]] = []
+        for start, end, score in boundaries:
+            first = bisect.bisect_left(keyframes, start - pad)
+            last = bisect.bisect_right(keyframes, end + pad)
+            aligned.extend([k, k, score] for k in keyframes[first:last])
+        boundaries = sorted(aligned)
+    snapped, moved = _snap_cuts_to_boundaries(cut_times, boundaries, tolerance, latest)
+    what = "un changement de plan" if strategy == "scene" else "un silence"
+    console.print(
+        f"  [dim]{moved}/{len(cut_times)} coupe(s) alignée(s) sur {what}"
+        f" (±{tolerance:g}s)[/]"
+    )
+    return snapped
 
 
-def overlay_text_on_video(
-    input_path: Path,
-    output_path: Path,
-    text: str,
+def split_stream_ffmpeg(
+    source: StreamSource,
+    out_dir: Path,
+    segment_seconds: int = 60,
+    limit: Optional[int] = None,
     *,
-    fontsize: int = 54,
-    fontcolor: str = "black",
-    box: bool = True,
-    boxcolor: str = "white@0.8",
-    boxborderw: int = 14,
-    position: str = "tc",
-) -> None:
-    """Ajoute une surimpression de texte via ffmpeg drawtext."""
+    label: Optional[LabelOptions] = None,
+    reframe: Optional[str] = None,
+    keep_copy: Optional[Path] = None,
+    profile: Optional[EncoderProfile] = None,
+    thumbnail: Optional[ThumbnailOptions] = None,
+    cancel: Optional[CancelToken] = None,
+    report: Optional[events.JobReporter] = None,
+) -> list[Path]:
+    """Découpe un flux distant pendant sa lecture.
+
+    Le segment 1 s'encode pendant que la suite arrive. ffmpeg lit directement les URL
+    résolues par yt-dlp (vidéo + audio éventuellement séparés), ré-encode avec
+    -segment_times et, si `keep_copy` est donné, écrit en même temps une copie (-c copy)
+    de la source pour les découpages suivants. Avec `limit`, la lecture s'arrête à la
+    fin du dernier segment conservé. `thumbnail`: miniatures prises dans le même
+    décodage, comme pour split_video_ffmpeg. `report` reçoit l'avancement et chaque
+    segment finalisé.
+    """
+    if source.duration is None:
+        raise RuntimeError(
+            "Durée du flux inconnue (direct ?): le découpage en flux est impossible"
+        )
+    profile = profile or DEFAULT_PROFILE
     ffmpeg_path, _ = ensure_ffmpeg_in_path()
+    out_dir.mkdir(parents=True, exist_ok=True)
 
-    text_escaped = _escape_drawtext_text(text)
-    fontfile = _find_default_fontfile()
-    x_expr, y_expr = _position_expressions(position)
-
-    drawtext_kvs: list[str] = []
-    if fontfile is not None:
-        drawtext_kvs.append(f"fontfile='{fontfile}'")
-    else:
-        # Fallback via fontconfig; la build Windows utilisée l'active généralement
+    base = source.stem
+    cut_times = _plan_cut_times(source.duration, segment_seconds)
+    n_segments = len(cut_times) + 1
+    total = n_segments if limit is None else min(limit, n_segments)
+    stop_at = cut_times[total - 1] if total < n_segments else None
+    cut_times = cut_times[: total - 1]
+
+    cmd = [ffmpeg_path, "-y"]
+    for stream_input in source.inputs:
+        if stream_input.headers:
+            cmd += [
+                "-headers",
+                "".join(f"{k}: {v}\r\n" for k, v in stream_input.headers.items()),
+            ]
+        if source.proxy is not None:
+            cmd += ["-http_proxy", source.proxy]
+        cmd += [
+            "-reconnect",
+            "1",
+            "-reconnect_streamed",
+            "1",
+            "-reconnect_delay_max",
+            "5",
+        ]
+        if stop_at is not None:
+            cmd += ["-t", f"{stop_at:.3f}"]
+        cmd += ["-i", stream_input.url]
+    audio_map = "1:a:0" if len(source.inputs) > 1 else "0:a:0?"
+
+    # Script du graphe et images candidates des miniatures
+    # (créé seulement s'il y a un graphe)
+    work_dir = out_dir / f".{base}_graph_{uuid4().hex}"
+    label_frames: Optional[bytes] = None
+    video_map = "0:v:0"
+    filter_graph = ""
+    windows: list[tuple[float, Optional[float]]] = list(
+        zip([0.0] + cut_times, list(cut_times) + [None])
+    )
+    if label is not None or reframe is not None:
+        extra_inputs, filter_graph, label_frames = _segment_filter_graph(
+            label, reframe, windows, input_count=len(source.inputs)
+        )
+        cmd += extra_inputs
+        video_map = "[v]"
+    thumbs: Optional[ThumbnailBranch] = None
+    if thumbnail is not None:
+        thumbs = ThumbnailBranch(
+            thumbnail,
+            windows,
+            stop_at or source.duration,
+            work_dir,
+            blurdetect=get_toolchain().has_filter("blurdetect"),
+        )
+        thumb_source = "[0:v:0]"
+        if filter_graph:
+            filter_graph += ";[v]split=2[vseg][vthumb]"
+            video_map, thumb_source = "[vseg]", "[vthumb]"
+        filter_graph = ";".join(
+            filter(None, [filter_graph, thumbs.graph(thumb_source)])
+        )
+    if filter_graph:
+        work_dir.mkdir(parents=True, exist_ok=True)
+        filter_script = work_dir / "filters.txt"
+        filter_script.write_text(filter_graph, encoding="utf-8")
+        cmd += ["-filter_complex_script", str(filter_script)]
+    cmd += [
+        "-map",
+        video_map,
+        "-map",
+        audio_map,
+        *profile.video_args(),
+        *profile.audio_args(),
+    ]
+    if cut_times:
+        # Images clés forcées sur les coupes
+        # (marge d'1 ms, comme pour le découpage intelligent)
+        split_points = ",".join(f"{max(t - 0.001, 0.0):.6f}" for t in cut_times)
+        cmd += [
+            "-force_key_frames",
+            split_points,
+            "-f",
+            "segment",
+            "-segment_times",
+            split_points,
+            "-reset_timestamps",
+            "1",
+            str(out_dir / f"{base}_%04d.mp4"),
+        ]
+    else:
+        cmd.append(str(out_dir / f"{base}_0000.mp4"))
+    if keep_copy is not None:
+        keep_copy.parent.mkdir(parents=True, exist_ok=True)
+        cmd += ["-map", "0:v:0", "-map", audio_map, "-c", "copy", str(keep_copy)]
+    if thumbs is not None:
+        cmd += thumbs.output_args()
+    parts = [out_dir / f"{base}_{index:04d}.mp4" for index in range(total)]
+    try:
+        partial = [out_dir / _segment_pattern(base)] + (
+            [keep_copy] if keep_copy is not None else []
+        )
+        proc = run_ffmpeg(
+            cmd,
+            stage=f"flux · {base}",
+            duration=stop_at or source.duration,
+            on_progress=(
+                report.segment_watcher(out_dir, _segment_pattern(base), total)
+                if report is not None
+                else None
+            ),
+            cancel=cancel,
+            partial_outputs=partial,
+            stdin_data=label_frames,
+            on_stderr_line=thumbs.on_stderr_line if thumbs is not None else None,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"ffmpeg (flux) a échoué:\n{proc.stderr}")
+        if thumbs is not None:
+            thumbs.finish(parts)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return parts
+
+
+def _split_parallel(
+    ffmpeg_path: str,
+    input_path: Path,
+    out_dir: Path,
+    base: str,
+    cut_times: list[float],
+    *,
+    limit: Optional[int] = None,
+    label: Optional[LabelOptions] = None,
+    reframe: Optional[str] = None,
+    jobs: Optional[int] = None,
+    threads_per_job: Optional[int] = None,
+    profile: EncoderProfile = DEFAULT_PROFILE,
+    duration: Optional[float] = None,
+    cancel: Optional[CancelToken] = None,
+    report: Optional[events.JobReporter] = None,
+) -> list[Path]:
+    """Ré-encode chaque segment indépendamment, plusieurs processus ffmpeg à la fois.
+
+    Chaque plage est lue avec un -ss d'entrée (recherche exacte en ré-encodage) et
+    limitée par -t; chaque processus reçoit son propre budget de threads libx264.
+    """
+    starts = [0.0] + cut_times
+    ends: list[Optional[float]] = list(cut_times) + [None]
+    ranges = list(zip(starts, ends))
+    if limit is not None:
+        ranges = ranges[:limit]
+    total = len(ranges)
+
+    cpu_count = os.cpu_count() or 1
+    if jobs is None:
+        # libx264 veryfast sature rarement plus de ~4 threads par flux 720p/1080p
+        jobs = max(1, cpu_count // 4)
+    jobs = max(1, min(jobs, total))
+    if threads_per_job is None:
+        threads_per_job = max(1, cpu_count // jobs)
+
+    def encode_range(index: int) -> Path:
+        start, end = ranges[index]
+        out_path = out_dir / f"{base}_{index:04d}.mp4"
+        cmd = [
+            ffmpeg_path,
+            "-y",
+            "-threads",
+            str(threads_per_job),
+            "-ss",
+            f"{start:.3f}",
+        ]
+        if end is not None:
+            cmd += ["-t", f"{end - start:.3f}"]
+        cmd += ["-i", str(input_path)]
+        label_frames: Optional[bytes] = None
+        if label is not None or reframe is not None:
+            extra_inputs, filter_graph, label_frames = _segment_filter_graph(
+                label, reframe, [(0.0, None)], first_index=index + 1, total=total
+            )
+            cmd += extra_inputs
+            cmd += ["-filter_complex", filter_graph, "-map", "[v]", "-map", "0:a:0?"]
+        cmd += [
+            "-filter_threads",
+            "1",
+            *profile.video_args(threads=threads_per_job),
+            *profile.audio_args(),
+            str(out_path),
+        ]
+        siblings.raise_if_cancelled()
+        range_end = end if end is not None else duration
+        proc = run_ffmpeg(
+            cmd,
+            stage=f"segment {index + 1}/{total} · {base}",
+            duration=range_end - start if range_end is not None else None,
+            on_progress=report.progress if report is not None else None,
+            cancel=siblings,
+            partial_outputs=[out_path],
+            stdin_data=label_frames,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"ffmpeg (segment {index}) a échoué:\n{proc.stderr}")
+        if report is not None:
+            report.segment(out_path, index + 1, total)
+        return out_path
+
+    # Premier échec: les autres plages sont interrompues, inutile de les finir
+    # (jeton enfant: l'annulation globale les arrête aussi);
+    # run_ffmpeg supprime leurs sorties partielles
+    siblings = cancel.child() if cancel is not None else CancelToken()
+    # Les encodages tournent dans des processus ffmpeg;
+    # des threads suffisent pour les piloter
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(encode_range, index) for index in range(total)]
+        first_error: Optional[BaseException] = None
+        for future in as_completed(futures):
+            error = future.exception()
+            if error is not None and first_error is None:
+                first_error = error
+                siblings.cancel("une autre plage a échoué")
+    if first_error is not None:
+        raise first_error
+    return [future.result() for future in futures]
+
+
+def _effective_label(label: LabelOptions) -> LabelOptions:
+    """Bascule un label drawtext sur un rendu Pillow si ce ffmpeg ne peut l'afficher."""
+    if label.rounded or get_toolchain().drawtext_usable(_label_fontfile(label.font)):
+        return label
+    return replace(
+        label,
+        rounded=True,
+        radius=0,
+        padding=label.boxborderw,
+        boxcolor=label.boxcolor if label.box else "black@0",
+    )
+
+
+def _fused_label_graph(
+    label: LabelOptions,
+    windows: list[tuple[float, Optional[float]]],
+    *,
+    first_index: int = 1,
+    total: Optional[int] = None,
+    input_count: int = 1,
+    video_in: str = "[0:v]",
+) -> tuple[list[str], str, Optional[bytes]]:
+    """Graphe de filtres étiquetant chaque fenêtre [début, fin) du label de son segment.
+
+    drawtext: un filtre par segment, activé uniquement sur sa fenêtre temporelle. Pillow
+    (rounded): les labels sont rendus sur un même canevas et envoyés à ffmpeg en
+    rawvideo sur son entrée standard (une image par segment, datée du début de sa
+    fenêtre par setpts), puis superposés à la vidéo. La première fenêtre porte le numéro
+    `first_index` sur `total` (défaut: nombre de fenêtres). La vidéo est lue sur
+    `video_in` (entrée 0 par défaut); le flux de labels est ajouté après les
+    `input_count` entrées existantes. Renvoie (entrées ffmpeg supplémentaires, graphe
+    avec sortie [v], données pour stdin_data).
+    """
+    if total is None:
+        total = len(windows)
+    label = _effective_label(label)
+    if not label.rounded:
+        filters = []
+        for index, (start, end) in enumerate(windows, start=first_index):
+            enable = (
+                f"gte(t,{start:.3f})"
+                if end is None
+                else f"gte(t,{start:.3f})*lt(t,{end:.3f})"
+            )
+            filters.append(
+                _drawtext_filter(
+                    label.text_for(index, total),
+                    fontsize=label.fontsize,
+                    fontcolor=label.fontcolor,
+                    box=label.box,
+                    boxcolor=label.boxcolor,
+                    boxborderw=label.boxborderw,
+                    position=label.position,
+                    enable=enable,
+                    font=label.font,
+                )
+            )
+        return [], video_in + ",".join(filters) + "[v]", None
+
+    from PIL import Image
+
+    images = [
+        _render_label_image(
+            label.text_for(index, total),
+            fontsize=label.fontsize,
+            fontcolor=label.fontcolor,
+            bg_color=label.boxcolor,
+            padding=label.padding,
+            radius=label.radius,
+            font=label.font,
+        )
+        for index in range(first_index, first_index + len(windows))
+    ]
+    # Canevas commun: chaque label est calé du côté de son ancrage,
+    # pour garder sa position
+    canvas_w = max(img.width for img in images)
+    canvas_h = max(img.height for img in images)
+    frames = []
+    for img in images:
+        if label.position in ("tl", "bl"):
+            x = 0
+        elif label.position in ("tr", "br"):
+            x = canvas_w - img.width
+        else:
+            x = (canvas_w - img.width) // 2
+        if label.position in ("tl", "tr", "tc"):
+            y = 0
+        elif label.position in ("bl", "br"):
+            y = canvas_h - img.height
+        else:
+            y = (canvas_h - img.height) // 2
+        # Image du cache de rendu: la copier sur un canevas neuf plutôt que la modifier
+        canvas = Image.new("RGBA", (canvas_w, canvas_h), (0, 0, 0, 0))
+        canvas.paste(img, (x, y))
+        frames.append(canvas.tobytes())
+
+    # Image n affichée dès le début de la fenêtre n:
+    # overlay garde la dernière image reçue
+    # (eof_action=repeat pour la dernière fenêtre).
+    # Base de temps de 1 ms pour des coupes non entières.
+    pts = "+".join(f"eq(N,{n})*{start:.6f}" for n, (start, _) in enumerate(windows))
+    x_expr, y_expr = _overlay_position_exprs(label.position)
+    graph = (
+        f"[{input_count}:v]setpts='({pts})/TB'[lb];"
+        f"{video_in}[lb]overlay=x={x_expr}:y={y_expr}:eof_action=repeat[v]"
+    )
+    inputs = [
+        "-f",
+        "rawvideo",
+        "-pix_fmt",
+        "rgba",
+        "-s",
+        f"{canvas_w}x{canvas_h}",
+        "-framerate",
+        "1000",
+        "-i",
+        "pipe:0",
+    ]
+    return inputs, graph, b"".join(frames)
+
+
+def _reframe_filter(
+    mode: str, video_in: str, video_out: str, size: tuple[int, int] = REFRAME_SIZE
+) -> str:
+    """Chaîne de filtres passant la vidéo en vertical `size`.
+
+    Modes: crop-center, pad ou blurred-background.
+    """
+    width, height = size
+    if mode == "crop-center":
+        return (
+            f"{video_in}scale={width}:{height}:force_original_aspect_ratio=increase,"
+            f"crop={width}:{height},setsar=1{video_out}"
+        )
+    if mode == "pad":
+        return (
+            f"{video_in}scale={width}:{height}:force_original_aspect_ratio=decrease,"
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:black,setsar=1{video_out}"
+        )
+    if mode == "blurred-background":
+        # Le fond est flouté en basse définition (1/4) puis agrandi:
+        # même rendu, bien moins de calcul
+        small_w, small_h = width // 4, height // 4
+        return (
+            f"{video_in}split=2[rf_bg][rf_fg];"
+            f"[rf_bg]scale={small_w}:{small_h}:force_original_aspect_ratio=increase,"
+            f"crop={small_w}:{small_h},boxblur=10:2,scale={width}:{height}[rf_blur];"
+            f"[rf_fg]scale={width}:{height}:force_original_aspect_ratio=decrease"
+            "[rf_main];"
+            f"[rf_blur][rf_main]overlay=(W-w)/2:(H-h)/2,setsar=1{video_out}"
+        )
+    raise ValueError(f"Recadrage inconnu: {mode} (attendu: {', '.join(REFRAME_MODES)})")
+
+
+def _segment_filter_graph(
+    label: Optional[LabelOptions],
+    reframe: Optional[str],
+    windows: list[tuple[float, Optional[float]]],
+    *,
+    first_index: int = 1,
+    total: Optional[int] = None,
+    input_count: int = 1,
+) -> tuple[list[str], str, Optional[bytes]]:
+    """Graphe du ré-encodage de découpage: recadrage vertical puis label, sortie [v].
+
+    Renvoie aussi les images de labels à envoyer sur l'entrée standard de ffmpeg
+    (voir _fused_label_graph).
+    """
+    if reframe is None:
+        assert label is not None
+        return _fused_label_graph(
+            label,
+            windows,
+            first_index=first_index,
+            total=total,
+            input_count=input_count,
+        )
+    if label is None:
+        return [], _reframe_filter(reframe, "[0:v]", "[v]"), None
+    extra_inputs, label_graph, label_frames = _fused_label_graph(
+        label,
+        windows,
+        first_index=first_index,
+        total=total,
+        input_count=input_count,
+        video_in="[rf]",
+    )
+    return (
+        extra_inputs,
+        _reframe_filter(reframe, "[0:v]", "[rf]") + ";" + label_graph,
+        label_frames,
+    )
+
+
+def _snap_to_keyframes(
+    cut_times: list[float], keyframes: list[float], tolerance: float
+) -> tuple[list[float], int, list[float]]:
+    """Aligne chaque coupe sur l'image clé la plus proche, à `tolerance` secondes près.
+
+    Hors tolérance, la coupe est reportée sur l'image clé suivante (c'est là que le
+    muxer segment couperait de toute façon en copie de flux). `keyframes` est trié.
+    Renvoie (coupes alignées, nb hors tolérance, coupes abandonnées): une coupe est
+    abandonnée si aucune image clé ne la suit ou si elle tombe sur la même image clé que
+    la précédente.
+    """
+    snapped: list[float] = []
+    dropped: list[float] = []
+    out_of_tolerance = 0
+    inner = keyframes[bisect.bisect_right(keyframes, 0.0) :]
+    for cut in cut_times:
+        index = bisect.bisect_left(inner, cut)
+        before = inner[index - 1] if index > 0 else None
+        after = inner[index] if index < len(inner) else None
+        if before is None or (after is not None and after - cut < cut - before):
+            nearest = after
+        else:
+            nearest = before
+        if nearest is None:
+            dropped.append(cut)
+            continue
+        if abs(nearest - cut) > tolerance:
+            out_of_tolerance += 1
+            if after is None:
+                dropped.append(cut)
+                continue
+            nearest = after
+        # Les coupes doivent rester strictement croissantes
+        if snapped and nearest <= snapped[-1]:
+            dropped.append(cut)
+            continue
+        snapped.append(nearest)
+    return snapped, out_of_tolerance, dropped
+
+
+def _split_stream_copy(
+    ffmpeg_path: str,
+    ffprobe_path: Optional[str],
+    input_path: Path,
+    out_dir: Path,
+    base: str,
+    cut_times: list[float],
+    tolerance: float,
+    cancel: Optional[CancelToken] = None,
+    on_progress: Optional[ProgressCallback] = None,
+) -> list[tuple[Path, float, float]]:
+    """Découpe sans ré-encodage (-c copy) sur des coupes alignées aux images clés.
+
+    Renvoie la liste (segment, début, fin) dans la source, lue depuis la liste CSV du
+    muxer segment.
+    """
+    info = get_media_info(input_path, ffmpeg_path, ffprobe_path, with_keyframes=True)
+    keyframes = info.keyframes or []
+    snapped, out_of_tolerance, dropped = _snap_to_keyframes(
+        cut_times, keyframes, tolerance
+    )
+    if out_of_tolerance:
+        _warn(
+            f"{out_of_tolerance} coupe(s) sans image clé à moins de {tolerance:g}s; "
+            "reportée(s) sur l'image clé suivante."
+        )
+    if dropped:
+        _warn(
+            f"{len(dropped)} coupe(s) abandonnée(s) (aucune image clé propre): "
+            + ", ".join(f"{cut:g}s" for cut in dropped)
+            + "; les segments voisins sont fusionnés."
+        )
+
+    output_pattern = str(out_dir / f"{base}_%04d.mp4")
+    list_path = out_dir / f"{base}_segments_{uuid4().hex}.csv"
+    cmd = [
+        ffmpeg_path,
+        "-y",
+        "-i",
+        str(input_path),
+        "-c",
+        "copy",
+        "-f",
+        "segment",
+        "-segment_list",
+        str(list_path),
+        "-segment_list_type",
+        "csv",
+        "-reset_timestamps",
+        "1",
+    ]
+    if snapped:
+        # Marge d'1 ms:
+        # les pts arrondis ne doivent pas dépasser celui de l'image clé visée
+        cmd += [
+            "-segment_times",
+            ",".join(f"{max(t - 0.001, 0.0):.6f}" for t in snapped),
+        ]
+    else:
+        # Aucune coupe possible: un seul segment couvrant toute la vidéo
+        cmd += ["-segment_time", "1e9"]
+    cmd.append(output_pattern)
+    try:
+        proc = run_ffmpeg(
+            cmd,
+            stage=f"copie · {base}",
+            duration=info.duration,
+            on_progress=on_progress,
+            cancel=cancel,
+            partial_outputs=[out_dir / _segment_pattern(base)],
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"ffmpeg (copie) a échoué:\n{proc.stderr}")
+        entries = read_segment_list(list_path)
+    finally:
+        try:
+            if list_path.exists():
+                list_path.unlink()
+        except Exception:
+            pass
+    return [(out_dir / name, start, end) for name, start, end in entries]
+
+
+def probe_duration_seconds(input_path: Path) -> Optional[float]:
+    """Durée de la vidéo en secondes, via le cache média (sondée au premier appel)."""
+    ffmpeg_path, ffprobe_path = ensure_ffmpeg_in_path()
+    try:
+        return get_media_info(input_path, ffmpeg_path, ffprobe_path).duration
+    except RuntimeError:
+        return None
+
+
+def _escape_drawtext_text(text: str) -> str:
+    """Échapper les caractères spéciaux pour ffmpeg drawtext."""
+    escaped = text.replace('\\', '\\\\')
+    escaped = escaped.replace(':', '\\:')
+    escaped = escaped.replace("'", "\\'")
+    return escaped
+
+
+def _label_fontfile(font: Optional[str] = None) -> Optional[str]:
+    """Fichier de la police du label (--label-font, sinon police par défaut)."""
+    entry = get_font_registry().resolve(font)
+    return entry.path if entry is not None else None
+
+
+def _drawtext_fontfile(path: str) -> str:
+    # drawtext utilise ':' comme séparateur d'options
+    # -> échapper le ':' du lecteur Windows
+    return Path(path).as_posix().replace(":", "\\:").replace("'", "'\\''")
+
+
+def _position_expressions(position: str) -> tuple[str, str]:
+    """Renvoie les expressions x,y drawtext pour une position donnée."""
+    if position == "tl":
+        return ("20", "20")
+    if position == "tr":
+        return ("w-text_w-20", "20")
+    if position == "tc":
+        return ("(w-text_w)/2", "20")
+    if position == "bl":
+        return ("20", "h-text_h-20")
+    if position == "br":
+        return ("w-text_w-20", "h-text_h-20")
+    return ("(w-text_w)/2", "(h-text_h)/2")
+
+
+def _drawtext_filter(
+    text: str,
+    *,
+    fontsize: int,
+    fontcolor: str,
+    box: bool,
+    boxcolor: str,
+    boxborderw: int,
+    position: str,
+    enable: Optional[str] = None,
+    font: Optional[str] = None,
+) -> str:
+    """Filtre drawtext du label, actif seulement quand `enable` (si donné) est vrai.
+
+    La police est toujours passée en fichier (fontfile) pour que ffmpeg n'initialise
+    pas fontconfig.
+    """
+    text_escaped = _escape_drawtext_text(text)
+    fontfile = _label_fontfile(font)
+    x_expr, y_expr = _position_expressions(position)
+
+    drawtext_kvs: list[str] = []
+    if fontfile is not None:
+        drawtext_kvs.append(f"fontfile='{_drawtext_fontfile(fontfile)}'")
+    else:
+        # Aucune police trouvée par le registre: dernier recours via fontconfig
         drawtext_kvs.append("font=Arial")
     drawtext_kvs.append(f"text='{text_escaped}'")
     drawtext_kvs.append(f"fontcolor={fontcolor}")
@@ -322,8 +1916,63 @@ def overlay_text_on_video(
         drawtext_kvs.append(f"boxborderw={boxborderw}")
     drawtext_kvs.append(f"x={x_expr}")
     drawtext_kvs.append(f"y={y_expr}")
+    if enable is not None:
+        drawtext_kvs.append(f"enable='{enable}'")
+
+    return "drawtext=" + ":".join(drawtext_kvs)
+
+
+def overlay_text_on_video(
+    input_path: Path,
+    output_path: Path,
+    text: str,
+    *,
+    fontsize: int = 54,
+    fontcolor: str = "black",
+    box: bool = True,
+    boxcolor: str = "white@0.8",
+    boxborderw: int = 14,
+    position: str = "tc",
+    font: Optional[str] = None,
+    profile: Optional[EncoderProfile] = None,
+    cancel: Optional[CancelToken] = None,
+    on_progress: Optional[ProgressCallback] = None,
+) -> None:
+    """Ajoute une surimpression de texte via ffmpeg drawtext.
 
-    filter_arg = "drawtext=" + ":".join(drawtext_kvs)
+    Si ce ffmpeg n'a pas drawtext (ou aucune police utilisable), le même label est rendu
+    avec Pillow.
+    """
+    ffmpeg_path, _ = ensure_ffmpeg_in_path()
+    profile = profile or DEFAULT_PROFILE
+    if not get_toolchain().drawtext_usable(_label_fontfile(font)):
+        overlay_label_with_pillow(
+            input_path,
+            output_path,
+            text,
+            fontsize=fontsize,
+            fontcolor=fontcolor,
+            bg_color=boxcolor if box else "black@0",
+            padding=boxborderw,
+            radius=0,
+            position=position,
+            font=font,
+            profile=profile,
+            cancel=cancel,
+            on_progress=on_progress,
+        )
+        return
+
+    filter_arg = _drawtext_filter(
+        text,
+        fontsize=fontsize,
+        fontcolor=fontcolor,
+        box=box,
+        boxcolor=boxcolor,
+        boxborderw=boxborderw,
+        position=position,
+        font=font,
+    )
 
     cmd = [
         ffmpeg_path,
@@ -332,17 +1981,19 @@ def overlay_text_on_video(
         str(input_path),
         "-vf",
         filter_arg,
-        "-c:v",
-        "libx264",
-        "-preset",
-        "veryfast",
-        "-crf",
-        "20",
+        *profile.video_args(crf=profile.relabel_crf()),
         "-c:a",
         "copy",
         str(output_path),
     ]
-    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    proc = run_ffmpeg(
+        cmd,
+        stage=f"label · {input_path.stem}",
+        duration=probe_duration_seconds(input_path),
+        on_progress=on_progress,
+        cancel=cancel,
+        partial_outputs=[output_path],
+    )
     if proc.returncode != 0:
         raise RuntimeError(f"ffmpeg drawtext a échoué:\n{proc.stderr}")
 
@@ -362,35 +2013,107 @@ def _overlay_position_exprs(position: str) -> tuple[str, str]:
     return ("(main_w-overlay_w)/2", "(main_h-overlay_h)/2")
 
 
-def overlay_label_with_pillow(
-    input_path: Path,
-    output_path: Path,
+def _parse_color(col: str) -> tuple[int, int, int, int]:
+    """Convertir couleurs CSS simples/#hex (avec suffixe @alpha optionnel) vers RGBA."""
+    base = col
+    alpha = None
+    try:
+        if "@" in col:
+            base, a_str = col.split("@", 1)
+            try:
+                a_float = max(0.0, min(1.0, float(a_str)))
+                alpha = int(round(a_float * 255))
+            except Exception:
+                alpha = None
+        if base.startswith("#") and len(base) in (4, 7, 9):
+            # #RGB, #RRGGBB, #RRGGBBAA
+            if len(base) == 4:
+                r = int(base[1] * 2, 16)
+                g = int(base[2] * 2, 16)
+                b = int(base[3] * 2, 16)
+                a = alpha if alpha is not None else 255
+                return (r, g, b, a)
+            if len(base) == 7:
+                r = int(base[1:3], 16)
+                g = int(base[3:5], 16)
+                b = int(base[5:7], 16)
+                a = alpha if alpha is not None else 255
+                return (r, g, b, a)
+            if len(base) == 9:
+                r = int(base[1:3], 16)
+                g = int(base[3:5], 16)
+                b = int(base[5:7], 16)
+                a = int(base[7:9], 16)
+                if alpha is not None:
+                    a = alpha
+                return (r, g, b, a)
+    except Exception:
+        pass
+    named = {
+        "white": (255, 255, 255, 255),
+        "black": (0, 0, 0, 255),
+        "yellow": (255, 255, 0, 255),
+        "red": (255, 0, 0, 255),
+        "green": (0, 128, 0, 255),
+        "blue": (0, 0, 255, 255),
+    }
+    rgba = named.get(base.lower(), (255, 255, 255, 255))
+    if alpha is not None:
+        rgba = (rgba[0], rgba[1], rgba[2], alpha)
+    return rgba
+
+
+@lru_cache(maxsize=16)
+def _load_label_font(
+    font_path: Optional[str], fontsize: int
+) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    """Police Pillow, chargée une seule fois par fichier et taille."""
+    from PIL import ImageFont
+
+    try:
+        if font_path is not None:
+            return ImageFont.truetype(font_path, fontsize)
+    except Exception:
+        pass
+    return ImageFont.load_default()
+
+
+def _render_label_image(
     text: str,
     *,
-    fontsize: int = 54,
-    fontcolor: str = "black",
-    bg_color: str = "white@0.8",
-    padding: int = 18,
-    radius: int = 24,
-    position: str = "tc",
-) -> None:
-    """Rend un label (texte + fond arrondi) avec Pillow et l'overlay sur la vidéo via ffmpeg."""
-    ffmpeg_path, _ = ensure_ffmpeg_in_path()
+    fontsize: int,
+    fontcolor: str,
+    bg_color: str,
+    padding: int,
+    radius: int,
+    font: Optional[str] = None,
+) -> Image.Image:
+    """Rend le label (texte + fond arrondi) en image RGBA Pillow.
+
+    L'image vient d'un cache partagé entre segments (même texte et même style): ne pas
+    la modifier.
+    """
+    return _render_label_cached(
+        text, _label_fontfile(font), fontsize, fontcolor, bg_color, padding, radius
+    )
 
+
+@lru_cache(maxsize=256)
+def _render_label_cached(
+    text: str,
+    font_path: Optional[str],
+    fontsize: int,
+    fontcolor: str,
+    bg_color: str,
+    padding: int,
+    radius: int,
+) -> Image.Image:
     try:
-        from PIL import Image, ImageDraw, ImageFont
+        from PIL import Image, ImageDraw
     except Exception as exc:  # pragma: no cover - pillow manquant
         raise RuntimeError("Pillow n'est pas installé. Veuillez installer 'Pillow' ou désactiver --label-rounded.") from exc
 
-    # Chargement de la police
-    font_path = _find_default_fontfile()
-    try:
-        if font_path is not None:
-            font = ImageFont.truetype(font_path.replace("\\:", ":"), fontsize)
-        else:
-            font = ImageFont.load_default()
-    except Exception:
-        font = ImageFont.load_default()
+    font = _load_label_font(font_path, fontsize)
 
     # Mesurer le texte
     dummy = Image.new("RGBA", (10, 10), (0, 0, 0, 0))
@@ -405,55 +2128,6 @@ def overlay_label_with_pillow(
     overlay_img = Image.new("RGBA", (box_w, box_h), (0, 0, 0, 0))
     draw = ImageDraw.Draw(overlay_img)
 
-    # Convertir couleurs CSS simples/#hex vers RGBA
-    def _parse_color(col: str) -> tuple[int, int, int, int]:
-        base = col
-        alpha = None
-        try:
-            if '@' in col:
-                base, a_str = col.split('@', 1)
-                try:
-                    a_float = max(0.0, min(1.0, float(a_str)))
-                    alpha = int(round(a_float * 255))
-                except Exception:
-                    alpha = None
-            if base.startswith('#') and len(base) in (4, 7, 9):
-                # #RGB, #RRGGBB, #RRGGBBAA
-                if len(base) == 4:
-                    r = int(base[1] * 2, 16)
-                    g = int(base[2] * 2, 16)
-                    b = int(base[3] * 2, 16)
-                    a = alpha if alpha is not None else 255
-                    return (r, g, b, a)
-                if len(base) == 7:
-                    r = int(base[1:3], 16)
-                    g = int(base[3:5], 16)
-                    b = int(base[5:7], 16)
-                    a = alpha if alpha is not None else 255
-                    return (r, g, b, a)
-                if len(base) == 9:
-                    r = int(base[1:3], 16)
-                    g = int(base[3:5], 16)
-                    b = int(base[5:7], 16)
-                    a = int(base[7:9], 16)
-                    if alpha is not None:
-                        a = alpha
-                    return (r, g, b, a)
-        except Exception:
-            pass
-        named = {
-            "white": (255, 255, 255, 255),
-            "black": (0, 0, 0, 255),
-            "yellow": (255, 255, 0, 255),
-            "red": (255, 0, 0, 255),
-            "green": (0, 128, 0, 255),
-            "blue": (0, 0, 255, 255),
-        }
-        rgba = named.get(base.lower(), (255, 255, 255, 255))
-        if alpha is not None:
-            rgba = (rgba[0], rgba[1], rgba[2], alpha)
-        return rgba
-
     bg_rgba = _parse_color(bg_color)
     fg_rgba = _parse_color(fontcolor)
 
@@ -471,9 +2145,42 @@ def overlay_label_with_pillow(
         text_y = (box_h - text_h) // 2
         draw.text((text_x, text_y), text, font=font, fill=fg_rgba)
 
-    # Sauvegarder l'overlay temporaire
-    overlay_path = output_path.with_name(f"label_{uuid4().hex}.png")
-    overlay_img.save(overlay_path.as_posix())
+    return overlay_img
+
+
+def overlay_label_with_pillow(
+    input_path: Path,
+    output_path: Path,
+    text: str,
+    *,
+    fontsize: int = 54,
+    fontcolor: str = "black",
+    bg_color: str = "white@0.8",
+    padding: int = 18,
+    radius: int = 24,
+    position: str = "tc",
+    font: Optional[str] = None,
+    profile: Optional[EncoderProfile] = None,
+    cancel: Optional[CancelToken] = None,
+    on_progress: Optional[ProgressCallback] = None,
+) -> None:
+    """Rend un label (texte + fond arrondi) avec Pillow, puis l'overlay via ffmpeg.
+
+    L'image RGBA est envoyée à ffmpeg par son entrée standard (rawvideo), sans
+    fichier temporaire.
+    """
+    ffmpeg_path, _ = ensure_ffmpeg_in_path()
+    profile = profile or DEFAULT_PROFILE
+
+    overlay_img = _render_label_image(
+        text,
+        fontsize=fontsize,
+        fontcolor=fontcolor,
+        bg_color=bg_color,
+        padding=padding,
+        radius=radius,
+        font=font,
+    )
 
     # Position overlay
     x_expr, y_expr = _overlay_position_exprs(position)
@@ -484,30 +2191,34 @@ def overlay_label_with_pillow(
         "-y",
         "-i",
         str(input_path),
+        # Une seule image: overlay la répète jusqu'à la fin de la vidéo
+        # (eof_action=repeat)
+        "-f",
+        "rawvideo",
+        "-pix_fmt",
+        "rgba",
+        "-s",
+        f"{overlay_img.width}x{overlay_img.height}",
         "-i",
-        str(overlay_path),
+        "pipe:0",
         "-filter_complex",
         filter_arg,
-        "-c:v",
-        "libx264",
-        "-preset",
-        "veryfast",
-        "-crf",
-        "20",
+        *profile.video_args(crf=profile.relabel_crf()),
         "-c:a",
         "copy",
         str(output_path),
     ]
-    try:
-        proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        if proc.returncode != 0:
-            raise RuntimeError(f"ffmpeg overlay a échoué:\n{proc.stderr}")
-    finally:
-        try:
-            if overlay_path.exists():
-                overlay_path.unlink()
-        except Exception:
-            pass
+    proc = run_ffmpeg(
+        cmd,
+        stage=f"label · {input_path.stem}",
+        duration=probe_duration_seconds(input_path),
+        on_progress=on_progress,
+        cancel=cancel,
+        partial_outputs=[output_path],
+        stdin_data=overlay_img.tobytes(),
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg overlay a échoué:\n{proc.stderr}")
 
 
 def parse_args(argv: list[str]) -> argparse.Namespace:
@@ -515,11 +2226,290 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
         prog="ytb-to-tiktok",
         description="Télécharger une vidéo YouTube et la découper en segments de 60 secondes.",
     )
-    parser.add_argument("url", help="URL de la vidéo YouTube")
+    parser.add_argument(
+        "url",
+        nargs="?",
+        default=None,
+        help=(
+            "URL de la vidéo YouTube (ou de la playlist/chaîne avec --playlist), "
+            "URL HTTP directe d'un fichier vidéo, fichier vidéo local, "
+            "ou dossier / motif glob local (traité en lot)"
+        ),
+    )
+    parser.add_argument(
+        "--version", action="version", version=f"%(prog)s {__version__}"
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help=(
+            "Afficher les étapes prévues (et celles déjà faites selon le manifeste) "
+            "sans rien lancer"
+        ),
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="FICHIER",
+        default=None,
+        help=(
+            "Traiter une liste d'URL (une par ligne, '-' pour stdin); "
+            "playlists et chaînes y sont développées"
+        ),
+    )
+    parser.add_argument(
+        "--playlist",
+        action="store_true",
+        help="Traiter toutes les vidéos de la playlist/chaîne donnée en URL",
+    )
+    parser.add_argument(
+        "--download-jobs",
+        type=int,
+        default=2,
+        help="Lot: téléchargements simultanés (défaut: 2)",
+    )
+    parser.add_argument(
+        "--encode-jobs",
+        type=int,
+        default=1,
+        help="Lot: découpages/encodages simultanés (défaut: 1)",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=2,
+        help="Lot: vidéos téléchargées en attente d'encodage au maximum (défaut: 2)",
+    )
     parser.add_argument("--output", "-o", type=Path, default=Path("outputs"), help="Dossier de sortie pour la vidéo et les segments")
     parser.add_argument("--segments-dir", type=Path, default=None, help="Dossier des segments (défaut: <output>/segments)")
     parser.add_argument("--limit", type=int, default=None, help="Limiter le nombre de segments produits")
     parser.add_argument("--segment-seconds", type=int, default=60, help="Durée d'un segment en secondes (défaut: 60)")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help=(
+            "Découper pendant la lecture du flux "
+            "(ffmpeg lit directement les URL média; ré-encodage, "
+            "une copie de la source est conservée dans <output>/downloads)"
+        ),
+    )
+    parser.add_argument(
+        "--split-mode",
+        choices=list(SPLIT_MODES),
+        default="reencode",
+        help=(
+            "Moteur de découpage: reencode (coupes exactes, ré-encodage), "
+            "copy (coupes sur images clés, sans ré-encodage), "
+            "smart (coupes exactes, seul le GOP de chaque coupe est ré-encodé) "
+            "ou parallel (comme reencode, un processus ffmpeg par segment en parallèle)"
+        ),
+    )
+    parser.add_argument(
+        "--reframe",
+        choices=list(REFRAME_MODES),
+        default=None,
+        help=(
+            "Passer les segments en vertical 1080x1920 "
+            "pendant l'encodage du découpage: crop-center (recadrage centré), "
+            "pad (bandes noires) ou blurred-background (fond flouté); "
+            "force le ré-encodage"
+        ),
+    )
+    parser.add_argument(
+        "--encoder-profile",
+        choices=list(PROFILE_NAMES),
+        default="fast",
+        help=(
+            "Réglages d'encodage: fast (veryfast, crf 23), balanced (medium, crf 21), "
+            "archive (slow, crf 18) ou auto (mesure un extrait de la source "
+            "et prend le preset le plus lent qui tient --encoder-target-speed)"
+        ),
+    )
+    parser.add_argument(
+        "--encoder-target-speed",
+        type=float,
+        default=1.0,
+        help=(
+            "Profil auto: vitesse d'encodage minimale en multiple du temps réel "
+            "(défaut: 1.0)"
+        ),
+    )
+    parser.add_argument(
+        "--rendition",
+        dest="renditions",
+        action="append",
+        type=_rendition_arg,
+        default=None,
+        metavar="NOM=LxH[@DÉBIT]",
+        help=(
+            "Déclinaison des segments (répétable), "
+            "ex: tiktok=1080x1920@6M apercu=540x960@1500k; "
+            "la source n'est décodée qu'une fois et chaque déclinaison est écrite "
+            "dans <segments>/<nom>/ (force le ré-encodage)"
+        ),
+    )
+    parser.add_argument(
+        "--thumbnail",
+        choices=list(THUMBNAIL_CHOICES),
+        default=None,
+        help=(
+            "Écrire une miniature de couverture à côté de chaque segment, "
+            "prise dans le décodage du découpage: "
+            "first (première image), middle (image du milieu) "
+            "ou sharpest (la plus nette des --thumbnail-window premières secondes)"
+        ),
+    )
+    parser.add_argument(
+        "--thumbnail-format",
+        choices=list(THUMBNAIL_FORMATS),
+        default="jpg",
+        help="Format des miniatures (défaut: jpg)",
+    )
+    parser.add_argument(
+        "--thumbnail-window",
+        type=float,
+        default=2.0,
+        help=(
+            "Miniature sharpest: secondes examinées au début de chaque segment "
+            "(défaut: 2.0)"
+        ),
+    )
+    parser.add_argument(
+        "--split-jobs",
+        type=int,
+        default=None,
+        help=(
+            "Mode parallel: nombre d'encodages ffmpeg simultanés "
+            "(défaut: nb de cœurs / 4)"
+        ),
+    )
+    parser.add_argument(
+        "--split-threads",
+        type=int,
+        default=None,
+        help=(
+            "Mode parallel: threads libx264 par encodage "
+            "(défaut: nb de cœurs / --split-jobs)"
+        ),
+    )
+    parser.add_argument(
+        "--cut-strategy",
+        choices=list(CUT_STRATEGIES),
+        default="fixed",
+        help=(
+            "Placement des coupes: fixed (multiples exacts de --segment-seconds), "
+            "scene (meilleur changement de plan à moins de --cut-tolerance) "
+            "ou silence (meilleur silence, seul l'audio est décodé); "
+            "l'analyse est faite une fois par source et gardée en cache"
+        ),
+    )
+    parser.add_argument(
+        "--cut-tolerance",
+        type=float,
+        default=3.0,
+        help=(
+            "Écart max (secondes) entre une coupe du plan fixe "
+            "et le changement de plan ou silence retenu (défaut: 3.0)"
+        ),
+    )
+    parser.add_argument(
+        "--keyframe-tolerance",
+        type=float,
+        default=2.0,
+        help=(
+            "Écart max (secondes) entre une coupe demandée "
+            "et l'image clé retenue en mode copy (défaut: 2.0)"
+        ),
+    )
+    parser.add_argument(
+        "--ffmpeg-timeout",
+        type=float,
+        default=None,
+        help=(
+            "Durée max (secondes) d'un processus ffmpeg/ffprobe avant de l'arrêter "
+            "(défaut: aucune)"
+        ),
+    )
+    parser.add_argument(
+        "--ffmpeg-stall-timeout",
+        type=float,
+        default=120.0,
+        help=(
+            "Arrêter un processus ffmpeg/ffprobe resté N secondes sans avancer "
+            "(défaut: 120, 0 = jamais)"
+        ),
+    )
+    parser.add_argument(
+        "--events",
+        choices=["jsonl"],
+        default=None,
+        help=(
+            "Publier les événements du pipeline "
+            "(étapes, progression, segments, erreurs) en JSON lines"
+        ),
+    )
+    parser.add_argument(
+        "--events-fd",
+        type=int,
+        default=1,
+        help=(
+            "Descripteur de fichier des événements --events "
+            "(défaut: 1 = stdout, la console passe alors sur stderr)"
+        ),
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help=(
+            "Dossier des caches locaux "
+            "(défaut: $YTB_TO_TIKTOK_CACHE_DIR ou ~/.cache/ytb-to-tiktok)"
+        ),
+    )
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help=(
+            "Ignorer le manifeste du job (<output>/.jobs) "
+            "et refaire toutes les étapes"
+        ),
+    )
+    parser.add_argument(
+        "--no-download-cache",
+        action="store_true",
+        help="Toujours retélécharger (ne pas utiliser le store de vidéos)",
+    )
+    parser.add_argument(
+        "--local-source",
+        choices=["inplace", "link"],
+        default="inplace",
+        help=(
+            "Fichiers locaux: lus sur place (inplace) "
+            "ou liés physiquement dans <output>/downloads (link); "
+            "jamais copiés (défaut: inplace)"
+        ),
+    )
+    parser.add_argument(
+        "--download-cache-size",
+        type=float,
+        default=20.0,
+        help=(
+            "Taille max (Go) du store de vidéos téléchargées, "
+            "les moins récemment utilisées sont supprimées (défaut: 20)"
+        ),
+    )
+    parser.add_argument(
+        "--no-media-cache",
+        action="store_true",
+        help="Ne pas lire/écrire le cache des sondes média",
+    )
+    parser.add_argument(
+        "--media-cache-hash",
+        action="store_true",
+        help=(
+            "Inclure une empreinte du contenu dans la clé du cache média "
+            "(en plus de taille et mtime)"
+        ),
+    )
     parser.add_argument("--cookies", type=Path, default=None, help="Fichier cookies (format Netscape)")
     parser.add_argument(
         "--cookies-from-browser",
@@ -534,6 +2524,14 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
     parser.add_argument("--label", action="store_true", help="Ajouter une surimpression de texte 'Partie X' (fond rectangulaire)")
     parser.add_argument("--label-template", default="Partie {i}", help="Modèle de texte. Variables: {i} (index 1..N), {n} (alias), {total} (N)")
     parser.add_argument("--label-fontsize", type=int, default=54, help="Taille de police (px)")
+    parser.add_argument(
+        "--label-font",
+        default=None,
+        help=(
+            "Police du texte: nom de famille, avec style (ex: 'DejaVu Sans Bold') "
+            "ou chemin d'un .ttf/.otf"
+        ),
+    )
     parser.add_argument("--label-color", default="black", help="Couleur du texte (ex: white, black, yellow, #RRGGBB)")
     parser.add_argument("--label-position", choices=["tl", "tr", "tc", "bl", "br", "center"], default="tc", help="Position du texte")
     parser.add_argument("--label-boxcolor", default="white", help="Couleur de fond de la boîte (rectangulaire)")
@@ -543,89 +2541,1090 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
     parser.add_argument("--label-rounded", action="store_true", help="Utiliser un fond aux coins arrondis (nécessite Pillow)")
     parser.add_argument("--label-radius", type=int, default=24, help="Rayon d'arrondi (pixels) pour --label-rounded")
     parser.add_argument("--label-padding", type=int, default=18, help="Padding interne (pixels) pour --label-rounded")
+    parser.add_argument(
+        "--label-pass",
+        choices=["fused", "separate"],
+        default="fused",
+        help=(
+            "fused: label appliqué pendant l'encodage du découpage "
+            "(une seule passe, --split-mode reencode/parallel); "
+            "separate: ré-encodage de chaque segment après découpage"
+        ),
+    )
     parser.add_argument("--label-box", dest="label_box", action="store_true", help="Afficher une boîte semi-transparente derrière le texte")
     parser.add_argument("--no-label-box", dest="label_box", action="store_false", help="Ne pas afficher de boîte derrière le texte")
     parser.set_defaults(label_box=True)
-    return parser.parse_args(argv)
+    args = parser.parse_args(argv)
+    if args.url is None and args.batch is None:
+        parser.error("une URL ou --batch est requis")
+    if args.url is not None and args.batch is not None:
+        parser.error("--batch remplace l'URL positionnelle")
+    if args.stream and (
+        args.batch is not None
+        or args.playlist
+        or (args.url is not None and is_local_collection(args.url))
+    ):
+        parser.error(
+            "--stream n'est pas disponible en mode lot "
+            "(--batch/--playlist, dossier ou motif local)"
+        )
+    if args.thumbnail_window <= 0:
+        parser.error("--thumbnail-window doit être positif")
+    if args.renditions:
+        if args.stream:
+            parser.error("--rendition n'est pas disponible avec --stream")
+        names = [rendition.name for rendition in args.renditions]
+        if len(set(names)) != len(names):
+            parser.error("--rendition: chaque déclinaison doit avoir un nom distinct")
+    return args
+
+
+def _rendition_arg(value: str) -> Rendition:
+    try:
+        return parse_rendition(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from None
+
+
+def _label_is_fused(args: argparse.Namespace) -> bool:
+    """Le label ne peut être fusionné qu'aux chemins de ré-encodage du découpage (le
+    flux, --reframe et --rendition en sont); les déclinaisons l'imposent, chacune étant
+    encodée une seule fois.
+    """
+    if not args.label:
+        return False
+    if args.renditions:
+        return True
+    return args.label_pass == "fused" and (
+        args.stream
+        or args.reframe is not None
+        or args.split_mode in ("reencode", "parallel")
+    )
+
+
+def _label_options_from_args(args: argparse.Namespace) -> LabelOptions:
+    return LabelOptions(
+        template=args.label_template,
+        fontsize=args.label_fontsize,
+        fontcolor=args.label_color,
+        position=args.label_position,
+        box=args.label_box,
+        boxcolor=args.label_boxcolor,
+        boxborderw=args.label_boxborderw,
+        rounded=args.label_rounded,
+        radius=args.label_radius,
+        padding=args.label_padding,
+        font=args.label_font,
+    )
+
+
+def _thumbnail_options_from_args(
+    args: argparse.Namespace,
+) -> Optional[ThumbnailOptions]:
+    if args.thumbnail is None:
+        return None
+    return ThumbnailOptions(
+        choice=args.thumbnail,
+        format=args.thumbnail_format,
+        window=args.thumbnail_window,
+    )
+
+
+def _label_params(
+    label_options: LabelOptions, index: int, total: int, profile: EncoderProfile
+) -> dict:
+    return {
+        "text": label_options.text_for(index, total),
+        "options": asdict(label_options),
+        "profile": asdict(profile),
+    }
+
+
+def apply_labels(
+    parts: list[Path],
+    label_options: LabelOptions,
+    manifest: Optional[JobManifest] = None,
+    profile: EncoderProfile = DEFAULT_PROFILE,
+    cancel: Optional[CancelToken] = None,
+    job: Optional[str] = None,
+) -> int:
+    """Passe séparée: ré-encode chaque segment avec sa surimpression 'Partie X'.
+
+    Chaque segment est remplacé sur place. Avec un manifeste, les segments déjà
+    étiquetés avec les mêmes paramètres sont ignorés et chaque segment terminé est
+    enregistré aussitôt. Renvoie le nombre de segments traités.
+    """
+    total = len(parts)
+    done = 0
+    report = events.JobReporter(job, "label")
+    for index, part in enumerate(parts, start=1):
+        params = _label_params(label_options, index, total, profile)
+        stage = f"label/{part.name}"
+        if manifest is not None and manifest.is_complete(stage, params):
+            continue
+        label_text = params["text"]
+        tmp_out = part.with_name(part.stem + "_labeled" + part.suffix)
+        if label_options.rounded:
+            overlay_label_with_pillow(
+                part,
+                tmp_out,
+                label_text,
+                fontsize=label_options.fontsize,
+                fontcolor=label_options.fontcolor,
+                bg_color=label_options.boxcolor,
+                padding=label_options.padding,
+                radius=label_options.radius,
+                position=label_options.position,
+                font=label_options.font,
+                profile=profile,
+                cancel=cancel,
+                on_progress=report.progress,
+            )
+        else:
+            overlay_text_on_video(
+                part,
+                tmp_out,
+                label_text,
+                fontsize=label_options.fontsize,
+                fontcolor=label_options.fontcolor,
+                box=label_options.box,
+                boxcolor=label_options.boxcolor,
+                boxborderw=label_options.boxborderw,
+                position=label_options.position,
+                font=label_options.font,
+                profile=profile,
+                cancel=cancel,
+                on_progress=report.progress,
+            )
+        try:
+            os.replace(tmp_out, part)
+        except Exception:
+            try:
+                if part.exists():
+                    part.unlink()
+            finally:
+                os.replace(tmp_out, part)
+        if manifest is not None:
+            manifest.complete(stage, params, [part])
+        report.segment(part, index, total)
+        done += 1
+    return done
+
+
+def _resolve_profile(
+    args: argparse.Namespace,
+    video_path: Optional[Path],
+    cancel: Optional[CancelToken] = None,
+    job: Optional[str] = None,
+) -> EncoderProfile:
+    """Profil d'encodage demandé; 'auto' mesure un extrait (avec le même recadrage)."""
+    if args.encoder_profile != "auto":
+        return PROFILES[args.encoder_profile]
+    if (
+        args.split_mode == "copy"
+        and not args.label
+        and args.reframe is None
+        and not args.stream
+        and not args.renditions
+    ):
+        # Rien ne sera encodé: inutile de mesurer
+        return DEFAULT_PROFILE
+    if video_path is None:
+        _warn("profil auto indisponible en lecture de flux; profil 'fast' utilisé.")
+        return PROFILES["fast"]
+    ffmpeg_path, ffprobe_path = ensure_ffmpeg_in_path()
+    info = get_media_info(video_path, ffmpeg_path, ffprobe_path)
+    stream = info.video
+    source_key = (
+        f"{stream.codec}:{stream.width}x{stream.height}@{stream.fps}"
+        if stream is not None
+        else ""
+    )
+    profile = autotune_profile(
+        ffmpeg_path,
+        video_path,
+        info.duration or 0.0,
+        target_speed=args.encoder_target_speed,
+        filter_graph=(
+            _reframe_filter(args.reframe, "[0:v]", "[v]")
+            if args.reframe is not None
+            else None
+        ),
+        source_key=source_key,
+        cancel=cancel,
+        on_progress=events.JobReporter(job, "profile").progress,
+    )
+    console.print(
+        f"[green]OK[/] Profil auto: preset {profile.preset}, crf {profile.crf}"
+        f" (cible x{args.encoder_target_speed:g})"
+    )
+    return profile
+
+
+def _split_with_args(
+    video_path: Path,
+    segments_root: Path,
+    args: argparse.Namespace,
+    label: Optional[LabelOptions],
+    profile: EncoderProfile,
+    cancel: Optional[CancelToken] = None,
+    report: Optional[events.JobReporter] = None,
+) -> list[Path]:
+    return split_video_ffmpeg(
+        video_path,
+        segments_root,
+        segment_seconds=args.segment_seconds,
+        limit=args.limit,
+        mode=args.split_mode,
+        keyframe_tolerance=args.keyframe_tolerance,
+        cut_strategy=args.cut_strategy,
+        cut_tolerance=args.cut_tolerance,
+        label=label,
+        reframe=args.reframe,
+        jobs=args.split_jobs,
+        threads_per_job=args.split_threads,
+        profile=profile,
+        renditions=args.renditions,
+        thumbnail=_thumbnail_options_from_args(args),
+        cancel=cancel,
+        report=report,
+    )
+
+
+def _current_split_outputs(
+    manifest: JobManifest,
+    params: dict,
+    label_options: Optional[LabelOptions],
+    profile: EncoderProfile,
+    thumbnail: Optional[ThumbnailOptions] = None,
+) -> Optional[list[Path]]:
+    """Segments du découpage enregistré s'il est encore valable, sinon None.
+
+    Un segment est valable s'il est intact depuis le découpage, ou s'il porte déjà la
+    surimpression (passe séparée) demandée aujourd'hui; avec un autre label il faut
+    redécouper. Une miniature demandée mais absente oblige aussi à redécouper.
+    """
+    record = manifest.stage("split")
+    if record is None or record.get("params") != params:
+        return None
+    outputs = record.get("outputs", [])
+    for index, output in enumerate(outputs, start=1):
+        if record_matches(output):
+            continue
+        label_record = manifest.stage(f"label/{Path(output['path']).name}")
+        if (
+            label_options is None
+            or label_record is None
+            or label_record.get("params")
+            != _label_params(label_options, index, len(outputs), profile)
+            or not all(record_matches(o) for o in label_record.get("outputs", []))
+        ):
+            return None
+    parts = [Path(output["path"]) for output in outputs]
+    if thumbnail is not None and not all(
+        thumbnail_path(part, thumbnail).is_file() for part in parts
+    ):
+        return None
+    return parts
+
+
+def _download_step(
+    manifest: JobManifest,
+    url: str,
+    downloads_dir: Path,
+    args: argparse.Namespace,
+    progress_hook: Optional[Callable[[dict], None]] = None,
+    cancel: Optional[CancelToken] = None,
+) -> tuple[DownloadResult, bool]:
+    """Téléchargement, sauté si le manifeste l'a enregistré et le fichier est intact.
+
+    Un fichier local n'est ni téléchargé ni copié (lecture sur place ou lien physique,
+    voir --local-source); une URL HTTP directe est lue sans yt-dlp.
+    """
+    kind = source_kind(url)
+    params = {"url": url, "downloads_dir": str(downloads_dir.resolve())}
+    if kind == "file":
+        params["local_source"] = args.local_source
+
+    def hook(status: dict) -> None:
+        if progress_hook is not None:
+            progress_hook(status)
+        if events.has_listeners() and status.get("status") in (
+            "downloading",
+            "finished",
+        ):
+            events.emit_progress(
+                job=url,
+                stage="download",
+                done=status.get("status") == "finished",
+                downloaded_bytes=status.get("downloaded_bytes"),
+                total_bytes=status.get("total_bytes")
+                or status.get("total_bytes_estimate"),
+                speed=status.get("speed"),
+                eta=status.get("eta"),
+            )
+
+    with events.stage("download", job=url, source=kind) as outcome:
+        if manifest.is_complete("download", params):
+            record = manifest.stage("download") or {}
+            result = DownloadResult(
+                video_path=Path(record["outputs"][0]["path"]),
+                title=record.get("title") or "video",
+            )
+            outcome.update(
+                status="skipped", path=str(result.video_path), title=result.title
+            )
+            return result, True
+        if kind == "file":
+            path = local_path(url)
+            video_path = open_local_file(
+                path, downloads_dir, link=args.local_source == "link"
+            )
+            result = DownloadResult(video_path=video_path, title=path.stem)
+        elif kind == "http":
+            result = download_http(
+                url,
+                downloads_dir,
+                user_agent=args.user_agent,
+                proxy=args.proxy,
+                progress_hook=hook,
+                cancel=cancel,
+            )
+        else:
+            result = download_youtube(
+                url,
+                downloads_dir,
+                cookies_file=args.cookies,
+                cookies_from_browser=args.cookies_from_browser,
+                user_agent=args.user_agent,
+                proxy=args.proxy,
+                progress_hook=hook,
+                cancel=cancel,
+            )
+        manifest.complete("download", params, [result.video_path], title=result.title)
+        outcome.update(path=str(result.video_path), title=result.title)
+    return result, False
+
+
+def _split_step(
+    manifest: JobManifest,
+    video_path: Path,
+    segments_root: Path,
+    args: argparse.Namespace,
+    label: Optional[LabelOptions],
+    separate_label: Optional[LabelOptions],
+    profile: EncoderProfile,
+    cancel: Optional[CancelToken] = None,
+    job: Optional[str] = None,
+) -> tuple[list[Path], bool]:
+    """Sonde puis découpage, sautés si la source et les paramètres n'ont pas changé."""
+    thumbnail = _thumbnail_options_from_args(args)
+    # Empreinte déjà calculée au téléchargement si la source n'a pas changé de chemin
+    source = manifest.stage("download")
+    outputs = source.get("outputs") if source else None
+    input_hash = (
+        outputs[0]["hash"]
+        if outputs and outputs[0]["path"] == str(video_path)
+        else None
+    )
+    if input_hash is None:
+        input_hash = file_record(video_path)["hash"]
+    probe_params = {"input": str(video_path), "input_hash": input_hash}
+    if not manifest.is_complete("probe", probe_params):
+        with events.stage("probe", job=job) as outcome:
+            ffmpeg_path, ffprobe_path = ensure_ffmpeg_in_path()
+            info = get_media_info(video_path, ffmpeg_path, ffprobe_path)
+            manifest.complete("probe", probe_params, [], info=info.to_dict())
+            outcome["duration"] = info.duration
+
+    params = {
+        "input_hash": input_hash,
+        "segments_dir": str(segments_root.resolve()),
+        "segment_seconds": args.segment_seconds,
+        "limit": args.limit,
+        "mode": args.split_mode,
+        "keyframe_tolerance": (
+            args.keyframe_tolerance if args.split_mode == "copy" else None
+        ),
+        "cut_strategy": args.cut_strategy,
+        "cut_tolerance": args.cut_tolerance if args.cut_strategy != "fixed" else None,
+        "label": asdict(label) if label is not None else None,
+        "reframe": args.reframe,
+        "renditions": (
+            [asdict(rendition) for rendition in args.renditions]
+            if args.renditions
+            else None
+        ),
+        "thumbnail": asdict(thumbnail) if thumbnail is not None else None,
+        "profile": asdict(profile),
+    }
+    with events.stage(
+        "split", job=job, mode=args.split_mode, profile=profile.name
+    ) as outcome:
+        parts = _current_split_outputs(
+            manifest, params, separate_label, profile, thumbnail
+        )
+        skipped = parts is not None
+        if parts is None:
+            report = events.JobReporter(job, "split")
+            parts = _split_with_args(
+                video_path, segments_root, args, label, profile, cancel, report
+            )
+            manifest.invalidate("label/")
+            manifest.complete("split", params, parts)
+        else:
+            _emit_resumed_segments(parts, "split", job)
+        outcome.update(status="skipped" if skipped else "ok", segments=len(parts))
+    _emit_thumbnails(parts, "split", job, thumbnail)
+    return parts, skipped
+
+
+def _emit_resumed_segments(parts: list[Path], stage: str, job: Optional[str]) -> None:
+    """Segments repris du manifeste: déjà finalisés, publiés d'un coup."""
+    if not events.has_listeners():
+        return
+    for index, part in enumerate(parts, start=1):
+        events.emit(
+            "segment",
+            job=job,
+            stage=stage,
+            path=str(part),
+            index=index,
+            total=len(parts),
+        )
+
+
+def _emit_thumbnails(
+    parts: list[Path],
+    stage: str,
+    job: Optional[str],
+    thumbnail: Optional[ThumbnailOptions],
+) -> None:
+    """Publie les miniatures écrites (après le découpage, ou reprises)."""
+    if thumbnail is None or not events.has_listeners():
+        return
+    for index, (part, thumb) in enumerate(paired_thumbnails(parts, thumbnail), start=1):
+        if thumb is not None:
+            events.emit(
+                "thumbnail",
+                job=job,
+                stage=stage,
+                path=str(thumb),
+                segment=str(part),
+                index=index,
+                total=len(parts),
+            )
+
+
+def _job_segments_dir(segments_root: Path, url: str, video_path: Path) -> Path:
+    """Sous-dossier des segments d'un job du lot: <nom de la vidéo>_<hash de l'URL>.
+
+    Stable d'une exécution à l'autre (reprise par le manifeste) et propre à chaque
+    entrée: deux vidéos de même titre ne mélangent pas leurs segments.
+    """
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()[:8]
+    return segments_root / f"{video_path.stem}_{digest}"
+
 
+def _main_batch(
+    args: argparse.Namespace,
+    output_dir: Path,
+    segments_root: Path,
+    downloads_dir: Path,
+    cancel: CancelToken,
+) -> int:
+    """Mode lot: pools de téléchargement et d'encodage séparés, puis bilan par vidéo.
+
+    Les entrées sont des URL (playlists et chaînes développées), des fichiers, des
+    dossiers ou des motifs glob locaux (un job par vidéo trouvée).
+    """
+    from rich.table import Table
+
+    from .batch import BatchJob, expand_playlist_urls, read_url_list, run_batch
+
+    label_options = _label_options_from_args(args)
+    fused_label = _label_is_fused(args)
+    ydl_opts = _ydl_options(
+        downloads_dir,
+        args.cookies,
+        args.cookies_from_browser,
+        args.user_agent,
+        args.proxy,
+    )
+
+    inputs = read_url_list(args.batch) if args.batch is not None else [args.url]
+    console.print(f"[bold]0) Résolution de {len(inputs)} entrée(s)[/]")
+    urls: list[str] = []
+    for entry in inputs:
+        cancel.raise_if_cancelled()
+        try:
+            kind = source_kind(entry)
+            if kind == "file":
+                expanded = expand_local_sources(entry)
+            elif kind == "http":
+                expanded = [entry]
+            else:
+                expanded = expand_playlist_urls(entry, ydl_opts)
+        except Exception as exc:
+            console.print(f"[red]Échec[/] {entry}: {exc}")
+            events.emit("error", job=entry, stage="resolve", message=str(exc))
+            continue
+        urls.extend(url for url in expanded if url not in urls)
+    console.print(f"[green]OK[/] {len(urls)} vidéo(s) à traiter")
+
+    separate_label = label_options if args.label and not fused_label else None
+    # Par URL (uniques dans le lot):
+    # deux entrées peuvent donner le même fichier ou le même titre
+    manifests: dict[str, JobManifest] = {}
+    board = _ProgressBoard()
+
+    def download(url: str) -> tuple[Path, str]:
+        manifest = JobManifest.for_url(output_dir, url, enabled=not args.no_resume)
+        result, _ = _download_step(
+            manifest, url, downloads_dir, args, board.download_hook, cancel
+        )
+        manifests[url] = manifest
+        return result.video_path, result.title
+
+    def encode(url: str, video_path: Path) -> list[Path]:
+        manifest = manifests[url]
+        profile = _resolve_profile(args, video_path, cancel, job=url)
+        parts, _ = _split_step(
+            manifest,
+            video_path,
+            _job_segments_dir(segments_root, url, video_path),
+            args,
+            label_options if fused_label else None,
+            separate_label,
+            profile,
+            cancel,
+            job=url,
+        )
+        if separate_label is not None and parts:
+            with events.stage("label", job=url, segments=len(parts)):
+                apply_labels(parts, separate_label, manifest, profile, cancel, job=url)
+        return parts
+
+    total = len(urls)
+
+    def on_update(job: BatchJob) -> None:
+        name = job.title or job.url
+        if job.status == "téléchargement":
+            events.emit(
+                "job_start", job=job.url, url=job.url, index=job.index, total=total
+            )
+        elif job.status in ("terminé", "échec", "annulé"):
+            status = {"terminé": "ok", "échec": "error", "annulé": "cancelled"}[
+                job.status
+            ]
+            events.emit(
+                "job_end",
+                job=job.url,
+                status=status,
+                error=job.error,
+                segments=len(job.parts),
+                download_seconds=job.download_seconds,
+                encode_seconds=job.encode_seconds,
+            )
+        if job.status == "échec":
+            console.print(f"[red]✗[/] [{job.index}/{total}] {name}: {job.error}")
+        elif job.status in ("téléchargé", "terminé"):
+            console.print(f"[green]✓[/] [{job.index}/{total}] {job.status}: {name}")
+
+    console.print(
+        f"[bold]1-2) Téléchargement ({args.download_jobs} en parallèle)"
+        f" et découpage ({args.encode_jobs} en parallèle)[/]"
+    )
+    with board:
+        jobs = run_batch(
+            urls,
+            download,
+            encode,
+            download_jobs=args.download_jobs,
+            encode_jobs=args.encode_jobs,
+            queue_size=args.queue_size,
+            on_update=on_update,
+            cancel=cancel,
+        )
 
-def main(argv: Optional[list[str]] = None) -> int:
+    table = Table(title="Récapitulatif")
+    table.add_column("#", justify="right")
+    table.add_column("Vidéo")
+    table.add_column("Statut")
+    table.add_column("Segments", justify="right")
+    table.add_column("Téléchargement", justify="right")
+    table.add_column("Encodage", justify="right")
+    for job in jobs:
+        table.add_row(
+            str(job.index),
+            job.title or job.url,
+            "[green]OK[/]" if job.ok else f"[red]{job.error or job.status}[/]",
+            str(len(job.parts)),
+            f"{job.download_seconds:.1f}s" if job.download_seconds is not None else "-",
+            f"{job.encode_seconds:.1f}s" if job.encode_seconds is not None else "-",
+        )
+    console.print(table)
+    failed = sum(1 for job in jobs if not job.ok)
+    console.print(
+        f"[green]OK[/] {total - failed}/{total} vidéo(s) traitée(s), "
+        f"segments dans {segments_root}"
+    )
+    if cancel.cancelled:
+        return 130
+    return 1 if failed else 0
+
+
+@contextmanager
+def _cancel_on_signals(cancel: CancelToken) -> Iterator[None]:
+    """Ctrl+C / SIGTERM annulent le jeton (arrêt propre); un 2e Ctrl+C interrompt net.
+
+    Les gestionnaires de signaux ne s'installent que depuis le thread principal: lancé
+    depuis un autre thread (interface graphique), seul le jeton de l'appelant arrête
+    le traitement.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def handler(signum: int, frame: object) -> None:
+        if cancel.cancelled and signum == signal.SIGINT:
+            raise KeyboardInterrupt
+        cancel.cancel(
+            "interrompu par un signal"
+            if signum != signal.SIGINT
+            else "interrompu (Ctrl+C)"
+        )
+
+    previous = {
+        signum: signal.signal(signum, handler)
+        for signum in (signal.SIGINT, signal.SIGTERM)
+    }
+    try:
+        yield
+    finally:
+        for signum, old in previous.items():
+            signal.signal(signum, old)
+
+
+@contextmanager
+def _jsonl_events(fd: int) -> Iterator[None]:
+    """--events jsonl: une ligne JSON par événement sur `fd`.
+
+    Si `fd` est stdout, la console passe sur stderr.
+    """
+    if fd == 1:
+        stream = sys.stdout
+        previous = console.file
+        console.file = sys.stderr
+    else:
+        stream = os.fdopen(fd, "w", encoding="utf-8", closefd=False)
+    try:
+        with events.event_listener(events.JsonlWriter(stream)):
+            yield
+    finally:
+        if fd == 1:
+            console.file = previous
+        else:
+            stream.flush()
+
+
+def _run_single_job(
+    args: argparse.Namespace,
+    output_dir: Path,
+    segments_root: Path,
+    downloads_dir: Path,
+    cancel: CancelToken,
+) -> int:
+    """_main_single encadré par les événements job_start / job_end."""
+    events.emit("job_start", job=args.url, url=args.url)
+    started = time.perf_counter()
+    outcome: dict = {"status": "error"}
+    try:
+        code = _main_single(args, output_dir, segments_root, downloads_dir, cancel)
+        outcome["status"] = "ok"
+        return code
+    except Cancelled:
+        outcome["status"] = "cancelled"
+        raise
+    except Exception as exc:
+        outcome["error"] = str(exc)
+        raise
+    finally:
+        events.emit(
+            "job_end",
+            job=args.url,
+            seconds=round(time.perf_counter() - started, 3),
+            **outcome,
+        )
+
+
+def main(
+    argv: Optional[list[str]] = None,
+    cancel: Optional[CancelToken] = None,
+    on_event: Optional[events.EventCallback] = None,
+) -> int:
+    """Point d'entrée CLI.
+
+    `cancel` permet à un appelant (interface graphique) d'arrêter le traitement;
+    `on_event` reçoit les événements structurés du pipeline (events.PipelineEvent) au
+    fil de l'eau.
+    """
     args = parse_args(sys.argv[1:] if argv is None else argv)
+    if (
+        args.url is not None
+        and source_kind(args.url) == "file"
+        and not is_local_collection(args.url)
+    ):
+        # Chemin absolu: même job (manifeste) quel que soit le dossier courant
+        args.url = str(local_path(args.url))
+    if args.plan:
+        # Chemin rapide: ni rich, ni yt-dlp, ni ffmpeg
+        # (aucun accès réseau ni processus lancé)
+        print_plan(args)
+        return 0
+    if args.cache_dir is not None:
+        set_cache_dir(args.cache_dir)
+        reset_font_registry()
+    configure_media_cache(
+        enabled=not args.no_media_cache, hash_content=args.media_cache_hash
+    )
+    configure_runner(
+        timeout=args.ffmpeg_timeout, stall_timeout=args.ffmpeg_stall_timeout or None
+    )
+    configure_download_store(
+        enabled=not args.no_download_cache,
+        max_bytes=int(args.download_cache_size * 1024**3),
+    )
 
     output_dir: Path = args.output
     segments_root: Path = args.segments_dir or (output_dir / "segments")
     downloads_dir: Path = output_dir / "downloads"
 
+    if args.label and args.label_font is not None:
+        try:
+            get_font_registry().resolve(args.label_font)
+        except RuntimeError as exc:
+            console.print(f"[red]Erreur:[/] {exc}")
+            return 2
+
+    cancel = cancel or CancelToken()
+    with ExitStack() as stack:
+        stack.enter_context(_cancel_on_signals(cancel))
+        if on_event is not None:
+            stack.enter_context(events.event_listener(on_event))
+        if args.events == "jsonl":
+            stack.enter_context(_jsonl_events(args.events_fd))
+        if args.renditions:
+            if args.split_mode != "reencode":
+                _warn(
+                    f"--split-mode {args.split_mode} ignoré avec --rendition "
+                    "(ré-encodage en une seule passe)"
+                )
+            if args.label and args.label_pass == "separate":
+                _warn(
+                    "--label-pass separate ignoré avec --rendition "
+                    "(label fusionné au découpage)"
+                )
+        try:
+            if args.batch is not None or args.playlist or is_local_collection(args.url):
+                console.rule("ytb-to-tiktok (lot)")
+                return _main_batch(
+                    args, output_dir, segments_root, downloads_dir, cancel
+                )
+            return _run_single_job(
+                args, output_dir, segments_root, downloads_dir, cancel
+            )
+        except Cancelled as exc:
+            console.print(
+                f"[yellow]Arrêt:[/] {exc.reason}; "
+                "les étapes terminées seront reprises au prochain lancement."
+            )
+            return 130
+
+
+def _local_source_label(args: argparse.Namespace) -> str:
+    return (
+        "lien physique dans <output>/downloads"
+        if args.local_source == "link"
+        else "lecture sur place"
+    )
+
+
+def print_plan(args: argparse.Namespace) -> None:
+    """--plan: étapes qu'exécuterait la commande (options et manifestes existants)."""
+    output_dir: Path = args.output
+    segments_root: Path = args.segments_dir or (output_dir / "segments")
+    fused_label = _label_is_fused(args)
+    if args.batch is not None:
+        from .batch import read_url_list
+
+        urls = read_url_list(args.batch)
+        source = (
+            f"lot de {len(urls)} URL ({args.download_jobs} téléchargement(s), "
+            f"{args.encode_jobs} encodage(s) simultanés)"
+        )
+    elif is_local_collection(args.url):
+        try:
+            urls = expand_local_sources(args.url)
+        except RuntimeError as exc:
+            urls = []
+            source = f"{args.url} ({exc})"
+        else:
+            source = (
+                f"{args.url}: {len(urls)} fichier(s) local(aux) en lot, "
+                f"{_local_source_label(args)}"
+            )
+    else:
+        urls = [args.url]
+        kind = source_kind(args.url)
+        if kind == "file":
+            how = f"fichier local, {_local_source_label(args)}"
+        elif args.playlist:
+            how = "playlist/chaîne"
+        elif args.stream:
+            how = "lecture en flux" + (" (URL directe)" if kind == "http" else "")
+        else:
+            how = (
+                "téléchargement direct (sans yt-dlp)"
+                if kind == "http"
+                else "téléchargement"
+            )
+        source = f"{args.url} ({how})"
+    if args.batch is not None or args.playlist:
+        source += ", playlists et chaînes développées au lancement"
+    engine = "stream" if args.stream else args.split_mode
+    split = f"{engine}, segments de {args.segment_seconds} s"
+    if args.limit:
+        split += f", {args.limit} au plus"
+    if args.cut_strategy != "fixed" and not args.stream:
+        split += f", coupes recalées ({args.cut_strategy}, ±{args.cut_tolerance:g} s)"
+    if args.reframe:
+        split += f", recadrage {args.reframe}"
+    if args.thumbnail:
+        split += f", miniatures {args.thumbnail} en {args.thumbnail_format}"
+    if args.renditions:
+        split += ", déclinaisons " + ", ".join(
+            f"{r.name} {r.width}x{r.height}"
+            + (f" ≤{r.max_bitrate}" if r.max_bitrate else "")
+            for r in args.renditions
+        )
+    if not args.label:
+        label = "aucun"
+    else:
+        label_pass = "fusionnée au découpage" if fused_label else "séparée"
+        label = f"'{args.label_template}', passe {label_pass}"
+        if args.label_font:
+            label += f", police {args.label_font}"
+    lines = [
+        f"Plan ytb-to-tiktok {__version__}",
+        f"  source     : {source}",
+        f"  découpage  : {split}",
+        f"  label      : {label}",
+        f"  encodage   : profil {args.encoder_profile}",
+        f"  segments   : {segments_root}",
+        "  reprise    : "
+        + (
+            "désactivée (--no-resume)"
+            if args.no_resume
+            else f"manifeste par URL dans {output_dir / '.jobs'}"
+        ),
+    ]
+    if not args.no_resume:
+        for url in urls:
+            stages = JobManifest.for_url(output_dir, url).stage_names()
+            labels = sum(1 for name in stages if name.startswith("label/"))
+            done = [name for name in stages if not name.startswith("label/")]
+            if labels:
+                done.append(f"label ({labels} segment(s))")
+            lines.append(
+                f"    {url}: {', '.join(done) if done else 'aucune étape enregistrée'}"
+            )
+    print("\n".join(lines))
+
+
+def _main_single(
+    args: argparse.Namespace,
+    output_dir: Path,
+    segments_root: Path,
+    downloads_dir: Path,
+    cancel: CancelToken,
+) -> int:
+    """Une seule vidéo: téléchargement (ou flux, ou fichier local), découpage, labels.
+
+    Les labels sont ajoutés ici s'ils sont en passe séparée.
+    """
+    label_options = _label_options_from_args(args)
+    fused_label = _label_is_fused(args)
+    separate_label = label_options if args.label and not fused_label else None
+    thumbnail = _thumbnail_options_from_args(args)
+    manifest = JobManifest.for_url(output_dir, args.url, enabled=not args.no_resume)
+    kind = source_kind(args.url)
+
     console.rule("ytb-to-tiktok")
-    console.print("[bold]1) Téléchargement de la vidéo YouTube[/]")
-    with Progress(
-        TextColumn("[progress.description]{task.description}"),
-        BarColumn(),
-        TimeElapsedColumn(),
-        transient=True,
-        console=console,
-    ) as progress:
-        task = progress.add_task("Téléchargement en cours...", total=None)
-        result = download_youtube(
-            args.url,
-            downloads_dir,
-            cookies_file=args.cookies,
-            cookies_from_browser=args.cookies_from_browser,
-            user_agent=args.user_agent,
-            proxy=args.proxy,
-        )
-        progress.update(task, completed=1)
-
-    console.print(f"[green]OK[/] Téléchargé: [italic]{result.video_path.name}[/]")
-
-    console.print("[bold]2) Découpage en segments[/]")
-    parts = split_video_ffmpeg(result.video_path, segments_root, segment_seconds=args.segment_seconds, limit=args.limit)
-    console.print(f"[green]OK[/] {len(parts)} segment(s) créé(s) dans {segments_root}")
-
-    if args.label and parts:
-        console.print("[bold]3) Ajout de la surimpression 'Partie X'[/]")
-        total = len(parts)
-        for index, part in enumerate(parts, start=1):
-            label_text = args.label_template.format(i=index, n=index, total=total)
-            tmp_out = part.with_name(part.stem + "_labeled" + part.suffix)
-            if args.label_rounded:
-                overlay_label_with_pillow(
-                    part,
-                    tmp_out,
-                    label_text,
-                    fontsize=args.label_fontsize,
-                    fontcolor=args.label_color,
-                    bg_color=args.label_boxcolor,
-                    padding=args.label_padding,
-                    radius=args.label_radius,
-                    position=args.label_position,
+    if args.stream and kind == "file":
+        _warn(
+            "--stream ignoré pour un fichier local (déjà lu au fil du découpage)",
+            job=args.url,
+        )
+    if args.stream and kind != "file":
+        console.print("[bold]1-2) Lecture en flux et découpage simultané[/]")
+        if args.cut_strategy != "fixed":
+            _warn(
+                "--cut-strategy ignoré en lecture en flux (coupes fixes)", job=args.url
+            )
+        profile = _resolve_profile(args, None, cancel, job=args.url)
+        params = {
+            "stream": True,
+            "url": args.url,
+            "segments_dir": str(segments_root.resolve()),
+            "segment_seconds": args.segment_seconds,
+            "limit": args.limit,
+            "label": asdict(label_options) if fused_label else None,
+            "reframe": args.reframe,
+            "thumbnail": asdict(thumbnail) if thumbnail is not None else None,
+            "profile": asdict(profile),
+        }
+        with events.stage(
+            "split", job=args.url, mode="stream", profile=profile.name
+        ) as outcome:
+            resumed = _current_split_outputs(
+                manifest, params, separate_label, profile, thumbnail
+            )
+            if resumed is not None:
+                parts = resumed
+                outcome["status"] = "skipped"
+                _emit_resumed_segments(parts, "split", args.url)
+                console.print(
+                    "[green]OK[/] Découpage déjà fait (manifeste), étape ignorée"
                 )
             else:
-                overlay_text_on_video(
-                    part,
-                    tmp_out,
-                    label_text,
-                    fontsize=args.label_fontsize,
-                    fontcolor=args.label_color,
-                    box=args.label_box,
-                    boxcolor=args.label_boxcolor,
-                    boxborderw=args.label_boxborderw,
-                    position=args.label_position,
+                if kind == "http":
+                    source = resolve_http_stream(
+                        args.url, user_agent=args.user_agent, proxy=args.proxy
+                    )
+                else:
+                    source = resolve_youtube_stream(
+                        args.url,
+                        downloads_dir,
+                        cookies_file=args.cookies,
+                        cookies_from_browser=args.cookies_from_browser,
+                        user_agent=args.user_agent,
+                        proxy=args.proxy,
+                    )
+                keep_copy = downloads_dir / f"{source.stem}.mp4"
+                with _ProgressBoard():
+                    parts = split_stream_ffmpeg(
+                        source,
+                        segments_root,
+                        segment_seconds=args.segment_seconds,
+                        limit=args.limit,
+                        label=label_options if fused_label else None,
+                        reframe=args.reframe,
+                        keep_copy=keep_copy,
+                        profile=profile,
+                        thumbnail=thumbnail,
+                        cancel=cancel,
+                        report=events.JobReporter(args.url, "split"),
+                    )
+                if not args.limit and keep_copy.is_file():
+                    # Copie complète: même enregistrement qu'un téléchargement,
+                    # reprise sans --stream
+                    download_params = {
+                        "url": args.url,
+                        "downloads_dir": str(downloads_dir.resolve()),
+                    }
+                    manifest.complete(
+                        "download", download_params, [keep_copy], title=source.title
+                    )
+                manifest.invalidate("label/")
+                manifest.complete("split", params, parts)
+                partial = " (partielle, --limit)" if args.limit else ""
+                console.print(
+                    f"[green]OK[/] Source conservée{partial}: "
+                    f"[italic]{keep_copy.name}[/]"
                 )
-            try:
-                os.replace(tmp_out, part)
-            except Exception:
-                try:
-                    if part.exists():
-                        part.unlink()
-                finally:
-                    os.replace(tmp_out, part)
-        console.print(f"[green]OK[/] Surimpression ajoutée sur {total} segment(s)")
+            outcome["segments"] = len(parts)
+        _emit_thumbnails(parts, "split", args.url, thumbnail)
+    else:
+        if kind == "file":
+            console.print("[bold]1) Source locale (sans téléchargement ni copie)[/]")
+        else:
+            console.print(
+                "[bold]1) Téléchargement de la vidéo "
+                f"{'(URL directe)' if kind == 'http' else 'YouTube'}[/]"
+            )
+        with _ProgressBoard() as board:
+            result, skipped = _download_step(
+                manifest, args.url, downloads_dir, args, board.download_hook, cancel
+            )
+
+        if kind == "file":
+            where = (
+                "lien physique"
+                if result.video_path != local_path(args.url)
+                else "lecture sur place"
+            )
+            console.print(
+                f"[green]OK[/] Source locale ({where}): [italic]{result.video_path}[/]"
+            )
+        elif skipped:
+            console.print(
+                "[green]OK[/] Déjà téléchargé (manifeste): "
+                f"[italic]{result.video_path.name}[/]"
+            )
+        else:
+            console.print(
+                f"[green]OK[/] Téléchargé: [italic]{result.video_path.name}[/]"
+            )
+
+        console.print("[bold]2) Découpage en segments[/]")
+        profile = _resolve_profile(args, result.video_path, cancel, job=args.url)
+        with _ProgressBoard():
+            parts, skipped = _split_step(
+                manifest,
+                result.video_path,
+                segments_root,
+                args,
+                label_options if fused_label else None,
+                separate_label,
+                profile,
+                cancel,
+                job=args.url,
+            )
+        if skipped:
+            console.print("[green]OK[/] Découpage déjà fait (manifeste), étape ignorée")
+    console.print(f"[green]OK[/] {len(parts)} segment(s) dans {segments_root}")
+    if thumbnail is not None and parts:
+        written = sum(
+            1 for _, thumb in paired_thumbnails(parts, thumbnail) if thumb is not None
+        )
+        console.print(
+            f"[green]OK[/] {written} miniature(s) {thumbnail.format}"
+            f" ({thumbnail.choice}) à côté des segments"
+        )
+    if fused_label and parts:
+        console.print(
+            "[green]OK[/] Surimpression ajoutée pendant le découpage "
+            f"sur {len(parts)} segment(s)"
+        )
+
+    if separate_label is not None and parts:
+        console.print("[bold]3) Ajout de la surimpression 'Partie X'[/]")
+        with _ProgressBoard(), events.stage("label", job=args.url, segments=len(parts)):
+            done = apply_labels(
+                parts, separate_label, manifest, profile, cancel, job=args.url
+            )
+        skipped_count = len(parts) - done
+        resumed_note = (
+            f" ({skipped_count} déjà faite(s), ignorée(s))" if skipped_count else ""
+        )
+        console.print(
+            f"[green]OK[/] Surimpression ajoutée sur {len(parts)} segment(s)"
+            f"{resumed_note}"
+        )
 
     return 0
 
 
 if __name__ == "__main__":  # pragma: no cover
     raise SystemExit(main())
-
-
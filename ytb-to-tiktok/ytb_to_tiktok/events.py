@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any, Callable, Iterator, Optional
+
+from .cancel import Cancelled
+from .runner import ProgressCallback, ProgressEvent
+
+# Types d'événements publiés par le pipeline (champ "type" des lignes JSON)
+EVENT_TYPES = (
+    "job_start",  # début d'un job (une URL): url, index/total en mode lot
+    "job_end",  # fin d'un job: status (ok, error, cancelled), seconds, segments
+    "stage_start",  # début d'une étape: stage (download, probe, split, label...)
+    "stage_end",  # fin d'une étape: status (ok, skipped, error, cancelled), seconds
+    # avancement: stage, fraction, eta, fps, speed (ffmpeg) ou octets (téléchargement)
+    "progress",
+    "segment",  # segment produit ou étiqueté: path, index, total
+    "thumbnail",  # miniature écrite pour un segment: path, segment, index, total
+    "warning",  # message non bloquant
+    "error",  # échec d'une étape ou d'un job: message
+)
+
+# Intervalle minimal entre deux événements "progress" d'une même étape
+PROGRESS_INTERVAL_SECONDS = 0.5
+
+
+@dataclass
+class PipelineEvent:
+    """Événement structuré du pipeline; `data` porte les champs propres au type."""
+
+    type: str
+    time: float = field(default_factory=time.time)
+    job: Optional[str] = None
+    stage: Optional[str] = None
+    data: dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        record: dict[str, Any] = {"type": self.type, "time": round(self.time, 3)}
+        if self.job is not None:
+            record["job"] = self.job
+        if self.stage is not None:
+            record["stage"] = self.stage
+        record.update(self.data)
+        return record
+
+
+EventCallback = Callable[[PipelineEvent], None]
+
+_listeners: list[EventCallback] = []
+_listeners_lock = threading.Lock()
+_last_progress: dict[tuple[Optional[str], Optional[str]], float] = {}
+
+
+def has_listeners() -> bool:
+    """Permet d'éviter de construire un événement quand personne ne l'écoute."""
+    return bool(_listeners)
+
+
+def add_event_listener(callback: EventCallback) -> None:
+    """Reçoit tous les événements du pipeline (tous threads).
+
+    L'avancement ffmpeg y passe aussi, via JobReporter.
+    """
+    with _listeners_lock:
+        _listeners.append(callback)
+
+
+def remove_event_listener(callback: EventCallback) -> None:
+    with _listeners_lock:
+        if callback in _listeners:
+            _listeners.remove(callback)
+            if not _listeners:
+                _last_progress.clear()
+
+
+@contextmanager
+def event_listener(callback: EventCallback) -> Iterator[None]:
+    add_event_listener(callback)
+    try:
+        yield
+    finally:
+        remove_event_listener(callback)
+
+
+def emit(
+    type: str, *, job: Optional[str] = None, stage: Optional[str] = None, **data: Any
+) -> None:
+    """Publie un événement (sans effet s'il n'y a aucun écouteur)."""
+    if not _listeners:
+        return
+    event = PipelineEvent(type=type, job=job, stage=stage, data=data)
+    with _listeners_lock:
+        callbacks = list(_listeners)
+    for callback in callbacks:
+        try:
+            callback(event)
+        except Exception:
+            # Un consommateur défaillant ne doit pas interrompre le traitement
+            pass
+
+
+def emit_progress(
+    *, job: Optional[str] = None, stage: str, done: bool = False, **data: Any
+) -> None:
+    """Événement "progress", au plus un par PROGRESS_INTERVAL_SECONDS et par étape.
+
+    Le dernier événement d'une étape est toujours publié.
+    """
+    if not _listeners:
+        return
+    key = (job, stage)
+    now = time.perf_counter()
+    if not done and now - _last_progress.get(key, 0.0) < PROGRESS_INTERVAL_SECONDS:
+        return
+    if done:
+        _last_progress.pop(key, None)
+    else:
+        _last_progress[key] = now
+    emit("progress", job=job, stage=stage, done=done, **data)
+
+
+def _forward_ffmpeg_progress(event: ProgressEvent, job: Optional[str]) -> None:
+    data: dict[str, Any] = {
+        "out_time": round(event.out_time, 3),
+        "duration": round(event.duration, 3) if event.duration else None,
+        "fraction": round(event.fraction, 4) if event.fraction is not None else None,
+        "eta": round(event.eta, 1) if event.eta is not None else None,
+        "fps": event.fps,
+        "speed": event.speed,
+        "bitrate": event.bitrate,
+        "total_size": event.total_size,
+    }
+    if event.usage is not None:
+        data["cpu_seconds"] = event.usage.cpu_time
+        data["max_rss"] = event.usage.max_rss
+    emit_progress(job=job, stage=f"ffmpeg · {event.stage}", done=event.done, **data)
+
+
+class JobReporter:
+    """Événements d'une étape d'un job, pour les fonctions de découpage et d'étiquetage.
+
+    `progress` se passe en on_progress à run_ffmpeg: l'avancement ffmpeg est publié avec
+    le job (les écouteurs globaux du runner ne savent pas à quel job appartient un
+    processus). `segment` publie un segment dès que son fichier est finalisé.
+    """
+
+    def __init__(self, job: Optional[str], stage: str) -> None:
+        self.job = job
+        self.stage = stage
+
+    def progress(self, event: ProgressEvent) -> None:
+        if _listeners:
+            _forward_ffmpeg_progress(event, self.job)
+
+    def segment(self, path: Path, index: int, total: Optional[int]) -> None:
+        """Segment terminé; `index` commence à 1."""
+        emit(
+            "segment",
+            job=self.job,
+            stage=self.stage,
+            path=str(path),
+            index=index,
+            total=total,
+        )
+
+    def segment_watcher(
+        self, out_dir: Path, pattern: str, total: Optional[int] = None
+    ) -> ProgressCallback:
+        """Callback on_progress d'un ffmpeg à muxer segment (<base>_%04d.mp4).
+
+        Le muxer ferme un segment avant d'ouvrir le suivant: à chaque événement
+        d'avancement, tous les segments écrits sauf le dernier sont finalisés; le
+        dernier l'est à la fin du processus (les sorties d'un ffmpeg en échec sont
+        supprimées avant cet ultime événement). Les segments au-delà de `total`
+        (--limit) ne sont pas publiés.
+        """
+        since = time.time()
+        published: set[Path] = set()
+
+        def on_progress(event: ProgressEvent) -> None:
+            self.progress(event)
+            if not _listeners:
+                return
+            written = []
+            for path in sorted(out_dir.glob(pattern)):
+                try:
+                    # Marge d'une seconde:
+                    # résolution des mtime (comme remove_partial_outputs)
+                    if path.stat().st_mtime >= since - 1.0:
+                        written.append(path)
+                except OSError:
+                    pass
+            for path in written if event.done else written[:-1]:
+                index = int(path.stem[-4:]) + 1
+                if path not in published and (total is None or index <= total):
+                    published.add(path)
+                    self.segment(path, index, total)
+
+        return on_progress
+
+
+@contextmanager
+def stage(
+    name: str, *, job: Optional[str] = None, **data: Any
+) -> Iterator[dict[str, Any]]:
+    """Encadre une étape par stage_start / stage_end (avec durée et statut).
+
+    Le dict renvoyé complète l'événement de fin (ex: result["status"] = "skipped",
+    result["segments"] = 12). Une exception produit un événement "error" puis un
+    stage_end "error" (ou "cancelled"), et est relancée.
+    """
+    emit("stage_start", job=job, stage=name, **data)
+    started = time.perf_counter()
+    result: dict[str, Any] = {"status": "ok"}
+    try:
+        yield result
+    except Cancelled:
+        result["status"] = "cancelled"
+        raise
+    except Exception as exc:
+        result["status"] = "error"
+        emit("error", job=job, stage=name, message=str(exc))
+        raise
+    finally:
+        emit(
+            "stage_end",
+            job=job,
+            stage=name,
+            seconds=round(time.perf_counter() - started, 3),
+            **result,
+        )
+
+
+class JsonlWriter:
+    """Écouteur qui écrit chaque événement en une ligne JSON (flush, thread-safe)."""
+
+    def __init__(self, stream: IO[str]) -> None:
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def __call__(self, event: PipelineEvent) -> None:
+        line = json.dumps(event.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
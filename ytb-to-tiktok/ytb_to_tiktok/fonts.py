@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import json
+import os
+import struct
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional, Sequence
+
+from .cache import default_cache_dir
+
+FONT_EXTENSIONS = (".ttf", ".otf", ".ttc")
+
+# Police du label quand --label-font n'est pas donné: la première famille présente
+DEFAULT_FAMILIES = (
+    "Arial",
+    "Segoe UI",
+    "Helvetica",
+    "DejaVu Sans",
+    "Liberation Sans",
+    "Noto Sans",
+    "Roboto",
+)
+
+# Styles préférés quand seul le nom de famille est donné
+_REGULAR_STYLES = ("regular", "book", "normal", "roman", "medium")
+
+# 2: l'index porte "scanned_at" (un index vide issu d'un parcours reste valide)
+_INDEX_VERSION = 2
+
+
+@dataclass(frozen=True)
+class FontEntry:
+    family: str
+    style: str
+    path: str
+    mtime: float
+
+    @property
+    def name(self) -> str:
+        return f"{self.family} {self.style}"
+
+
+def font_dirs() -> list[Path]:
+    """Dossiers de polices système et utilisateur de la plateforme courante."""
+    home = Path.home()
+    if sys.platform.startswith("win"):
+        windir = Path(os.environ.get("WINDIR", "C:/Windows"))
+        dirs = [windir / "Fonts"]
+        local = os.environ.get("LOCALAPPDATA")
+        if local:
+            dirs.append(Path(local) / "Microsoft" / "Windows" / "Fonts")
+        return dirs
+    if sys.platform == "darwin":
+        return [
+            Path("/System/Library/Fonts"),
+            Path("/Library/Fonts"),
+            home / "Library" / "Fonts",
+        ]
+    data_home = Path(os.environ.get("XDG_DATA_HOME") or home / ".local" / "share")
+    return [
+        Path("/usr/share/fonts"),
+        Path("/usr/local/share/fonts"),
+        data_home / "fonts",
+        home / ".fonts",
+    ]
+
+
+def read_font_names(path: Path) -> Optional[tuple[str, str]]:
+    """(famille, style) lus dans la table 'name' d'un fichier TrueType/OpenType.
+
+    Pour une collection (.ttc), seule la première police est lue.
+    """
+    try:
+        with open(path, "rb") as handle:
+            header = handle.read(12)
+            if header[:4] == b"ttcf":
+                handle.seek(12)
+                (offset,) = struct.unpack(">I", handle.read(4))
+                handle.seek(offset)
+                header = handle.read(12)
+            (num_tables,) = struct.unpack(">H", header[4:6])
+            directory = handle.read(16 * num_tables)
+            for index in range(num_tables):
+                tag, _, table_offset, length = struct.unpack(
+                    ">4sIII", directory[16 * index : 16 * index + 16]
+                )
+                if tag == b"name":
+                    break
+            else:
+                return None
+            handle.seek(table_offset)
+            table = handle.read(length)
+        _, count, strings = struct.unpack(">HHH", table[:6])
+        # nameID 1/2: famille/style; 16/17: famille/style typographiques (prioritaires)
+        names: dict[int, tuple[int, str]] = {}
+        for index in range(count):
+            platform, encoding, language, name_id, size, offset = struct.unpack(
+                ">6H", table[6 + 12 * index : 18 + 12 * index]
+            )
+            if name_id not in (1, 2, 16, 17):
+                continue
+            raw = table[strings + offset : strings + offset + size]
+            if platform in (0, 3):
+                text = raw.decode("utf-16-be", errors="replace")
+                rank = 0 if platform == 3 and language == 0x409 else 1
+            elif platform == 1 and encoding == 0:
+                text = raw.decode("mac_roman", errors="replace")
+                rank = 2
+            else:
+                continue
+            if text.strip() and (name_id not in names or rank < names[name_id][0]):
+                names[name_id] = (rank, text.strip())
+    except (OSError, struct.error, ValueError):
+        return None
+    family = names.get(16) or names.get(1)
+    style = names.get(17) or names.get(2)
+    if family is None:
+        return None
+    return family[1], style[1] if style is not None else "Regular"
+
+
+def _normalize(name: str) -> str:
+    return "".join(ch for ch in name.casefold() if ch.isalnum())
+
+
+class FontRegistry:
+    """Index des polices installées, persisté dans le dossier de cache.
+
+    Les dossiers ne sont parcourus qu'à la création de l'index ou quand l'un d'eux
+    a changé (mtime); seuls les fichiers nouveaux ou modifiés sont alors relus. Les
+    noms se résolvent ensuite sans accès disque: "DejaVu Sans", "DejaVu Sans Bold",
+    "dejavusans-bold", un nom de fichier sans extension ou un chemin vers un
+    fichier de police.
+    """
+
+    def __init__(
+        self, dirs: Optional[Sequence[Path]] = None, index_path: Optional[Path] = None
+    ) -> None:
+        self.dirs = list(dirs) if dirs is not None else font_dirs()
+        self._index_path = index_path
+        self._fonts: Optional[list[FontEntry]] = None
+        self._resolved: dict[Optional[str], Optional[FontEntry]] = {}
+        self._lock = threading.Lock()
+        self._resolved_lock = threading.Lock()
+
+    @property
+    def index_path(self) -> Path:
+        return self._index_path or default_cache_dir() / "fonts.json"
+
+    def fonts(self) -> list[FontEntry]:
+        with self._lock:
+            if self._fonts is None:
+                self._fonts = self._load_or_scan()
+            return self._fonts
+
+    def resolve(self, name: Optional[str] = None) -> Optional[FontEntry]:
+        """Police demandée, ou par défaut si `name` est None (None si aucune installée).
+
+        Lève RuntimeError (avec des suggestions) si `name` ne correspond à
+        aucune police.
+        """
+        with self._resolved_lock:
+            if name in self._resolved:
+                return self._resolved[name]
+        if name is None:
+            entry = next(
+                filter(None, (self._match(family) for family in DEFAULT_FAMILIES)), None
+            )
+            if entry is None:
+                fonts = self.fonts()
+                regular = [
+                    font for font in fonts if _normalize(font.style) in _REGULAR_STYLES
+                ]
+                candidates = regular or fonts
+                entry = candidates[0] if candidates else None
+        else:
+            path = Path(name).expanduser()
+            if path.suffix.lower() in FONT_EXTENSIONS and path.is_file():
+                family, style = read_font_names(path) or (path.stem, "Regular")
+                entry = FontEntry(
+                    family, style, str(path.resolve()), path.stat().st_mtime
+                )
+            else:
+                entry = self._match(name)
+            if entry is None:
+                import difflib
+
+                choices = sorted(
+                    {font.family for font in self.fonts()}
+                    | {font.name for font in self.fonts()}
+                )
+                close = difflib.get_close_matches(name, choices, n=5, cutoff=0.5)
+                hint = f" (proches: {', '.join(close)})" if close else ""
+                raise RuntimeError(f"Police introuvable: {name}{hint}")
+        with self._resolved_lock:
+            return self._resolved.setdefault(name, entry)
+
+    def _match(self, name: str) -> Optional[FontEntry]:
+        key = _normalize(name)
+        fonts = self.fonts()
+        for font in fonts:
+            if _normalize(font.name) == key:
+                return font
+        family = [font for font in fonts if _normalize(font.family) == key]
+        if family:
+            return min(
+                family,
+                key=lambda font: (
+                    (
+                        _REGULAR_STYLES.index(_normalize(font.style))
+                        if _normalize(font.style) in _REGULAR_STYLES
+                        else len(_REGULAR_STYLES)
+                    ),
+                    font.path,
+                ),
+            )
+        for font in fonts:
+            if _normalize(Path(font.path).stem) == key:
+                return font
+        return None
+
+    def _load_or_scan(self) -> list[FontEntry]:
+        roots = [str(path) for path in self.dirs]
+        try:
+            index = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            index = {}
+        previous: dict[str, FontEntry] = {}
+        if index.get("version") == _INDEX_VERSION and index.get("roots") == roots:
+            try:
+                previous = {
+                    font["path"]: FontEntry(**font) for font in index.get("fonts") or []
+                }
+                valid = index.get("scanned_at") is not None
+            except TypeError:
+                previous, valid = {}, False
+            dirs = index.get("dirs") or {}
+            # Un index vide reste valide:
+            # sans polices installées, on ne reparcourt pas à chaque lancement
+            if valid and all(
+                _dir_mtime(Path(path)) == mtime for path, mtime in dirs.items()
+            ):
+                return sorted(previous.values(), key=lambda font: font.path)
+
+        fonts: list[FontEntry] = []
+        dirs_state: dict[str, Optional[int]] = {}
+        for root in self.dirs:
+            dirs_state[str(root)] = _dir_mtime(root)
+            for current, subdirs, files in os.walk(root):
+                subdirs.sort()
+                if current != str(root):
+                    dirs_state[current] = _dir_mtime(Path(current))
+                for filename in sorted(files):
+                    if not filename.lower().endswith(FONT_EXTENSIONS):
+                        continue
+                    path = os.path.join(current, filename)
+                    try:
+                        mtime = os.stat(path).st_mtime
+                    except OSError:
+                        continue
+                    known = previous.get(path)
+                    if known is not None and known.mtime == mtime:
+                        fonts.append(known)
+                        continue
+                    names = read_font_names(Path(path))
+                    if names is not None:
+                        fonts.append(FontEntry(names[0], names[1], path, mtime))
+        self._save(roots, dirs_state, fonts)
+        return fonts
+
+    def _save(
+        self, roots: list[str], dirs: dict[str, Optional[int]], fonts: list[FontEntry]
+    ) -> None:
+        state = {
+            "version": _INDEX_VERSION,
+            "scanned_at": time.time(),
+            "roots": roots,
+            "dirs": dirs,
+            "fonts": [asdict(font) for font in fonts],
+        }
+        try:
+            path = self.index_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(state), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+
+def _dir_mtime(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+_registry: Optional[FontRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_font_registry() -> FontRegistry:
+    """Registre de polices du processus (index relu ou construit au premier usage)."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = FontRegistry()
+        return _registry
+
+
+def reset_font_registry() -> None:
+    """Oublie l'index chargé (ex: après changement de --cache-dir)."""
+    global _registry
+    with _registry_lock:
+        _registry = None
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from .cache import _content_hash
+
+MANIFEST_VERSION = 1
+
+
+def file_record(path: Path) -> dict:
+    """Empreinte d'un fichier produit: chemin, taille, hash rapide début/fin."""
+    return {"path": str(path), "size": path.stat().st_size, "hash": _content_hash(path)}
+
+
+def record_matches(record: dict) -> bool:
+    """Le fichier existe toujours et n'a pas changé depuis l'enregistrement."""
+    path = Path(record["path"])
+    try:
+        if path.stat().st_size != record.get("size"):
+            return False
+        return _content_hash(path) == record.get("hash")
+    except OSError:
+        return False
+
+
+class JobManifest:
+    """Manifeste JSON d'un job: étapes terminées, paramètres et empreinte des sorties.
+
+    Chaque étape (download, probe, split, label/<segment>...) est enregistrée dès
+    qu'elle se termine et le fichier est réécrit atomiquement: un job interrompu reprend
+    à la première étape absente, ou dont les paramètres ou les sorties ont changé.
+    """
+
+    def __init__(self, path: Path, enabled: bool = True) -> None:
+        self.path = path
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._data: dict[str, Any] = {"version": MANIFEST_VERSION, "stages": {}}
+        if enabled:
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                if data.get("version") == MANIFEST_VERSION and isinstance(
+                    data.get("stages"), dict
+                ):
+                    self._data = data
+            except (OSError, ValueError):
+                pass
+
+    @classmethod
+    def for_url(cls, output_dir: Path, url: str, enabled: bool = True) -> "JobManifest":
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+        return cls(output_dir / ".jobs" / f"{digest}.json", enabled=enabled)
+
+    def stage(self, name: str) -> Optional[dict]:
+        """Enregistrement d'une étape (None si absente ou reprise désactivée)."""
+        if not self.enabled:
+            return None
+        record: Optional[dict] = self._data["stages"].get(name)
+        return record
+
+    def stage_names(self) -> list[str]:
+        """Étapes enregistrées (non revérifiées), dans leur ordre de fin."""
+        if not self.enabled:
+            return []
+        return list(self._data["stages"])
+
+    def is_complete(self, name: str, params: dict) -> bool:
+        """Étape terminée avec les mêmes paramètres et des sorties intactes."""
+        record = self.stage(name)
+        if record is None or record.get("params") != params:
+            return False
+        return all(record_matches(output) for output in record.get("outputs", []))
+
+    def complete(
+        self, name: str, params: dict, outputs: list[Path], **extra: Any
+    ) -> dict:
+        """Enregistre une étape terminée et sauvegarde le manifeste."""
+        record = {
+            "params": params,
+            "outputs": [file_record(path) for path in outputs],
+            "completed_at": time.time(),
+            **extra,
+        }
+        with self._lock:
+            self._data["stages"][name] = record
+            self._save()
+        return record
+
+    def invalidate(self, prefix: str) -> None:
+        """Oublie les étapes dont le nom commence par `prefix`.
+
+        Ex: 'label/' après un nouveau découpage.
+        """
+        with self._lock:
+            stages = self._data["stages"]
+            for name in [n for n in stages if n.startswith(prefix)]:
+                del stages[name]
+            self._save()
+
+    def _save(self) -> None:
+        if not self.enabled:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + f".{os.getpid()}.tmp")
+            tmp.write_text(
+                json.dumps(self._data, indent=2, ensure_ascii=False), encoding="utf-8"
+            )
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
@@ -0,0 +1,405 @@
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from .cancel import CancelToken
+from .runner import run_ffmpeg, run_process
+
+# Passe d'analyse des changements de plan:
+# images échantillonnées et réduites avant le score
+SCENE_SAMPLE_FPS = 5
+SCENE_SAMPLE_WIDTH = 160
+# Score (0..1) minimal d'un changement de plan gardé dans l'index
+SCENE_INDEX_THRESHOLD = 0.1
+# Carte des silences (passe audio seule):
+# niveau sous lequel l'audio est silencieux, durée minimale
+SILENCE_NOISE_DB = -35
+SILENCE_MIN_SECONDS = 0.3
+
+
+@dataclass
+class VideoStreamInfo:
+    codec: str
+    profile: Optional[str]
+    width: int
+    height: int
+    pix_fmt: Optional[str]
+    fps: Optional[float]
+    bit_rate: Optional[int] = None
+
+
+@dataclass
+class MediaInfo:
+    """Ce qu'on sait d'un fichier média après une sonde (et ses images clés)."""
+
+    duration: Optional[float]
+    bit_rate: Optional[int] = None
+    video: Optional[VideoStreamInfo] = None
+    audio_codec: Optional[str] = None
+    audio_bit_rate: Optional[int] = None
+    keyframes: Optional[list[float]] = None
+    # Changements de plan [instant, score], voir probe_scene_changes
+    scenes: Optional[list[list[float]]] = None
+    # Silences [début, fin], voir probe_silences
+    silences: Optional[list[list[float]]] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "duration": self.duration,
+            "bit_rate": self.bit_rate,
+            "video": None if self.video is None else dict(self.video.__dict__),
+            "audio_codec": self.audio_codec,
+            "audio_bit_rate": self.audio_bit_rate,
+            "keyframes": self.keyframes,
+            "scenes": self.scenes,
+            "silences": self.silences,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MediaInfo":
+        video = data.get("video")
+        return cls(
+            duration=data.get("duration"),
+            bit_rate=data.get("bit_rate"),
+            video=None if video is None else VideoStreamInfo(**video),
+            audio_codec=data.get("audio_codec"),
+            audio_bit_rate=data.get("audio_bit_rate"),
+            keyframes=data.get("keyframes"),
+            scenes=data.get("scenes"),
+            silences=data.get("silences"),
+        )
+
+
+def _parse_rate(value: str) -> Optional[float]:
+    """Convertit un débit d'images ffprobe ('30000/1001', '25') en float."""
+    try:
+        if "/" in value:
+            num, den = value.split("/", 1)
+            return float(num) / float(den) if float(den) else None
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _parse_int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def probe_media_info(
+    input_path: Path | str, ffmpeg_path: str, ffprobe_path: Optional[str] = None
+) -> MediaInfo:
+    """Sonde durée, débits et flux (vidéo + audio) en un seul sous-processus.
+
+    Avec ffprobe on lit une sortie JSON; sinon on analyse le stderr de `ffmpeg -i`.
+    """
+    if ffprobe_path is not None:
+        cmd = [
+            ffprobe_path,
+            "-v",
+            "error",
+            "-show_entries",
+            "format=duration,bit_rate"
+            ":stream=codec_type,codec_name,profile,width,height,pix_fmt,"
+            "avg_frame_rate,r_frame_rate,bit_rate",
+            "-of",
+            "json",
+            str(input_path),
+        ]
+        proc = run_process(cmd, stage="sonde", capture_stdout=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"ffprobe a échoué:\n{proc.stderr}")
+        data = json.loads(proc.stdout or "{}")
+        fmt = data.get("format") or {}
+        info = MediaInfo(
+            duration=_parse_float(fmt.get("duration")),
+            bit_rate=_parse_int(fmt.get("bit_rate")),
+        )
+        for stream in data.get("streams") or []:
+            if stream.get("codec_type") == "video" and info.video is None:
+                fps = _parse_rate(stream.get("avg_frame_rate", ""))
+                fps = fps or _parse_rate(stream.get("r_frame_rate", ""))
+                info.video = VideoStreamInfo(
+                    codec=stream.get("codec_name", ""),
+                    profile=stream.get("profile"),
+                    width=int(stream.get("width") or 0),
+                    height=int(stream.get("height") or 0),
+                    pix_fmt=stream.get("pix_fmt"),
+                    fps=fps,
+                    bit_rate=_parse_int(stream.get("bit_rate")),
+                )
+            elif stream.get("codec_type") == "audio" and info.audio_codec is None:
+                info.audio_codec = stream.get("codec_name")
+                info.audio_bit_rate = _parse_int(stream.get("bit_rate"))
+        return info
+
+    # Sans ffprobe: ffmpeg -i retourne toujours un code d'erreur,
+    # mais tout est dans stderr
+    stderr_lines: list[bytes] = []
+    run_process(
+        [ffmpeg_path, "-hide_banner", "-i", str(input_path)],
+        stage="sonde",
+        on_stderr_line=stderr_lines.append,
+    )
+    stderr_output = b"".join(stderr_lines).decode("utf-8", errors="replace")
+    info = MediaInfo(duration=None)
+
+    # "Duration: HH:MM:SS.xx, start: ..., bitrate: N kb/s"
+    duration_match = re.search(
+        r"Duration: (\d{2}):(\d{2}):(\d{2})\.(\d{2})", stderr_output
+    )
+    if duration_match:
+        hours = int(duration_match.group(1))
+        minutes = int(duration_match.group(2))
+        seconds = int(duration_match.group(3))
+        centiseconds = int(duration_match.group(4))
+        info.duration = hours * 3600 + minutes * 60 + seconds + centiseconds / 100.0
+    bitrate_match = re.search(r"Duration: .*?bitrate: (\d+) kb/s", stderr_output)
+    if bitrate_match:
+        info.bit_rate = int(bitrate_match.group(1)) * 1000
+
+    # Ex: "Stream #0:0...: Video: h264 (High) ..., yuv420p(...), 1280x720 ..., 30 fps"
+    video_match = re.search(r"Stream #\d+:\d+.*?: Video: (.*)", stderr_output)
+    if video_match:
+        description = video_match.group(1)
+        codec_match = re.match(r"(\w+)(?: \(([^)]*)\))?", description)
+        size_match = re.search(r"\b(\d{2,5})x(\d{2,5})\b", description)
+        fps_match = re.search(r"([0-9.]+)(k?) fps", description)
+        pix_fmt_match = re.search(
+            r", (\w+)(?:\([^)]*\))?, \d{2,5}x\d{2,5}", description
+        )
+        rate_match = re.search(r"(\d+) kb/s", description)
+        fps = (
+            float(fps_match.group(1)) * (1000.0 if fps_match.group(2) else 1.0)
+            if fps_match
+            else None
+        )
+        info.video = VideoStreamInfo(
+            codec=codec_match.group(1) if codec_match else "",
+            profile=codec_match.group(2) if codec_match else None,
+            width=int(size_match.group(1)) if size_match else 0,
+            height=int(size_match.group(2)) if size_match else 0,
+            pix_fmt=pix_fmt_match.group(1) if pix_fmt_match else None,
+            fps=fps,
+            bit_rate=int(rate_match.group(1)) * 1000 if rate_match else None,
+        )
+    audio_match = re.search(r"Stream #\d+:\d+.*?: Audio: (\w+)(.*)", stderr_output)
+    if audio_match:
+        info.audio_codec = audio_match.group(1)
+        rate_match = re.search(r"(\d+) kb/s", audio_match.group(2))
+        info.audio_bit_rate = int(rate_match.group(1)) * 1000 if rate_match else None
+    return info
+
+
+def probe_keyframe_times(
+    input_path: Path, ffmpeg_path: str, ffprobe_path: Optional[str] = None
+) -> list[float]:
+    """Renvoie les instants (secondes, triés) des images clés du premier flux vidéo.
+
+    Avec ffprobe on lit uniquement les paquets (aucun décodage); sinon ffmpeg ne décode
+    que les images clés (-skip_frame nokey) et on lit les pts via le filtre showinfo.
+    """
+    if ffprobe_path is not None:
+        cmd = [
+            ffprobe_path,
+            "-v",
+            "error",
+            "-select_streams",
+            "v:0",
+            "-show_entries",
+            "packet=pts_time,flags",
+            "-of",
+            "csv=p=0",
+            str(input_path),
+        ]
+        times: set[float] = set()
+
+        def on_packet(line: bytes) -> None:
+            # Lu au fil de l'eau:
+            # une source de plusieurs heures a des centaines de milliers de paquets
+            fields = line.decode("ascii", errors="replace").strip().split(",")
+            if len(fields) < 2 or "K" not in fields[1]:
+                return
+            try:
+                times.add(round(float(fields[0]), 6))
+            except ValueError:
+                pass
+
+        proc = run_process(cmd, stage="images clés", on_stdout_line=on_packet)
+        if proc.returncode != 0:
+            raise RuntimeError(f"ffprobe (images clés) a échoué:\n{proc.stderr}")
+        return sorted(times)
+
+    cmd = [
+        ffmpeg_path,
+        "-hide_banner",
+        "-skip_frame",
+        "nokey",
+        "-i",
+        str(input_path),
+        "-map",
+        "0:v:0",
+        "-vf",
+        "showinfo",
+        "-f",
+        "null",
+        "-",
+    ]
+    times = set()
+
+    def on_showinfo(line: bytes) -> None:
+        match = re.search(rb"pts_time:\s*(-?[0-9.]+)", line)
+        if match:
+            times.add(round(float(match.group(1)), 6))
+
+    proc = run_process(cmd, stage="images clés", on_stderr_line=on_showinfo)
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg (images clés) a échoué:\n{proc.stderr}")
+    return sorted(times)
+
+
+def probe_scene_changes(
+    input_path: Path,
+    ffmpeg_path: str,
+    duration: Optional[float] = None,
+    cancel: Optional[CancelToken] = None,
+) -> list[list[float]]:
+    """Index compact des changements de plan: [instant (s), score 0..1], par instant.
+
+    Une seule passe de décodage allégée: vidéo seule, images non référencées ignorées,
+    puis SCENE_SAMPLE_FPS images/s réduites à SCENE_SAMPLE_WIDTH px avant le score
+    `scene` du filtre select. Les instants sont donc précis à 1/SCENE_SAMPLE_FPS s près;
+    seuls les scores d'au moins SCENE_INDEX_THRESHOLD sont gardés.
+    """
+    cmd = [
+        ffmpeg_path,
+        "-hide_banner",
+        "-skip_frame",
+        "noref",
+        "-i",
+        str(input_path),
+        "-map",
+        "0:v:0",
+        "-vf",
+        f"fps={SCENE_SAMPLE_FPS},scale={SCENE_SAMPLE_WIDTH}:-2:flags=fast_bilinear,"
+        f"select='gt(scene,{SCENE_INDEX_THRESHOLD})',"
+        "metadata=print:key=lavfi.scene_score",
+        "-f",
+        "null",
+        "-",
+    ]
+    scenes: list[list[float]] = []
+    pending: list[float] = []
+
+    def on_metadata(line: bytes) -> None:
+        # metadata=print écrit "frame:N pts:P pts_time:T" puis "lavfi.scene_score=S"
+        time_match = re.search(rb"pts_time:\s*(-?[0-9.]+)", line)
+        if time_match:
+            pending[:] = [float(time_match.group(1))]
+            return
+        score_match = re.search(rb"lavfi\.scene_score=([0-9.]+)", line)
+        if score_match and pending:
+            scenes.append(
+                [round(pending.pop(), 3), round(float(score_match.group(1)), 3)]
+            )
+
+    proc = run_ffmpeg(
+        cmd,
+        stage=f"scènes · {input_path.stem}",
+        duration=duration,
+        cancel=cancel,
+        on_stderr_line=on_metadata,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg (changements de plan) a échoué:\n{proc.stderr}")
+    return sorted(scene for scene in scenes if scene[0] > 0)
+
+
+def probe_silences(
+    input_path: Path,
+    ffmpeg_path: str,
+    duration: Optional[float] = None,
+    cancel: Optional[CancelToken] = None,
+) -> list[list[float]]:
+    """Carte des silences [début, fin] (secondes, triés) du premier flux audio.
+
+    Seul l'audio est décodé (-vn: aucune image), analysé par le filtre silencedetect: au
+    moins SILENCE_MIN_SECONDS sous SILENCE_NOISE_DB dB. Un silence qui dure jusqu'à la
+    fin se termine à `duration`. Sans piste audio, la carte est vide.
+    """
+    cmd = [
+        ffmpeg_path,
+        "-hide_banner",
+        "-vn",
+        "-sn",
+        "-dn",
+        "-i",
+        str(input_path),
+        "-map",
+        "0:a:0?",
+        "-af",
+        f"silencedetect=noise={SILENCE_NOISE_DB}dB:d={SILENCE_MIN_SECONDS}",
+        "-f",
+        "null",
+        "-",
+    ]
+    silences: list[list[float]] = []
+    start: list[float] = []
+
+    def on_silence(line: bytes) -> None:
+        # silencedetect écrit "silence_start: T",
+        # puis "silence_end: T | silence_duration: D"
+        start_match = re.search(rb"silence_start:\s*(-?[0-9.]+)", line)
+        if start_match:
+            start[:] = [max(float(start_match.group(1)), 0.0)]
+            return
+        end_match = re.search(rb"silence_end:\s*(-?[0-9.]+)", line)
+        if end_match and start:
+            silences.append(
+                [round(start.pop(), 3), round(float(end_match.group(1)), 3)]
+            )
+
+    proc = run_ffmpeg(
+        cmd,
+        stage=f"silences · {input_path.stem}",
+        duration=duration,
+        cancel=cancel,
+        on_stderr_line=on_silence,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg (silences) a échoué:\n{proc.stderr}")
+    if start and duration is not None and duration > start[0]:
+        silences.append([round(start[0], 3), round(duration, 3)])
+    return sorted(silences)
+
+
+def read_segment_list(list_path: Path) -> list[tuple[str, float, float]]:
+    """Lit une liste CSV produite par le muxer segment (-segment_list_type csv).
+
+    Chaque ligne donne (nom du fichier, début, fin) en secondes dans la source.
+    """
+    entries: list[tuple[str, float, float]] = []
+    if not list_path.exists():
+        return entries
+    for line in list_path.read_text(encoding="utf-8").splitlines():
+        fields = line.strip().rsplit(",", 2)
+        if len(fields) != 3:
+            continue
+        try:
+            entries.append((fields[0].strip('"'), float(fields[1]), float(fields[2])))
+        except ValueError:
+            continue
+    return entries
@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Optional
+
+from .cache import default_cache_dir
+from .cancel import CancelToken
+from .runner import ProgressCallback, run_ffmpeg
+
+# Presets libx264 du plus lent (meilleure compression) au plus rapide
+X264_PRESETS = (
+    "veryslow",
+    "slower",
+    "slow",
+    "medium",
+    "fast",
+    "faster",
+    "veryfast",
+    "superfast",
+    "ultrafast",
+)
+
+
+@dataclass(frozen=True)
+class EncoderProfile:
+    """Réglages libx264 + audio partagés par tous les chemins d'encodage."""
+
+    name: str
+    preset: str
+    crf: int
+    tune: Optional[str] = None
+    threads: Optional[int] = None
+    audio_codec: str = "aac"
+    audio_bitrate: str = "128k"
+
+    def video_args(
+        self, *, crf: Optional[int] = None, threads: Optional[int] = None
+    ) -> list[str]:
+        """-c:v libx264 et ses options (crf/threads remplaçables pour un appel)."""
+        args = [
+            "-c:v",
+            "libx264",
+            "-preset",
+            self.preset,
+            "-crf",
+            str(self.crf if crf is None else crf),
+        ]
+        if self.tune:
+            args += ["-tune", self.tune]
+        threads = self.threads if threads is None else threads
+        if threads:
+            args += ["-threads", str(threads)]
+        return args
+
+    def audio_args(self) -> list[str]:
+        return ["-c:a", self.audio_codec, "-b:a", self.audio_bitrate]
+
+    def relabel_crf(self) -> int:
+        """CRF d'un ré-encodage de 2e génération (passe label séparée).
+
+        Un peu plus bas, pour limiter la perte.
+        """
+        return max(self.crf - 3, 0)
+
+
+PROFILES: dict[str, EncoderProfile] = {
+    "fast": EncoderProfile("fast", preset="veryfast", crf=23),
+    "balanced": EncoderProfile(
+        "balanced", preset="medium", crf=21, audio_bitrate="160k"
+    ),
+    "archive": EncoderProfile("archive", preset="slow", crf=18, audio_bitrate="192k"),
+}
+DEFAULT_PROFILE = PROFILES["fast"]
+PROFILE_NAMES = tuple(PROFILES) + ("auto",)
+
+# Débit façon ffmpeg: nombre, suffixe k/M facultatif (ex: 1500k, 6M, 2.5M)
+_BITRATE_PATTERN = re.compile(r"(\d+(?:\.\d+)?)([kKmM]?)")
+
+
+@dataclass(frozen=True)
+class Rendition:
+    """Déclinaison des segments (une plateforme): dossier, cadre, plafond de débit.
+
+    La vidéo est réduite pour tenir dans width x height (proportions gardées).
+    `max_bitrate` (ex: "6M") plafonne le débit vidéo du CRF du profil (-maxrate,
+    tampon de 2 s).
+    """
+
+    name: str
+    width: int
+    height: int
+    max_bitrate: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        if self.max_bitrate is not None:
+            match = _BITRATE_PATTERN.fullmatch(self.max_bitrate)
+            if match is None or float(match.group(1)) <= 0:
+                raise ValueError(
+                    f"Débit maximal invalide: {self.max_bitrate!r}"
+                    " (attendu: ex. 6M ou 1500k)"
+                )
+
+    def video_args(self, profile: EncoderProfile) -> list[str]:
+        args = profile.video_args()
+        if self.max_bitrate is not None:
+            match = _BITRATE_PATTERN.fullmatch(self.max_bitrate)
+            assert match is not None  # validé dans __post_init__
+            value, unit = match.groups()
+            args += [
+                "-maxrate",
+                self.max_bitrate,
+                "-bufsize",
+                f"{float(value) * 2:g}{unit}",
+            ]
+        return args
+
+    def scale_filter(self) -> str:
+        return (
+            f"scale={self.width}:{self.height}:force_original_aspect_ratio=decrease"
+            ":force_divisible_by=2,setsar=1"
+        )
+
+
+def parse_rendition(spec: str) -> Rendition:
+    """'nom=LxH[@débit]', ex: tiktok=1080x1920@6M ou apercu=540x960@1500k.
+
+    Lève ValueError si la spécification est invalide.
+    """
+    match = re.fullmatch(
+        r"([A-Za-z0-9_-]+)=(\d+)x(\d+)(?:@([0-9.]+[kKmM]?))?", spec.strip()
+    )
+    if match is None:
+        raise ValueError(
+            f"Déclinaison invalide: {spec!r}"
+            " (attendu: nom=LxH[@débit], ex: tiktok=1080x1920@6M)"
+        )
+    name, width, height, bitrate = match.groups()
+    if int(width) < 2 or int(height) < 2:
+        raise ValueError(f"Déclinaison invalide: {spec!r} (taille trop petite)")
+    return Rendition(name, int(width), int(height), bitrate)
+
+
+def _autotune_state_path() -> Path:
+    return default_cache_dir() / "autotune.json"
+
+
+def _load_autotune() -> dict:
+    try:
+        state: dict = json.loads(_autotune_state_path().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return state
+
+
+def _save_autotune(state: dict) -> None:
+    try:
+        path = _autotune_state_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(state, indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def measure_speed(
+    ffmpeg_path: str,
+    input_path: Path,
+    profile: EncoderProfile,
+    *,
+    start: float,
+    seconds: float,
+    filter_graph: Optional[str] = None,
+    cancel: Optional[CancelToken] = None,
+    on_progress: Optional[ProgressCallback] = None,
+) -> float:
+    """Facteur temps réel: secondes de vidéo encodées par seconde d'horloge."""
+    cmd = [
+        ffmpeg_path,
+        "-v",
+        "error",
+        "-ss",
+        f"{start:.3f}",
+        "-t",
+        f"{seconds:.3f}",
+        "-i",
+        str(input_path),
+    ]
+    if filter_graph is not None:
+        cmd += ["-filter_complex", filter_graph, "-map", "[v]"]
+    else:
+        cmd += ["-map", "0:v:0"]
+    cmd += ["-an", *profile.video_args(), "-f", "null", "-"]
+    proc = run_ffmpeg(
+        cmd,
+        stage=f"mesure · {profile.preset}",
+        duration=seconds,
+        on_progress=on_progress,
+        cancel=cancel,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg (mesure {profile.preset}) a échoué:\n{proc.stderr}")
+    assert proc.usage is not None
+    return seconds / max(proc.usage.elapsed, 1e-6)
+
+
+def autotune_profile(
+    ffmpeg_path: str,
+    input_path: Path,
+    duration: float,
+    *,
+    target_speed: float = 1.0,
+    sample_seconds: float = 8.0,
+    base: EncoderProfile = PROFILES["balanced"],
+    filter_graph: Optional[str] = None,
+    source_key: str = "",
+    cancel: Optional[CancelToken] = None,
+    on_progress: Optional[ProgressCallback] = None,
+) -> EncoderProfile:
+    """Profil 'auto': le preset le plus lent encore à >= target_speed x temps réel.
+
+    Un extrait de `sample_seconds` pris au milieu de la source est encodé
+    (sans écriture) avec le même graphe de filtres; la vitesse décroît avec le preset,
+    d'où une dichotomie (3-4 mesures). Le résultat est mémorisé par machine, source
+    (`source_key`: codec/résolution/fps), filtres et cible.
+    """
+    cache_key = json.dumps(
+        [
+            ffmpeg_path,
+            os.cpu_count(),
+            source_key,
+            filter_graph,
+            target_speed,
+            base.crf,
+            base.tune,
+        ],
+        sort_keys=True,
+    )
+    state = _load_autotune()
+    cached = state.get(cache_key)
+    if cached in X264_PRESETS:
+        return replace(base, name="auto", preset=cached)
+
+    seconds = min(sample_seconds, max(duration, 0.5))
+    start = max((duration - seconds) / 2.0, 0.0)
+    # Candidats de "slow" à "ultrafast": veryslow/slower sont rarement rentables
+    candidates = list(X264_PRESETS[2:])
+    low, high = 0, len(candidates) - 1
+    chosen = candidates[-1]
+    while low <= high:
+        middle = (low + high) // 2
+        speed = measure_speed(
+            ffmpeg_path,
+            input_path,
+            replace(base, preset=candidates[middle]),
+            start=start,
+            seconds=seconds,
+            filter_graph=filter_graph,
+            cancel=cancel,
+            on_progress=on_progress,
+        )
+        if speed >= target_speed:
+            chosen = candidates[middle]
+            high = middle - 1
+        else:
+            low = middle + 1
+
+    state[cache_key] = chosen
+    _save_autotune(state)
+    return replace(base, name="auto", preset=chosen)
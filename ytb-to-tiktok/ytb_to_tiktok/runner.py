@@ -0,0 +1,505 @@
+from __future__ import annotations
+
+import collections
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Callable, Iterator, Optional, Sequence
+
+from .cancel import Cancelled, CancelToken, remove_partial_outputs
+
+# Taille de la fin de stderr conservée pour les messages d'erreur
+STDERR_RING_BYTES = 64 * 1024
+# Une ligne plus longue est coupée (ffmpeg n'en écrit pas en temps normal)
+_MAX_LINE_BYTES = 64 * 1024
+# Délai laissé à ffmpeg pour s'arrêter proprement avant SIGKILL
+TERMINATE_GRACE_SECONDS = 2.0
+
+
+@dataclass
+class ProcessUsage:
+    """Ressources consommées par un processus enfant terminé."""
+
+    elapsed: float
+    cpu_user: Optional[float] = None
+    cpu_system: Optional[float] = None
+    max_rss: Optional[int] = None  # octets
+
+    @property
+    def cpu_time(self) -> Optional[float]:
+        if self.cpu_user is None or self.cpu_system is None:
+            return None
+        return self.cpu_user + self.cpu_system
+
+
+@dataclass
+class ProgressEvent:
+    """Avancement d'un processus ffmpeg, lu sur sa sortie -progress."""
+
+    stage: str
+    out_time: float
+    duration: Optional[float]
+    elapsed: float
+    frame: Optional[int] = None
+    fps: Optional[float] = None
+    speed: Optional[float] = None
+    bitrate: Optional[str] = None
+    total_size: Optional[int] = None
+    done: bool = False
+    usage: Optional[ProcessUsage] = None  # renseigné sur l'événement final
+
+    @property
+    def fraction(self) -> Optional[float]:
+        if not self.duration:
+            return None
+        return min(max(self.out_time / self.duration, 0.0), 1.0)
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Secondes restantes estimées (vitesse ffmpeg, sinon vitesse moyenne)."""
+        if not self.duration:
+            return None
+        if self.done:
+            return 0.0
+        speed = self.speed or (
+            self.out_time / self.elapsed if self.elapsed > 0 else None
+        )
+        if not speed:
+            return None
+        return max(self.duration - self.out_time, 0.0) / speed
+
+
+@dataclass
+class FfmpegResult:
+    returncode: int
+    stderr: str  # fin de stderr seulement (STDERR_RING_BYTES)
+    stdout: str = ""  # vide sauf capture_stdout=True
+    usage: Optional[ProcessUsage] = None
+
+
+class FfmpegTimeout(RuntimeError):
+    """Processus tué: durée maximale dépassée ou plus aucun avancement."""
+
+    def __init__(self, message: str, result: FfmpegResult) -> None:
+        super().__init__(f"{message}\n{result.stderr}")
+        self.result = result
+
+
+class StderrRing:
+    """Garde les derniers `max_bytes` octets d'un flux, ligne par ligne."""
+
+    def __init__(self, max_bytes: int = STDERR_RING_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._lines: "collections.deque[bytes]" = collections.deque()
+        self._size = 0
+        self.dropped = 0
+
+    def append(self, line: bytes) -> None:
+        self._lines.append(line)
+        self._size += len(line)
+        while self._size > self.max_bytes and len(self._lines) > 1:
+            old = self._lines.popleft()
+            self._size -= len(old)
+            self.dropped += len(old)
+
+    def text(self) -> str:
+        body = b"".join(self._lines).decode("utf-8", errors="replace")
+        if self.dropped:
+            return f"[... {self.dropped} octets de journal omis ...]\n{body}"
+        return body
+
+
+ProgressCallback = Callable[[ProgressEvent], None]
+# Reçoit chaque ligne brute; renvoyer True signale un avancement (voir run_process)
+LineCallback = Callable[[bytes], Optional[bool]]
+
+_listeners: list[ProgressCallback] = []
+_listeners_lock = threading.Lock()
+
+# Délais par défaut en secondes (None = aucun), voir configure_runner
+_timeout: Optional[float] = None
+_stall_timeout: Optional[float] = 120.0
+
+
+def configure_runner(
+    timeout: Optional[float] = None, stall_timeout: Optional[float] = 120.0
+) -> None:
+    """Délais appliqués aux processus ffmpeg/ffprobe lancés sans délai explicite.
+
+    `timeout`: durée maximale d'un processus; `stall_timeout`: durée maximale sans
+    avancement (temps de sortie/images pour ffmpeg avec -progress, toute sortie pour les
+    autres commandes).
+    """
+    global _timeout, _stall_timeout
+    _timeout = timeout
+    _stall_timeout = stall_timeout
+
+
+def add_progress_listener(callback: ProgressCallback) -> None:
+    """Reçoit les événements de tous les ffmpeg lancés via run_ffmpeg (tous threads)."""
+    with _listeners_lock:
+        _listeners.append(callback)
+
+
+def remove_progress_listener(callback: ProgressCallback) -> None:
+    with _listeners_lock:
+        if callback in _listeners:
+            _listeners.remove(callback)
+
+
+@contextmanager
+def progress_listener(callback: ProgressCallback) -> Iterator[None]:
+    add_progress_listener(callback)
+    try:
+        yield
+    finally:
+        remove_progress_listener(callback)
+
+
+def _emit(event: ProgressEvent, on_progress: Optional[ProgressCallback]) -> None:
+    with _listeners_lock:
+        callbacks = list(_listeners)
+    if on_progress is not None:
+        callbacks.append(on_progress)
+    for callback in callbacks:
+        try:
+            callback(event)
+        except Exception:
+            # Un affichage défaillant ne doit pas interrompre l'encodage
+            pass
+
+
+def _parse_out_time(block: dict[str, str]) -> Optional[float]:
+    for key, scale in (("out_time_us", 1e-6), ("out_time_ms", 1e-6)):
+        # out_time_ms est lui aussi en microsecondes (nom historique de ffmpeg)
+        value = block.get(key)
+        if value and value != "N/A":
+            try:
+                return max(int(value) * scale, 0.0)
+            except ValueError:
+                pass
+    return None
+
+
+def _parse_number(value: Optional[str], suffix: str = "") -> Optional[float]:
+    if not value or value == "N/A":
+        return None
+    try:
+        return float(value.strip().rstrip(suffix))
+    except ValueError:
+        return None
+
+
+def _read_lines(stream: IO[bytes], on_line: Callable[[bytes], None]) -> None:
+    for line in iter(lambda: stream.readline(_MAX_LINE_BYTES), b""):
+        on_line(line)
+
+
+def _write_stdin(stream: IO[bytes], data: bytes) -> None:
+    # ffmpeg peut fermer son entrée plus tôt (échec, arrêt): ce n'est pas une erreur ici
+    try:
+        stream.write(data)
+    except (BrokenPipeError, OSError, ValueError):
+        pass
+    finally:
+        try:
+            stream.close()
+        except (BrokenPipeError, OSError):
+            pass
+
+
+def _wait_with_usage(
+    proc: "subprocess.Popen[bytes]", started: float
+) -> tuple[int, ProcessUsage]:
+    """Attend la fin du processus (sous POSIX, wait4 donne aussi CPU et mémoire max)."""
+    if hasattr(os, "wait4"):
+        try:
+            _, status, rusage = os.wait4(proc.pid, 0)
+        except ChildProcessError:
+            pass
+        else:
+            # os.waitstatus_to_exitcode n'existe qu'à partir de Python 3.9
+            proc.returncode = (
+                os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+            )
+            # ru_maxrss: kio sous Linux, octets sous macOS
+            max_rss = (
+                rusage.ru_maxrss
+                if sys.platform == "darwin"
+                else rusage.ru_maxrss * 1024
+            )
+            usage = ProcessUsage(
+                elapsed=time.perf_counter() - started,
+                cpu_user=rusage.ru_utime,
+                cpu_system=rusage.ru_stime,
+                max_rss=max_rss,
+            )
+            return proc.returncode, usage
+    returncode = proc.wait()
+    return returncode, ProcessUsage(elapsed=time.perf_counter() - started)
+
+
+def _popen_group_options() -> dict:
+    """Processus enfant dans son propre groupe, arrêtable avec ses descendants."""
+    if sys.platform == "win32":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def terminate_process(
+    proc: "subprocess.Popen[bytes]", grace: float = TERMINATE_GRACE_SECONDS
+) -> None:
+    """Arrêt borné du groupe: SIGTERM (CTRL_BREAK sous Windows), puis SIGKILL.
+
+    SIGKILL suit après `grace` secondes. Ne réclame pas le processus (pas de wait
+    final): l'appelant le fait pour lire son usage.
+    """
+    if proc.poll() is not None:
+        return
+    try:
+        if sys.platform == "win32":
+            proc.send_signal(signal.CTRL_BREAK_EVENT)
+        else:
+            os.killpg(proc.pid, signal.SIGTERM)
+    except OSError:
+        pass
+    deadline = time.perf_counter() + grace
+    while time.perf_counter() < deadline:
+        if proc.poll() is not None:
+            return
+        time.sleep(0.05)
+    try:
+        if sys.platform == "win32":
+            proc.kill()
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)
+    except OSError:
+        pass
+
+
+def run_process(
+    cmd: list[str],
+    *,
+    stage: str = "",
+    timeout: Optional[float] = None,
+    stall_timeout: Optional[float] = None,
+    capture_stdout: bool = False,
+    on_stdout_line: Optional[LineCallback] = None,
+    on_stderr_line: Optional[LineCallback] = None,
+    touch_on_output: bool = True,
+    cancel: Optional[CancelToken] = None,
+    stdin_data: Optional[bytes] = None,
+) -> FfmpegResult:
+    """Lance une commande ffmpeg/ffprobe avec une mémoire bornée et un chien de garde.
+
+    stderr est lu ligne à ligne dans un tampon circulaire (seule la fin est gardée pour
+    les messages d'erreur); stdout n'est conservé qu'avec capture_stdout. Le processus
+    est arrêté s'il dépasse `timeout` ou reste `stall_timeout` secondes sans avancement
+    (défauts: configure_runner), et FfmpegTimeout est levée. Avancement: toute ligne lue
+    si touch_on_output, sinon seulement quand un callback de ligne renvoie True. Si
+    `cancel` est annulé, le processus est arrêté (voir terminate_process) et Cancelled
+    est levée. `stdin_data` est écrit sur l'entrée standard du processus
+    (ex: images -i pipe:0) depuis un thread.
+    """
+    if cancel is not None:
+        cancel.raise_if_cancelled()
+    timeout = _timeout if timeout is None else timeout
+    stall_timeout = _stall_timeout if stall_timeout is None else stall_timeout
+    ring = StderrRing()
+    stdout_chunks: list[bytes] = []
+    last_progress = [time.perf_counter()]
+
+    def handle(line: bytes, callback: Optional[LineCallback]) -> None:
+        advanced = callback(line) if callback is not None else None
+        if touch_on_output or advanced:
+            last_progress[0] = time.perf_counter()
+
+    def on_stderr(line: bytes) -> None:
+        ring.append(line)
+        handle(line, on_stderr_line)
+
+    def on_stdout(line: bytes) -> None:
+        if capture_stdout:
+            stdout_chunks.append(line)
+        handle(line, on_stdout_line)
+
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        cmd,
+        stdin=subprocess.DEVNULL if stdin_data is None else subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        **_popen_group_options(),
+    )
+    assert proc.stdout is not None and proc.stderr is not None
+    readers = [
+        threading.Thread(
+            target=_read_lines, args=(proc.stdout, on_stdout), daemon=True
+        ),
+        threading.Thread(
+            target=_read_lines, args=(proc.stderr, on_stderr), daemon=True
+        ),
+    ]
+    if stdin_data is not None:
+        assert proc.stdin is not None
+        threading.Thread(
+            target=_write_stdin, args=(proc.stdin, stdin_data), daemon=True
+        ).start()
+    for reader in readers:
+        reader.start()
+
+    reason: Optional[str] = None
+    cancelled = False
+    try:
+        while True:
+            alive = [reader for reader in readers if reader.is_alive()]
+            if not alive:
+                break
+            alive[0].join(0.1)
+            cancelled = cancel is not None and cancel.cancelled
+            now = time.perf_counter()
+            if cancelled:
+                reason = (
+                    cancel.reason if cancel is not None and cancel.reason else "annulé"
+                )
+            elif timeout is not None and now - started > timeout:
+                reason = f"durée maximale de {timeout:.0f}s dépassée"
+            elif stall_timeout is not None and now - last_progress[0] > stall_timeout:
+                reason = f"aucun avancement depuis {stall_timeout:.0f}s"
+            if reason is not None:
+                terminate_process(proc)
+                for reader in readers:
+                    reader.join()
+                break
+    except BaseException:
+        # Interruption (Ctrl+C...) pendant l'attente: ne pas laisser ffmpeg orphelin
+        terminate_process(proc)
+        proc.wait()
+        raise
+    returncode, usage = _wait_with_usage(proc, started)
+    proc.stdout.close()
+    proc.stderr.close()
+    result = FfmpegResult(
+        returncode=returncode,
+        stderr=ring.text(),
+        stdout=b"".join(stdout_chunks).decode("utf-8", errors="replace"),
+        usage=usage,
+    )
+    if cancelled:
+        raise Cancelled(reason or "annulé")
+    if reason is not None:
+        where = f" ({stage})" if stage else ""
+        raise FfmpegTimeout(
+            f"{os.path.basename(cmd[0])}{where} arrêté: {reason}", result
+        )
+    return result
+
+
+def run_ffmpeg(
+    cmd: list[str],
+    *,
+    stage: str = "ffmpeg",
+    duration: Optional[float] = None,
+    on_progress: Optional[ProgressCallback] = None,
+    timeout: Optional[float] = None,
+    stall_timeout: Optional[float] = None,
+    cancel: Optional[CancelToken] = None,
+    partial_outputs: Sequence[Path] = (),
+    stdin_data: Optional[bytes] = None,
+    on_stderr_line: Optional[LineCallback] = None,
+) -> FfmpegResult:
+    """Lance ffmpeg avec -progress pipe:1 et publie l'avancement au fil de l'eau.
+
+    `duration` (secondes de sortie attendues) sert au pourcentage et à l'ETA. Les
+    événements vont à `on_progress` et aux écouteurs globaux (add_progress_listener); le
+    dernier (done=True) porte l'usage CPU/mémoire du processus. Seul un avancement réel
+    (temps de sortie, images ou octets écrits) repousse le délai sans avancement. Si
+    ffmpeg échoue, est annulé ou dépasse un délai, les fichiers `partial_outputs`
+    (chemins ou motifs glob) qu'il a écrits sont supprimés. `stdin_data`: voir
+    run_process. `on_stderr_line` reçoit chaque ligne de stderr (ex: sortie des filtres
+    metadata/showinfo).
+    """
+    full_cmd = [cmd[0], "-progress", "pipe:1", "-nostats", *cmd[1:]]
+    started = time.perf_counter()
+    block: dict[str, str] = {}
+    last_out_time = 0.0
+    last_mark = (0.0, 0, 0)
+    final: list[ProgressEvent] = []
+
+    def on_line(raw_line: bytes) -> bool:
+        nonlocal block, last_out_time, last_mark
+        line = raw_line.decode("utf-8", errors="replace").strip()
+        if "=" not in line:
+            return False
+        key, value = line.split("=", 1)
+        block[key] = value
+        if key != "progress":
+            return False
+        out_time = _parse_out_time(block)
+        if out_time is not None:
+            last_out_time = out_time
+        frame = _parse_number(block.get("frame"))
+        size = _parse_number(block.get("total_size"))
+        bitrate = (block.get("bitrate") or "").strip()
+        event = ProgressEvent(
+            stage=stage,
+            out_time=last_out_time,
+            duration=duration,
+            elapsed=time.perf_counter() - started,
+            frame=int(frame) if frame is not None else None,
+            fps=_parse_number(block.get("fps")),
+            speed=_parse_number(block.get("speed"), "x"),
+            bitrate=bitrate if bitrate not in ("", "N/A") else None,
+            total_size=int(size) if size is not None else None,
+            done=value == "end",
+        )
+        block = {}
+        if event.done:
+            # Publié après la fin du processus, avec son usage
+            final.append(event)
+        else:
+            _emit(event, on_progress)
+        mark = (event.out_time, event.frame or 0, event.total_size or 0)
+        advanced = mark != last_mark
+        last_mark = mark
+        return advanced
+
+    result: Optional[FfmpegResult] = None
+    since = time.time()
+    try:
+        result = run_process(
+            full_cmd,
+            stage=stage,
+            timeout=timeout,
+            stall_timeout=stall_timeout,
+            on_stdout_line=on_line,
+            on_stderr_line=on_stderr_line,
+            touch_on_output=False,
+            cancel=cancel,
+            stdin_data=stdin_data,
+        )
+        return result
+    finally:
+        if result is None or result.returncode != 0:
+            remove_partial_outputs(partial_outputs, since)
+        # Toujours clore l'étape (même en cas d'échec) pour que les barres disparaissent
+        event = (
+            final[-1]
+            if final
+            else ProgressEvent(
+                stage=stage,
+                out_time=last_out_time,
+                duration=duration,
+                elapsed=0.0,
+                done=True,
+            )
+        )
+        event.elapsed = time.perf_counter() - started
+        event.usage = result.usage if result is not None else None
+        _emit(event, on_progress)
@@ -0,0 +1,354 @@
+from __future__ import annotations
+
+import bisect
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+from uuid import uuid4
+
+from .media import VideoStreamInfo, read_segment_list
+from .profiles import DEFAULT_PROFILE, EncoderProfile
+from .cancel import CancelToken
+from .events import JobReporter
+from .runner import ProgressCallback, run_ffmpeg
+from .toolchain import get_toolchain
+
+# Encodeur ffmpeg compatible (concaténable sans perte) pour chaque codec source.
+# Limité au H.264, seul codec dont le démuxeur concat convertit les SPS/PPS en bande.
+SMARTCUT_ENCODERS = {
+    "h264": "libx264",
+}
+
+# Profils ffprobe/ffmpeg -> valeur de -profile:v pour l'encodeur correspondant
+_PROFILE_ARGS = {
+    "constrained baseline": "baseline",
+    "baseline": "baseline",
+    "main": "main",
+    "high": "high",
+    "high 10": "high10",
+    "high 4:2:2": "high422",
+    "high 4:4:4 predictive": "high444",
+}
+
+
+@dataclass
+class SmartCutBoundary:
+    cut: float
+    keyframe_before: float
+    keyframe_after: float
+    aligned: bool
+
+
+@dataclass
+class SmartCutPlan:
+    boundaries: list[SmartCutBoundary]
+    copy_points: list[float]
+    duration: float
+
+
+def smartcut_encoder_for(stream: Optional[VideoStreamInfo]) -> Optional[str]:
+    """Encodeur des GOP de bordure, ou None si la source ne s'y prête pas."""
+    if stream is None or stream.fps is None:
+        return None
+    return SMARTCUT_ENCODERS.get(stream.codec)
+
+
+def plan_smart_cut(
+    cut_times: list[float], keyframes: list[float], duration: float, fps: float
+) -> Optional[SmartCutPlan]:
+    """Pour chaque coupe: le GOP qui la contient et s'il faut le ré-encoder.
+
+    Une coupe est alignée si une image clé tombe à une demi-image avant elle, ou après
+    elle sans aucune image entre les deux (écart < 1/fps): la coupe est alors posée sur
+    cette image clé. Renvoie None si deux coupes tombent dans le même GOP (segments plus
+    courts qu'un GOP): le découpage intelligent n'apporte alors rien.
+    """
+    if not keyframes:
+        return None
+    half_frame = 0.5 / fps
+    boundaries: list[SmartCutBoundary] = []
+    for cut in cut_times:
+        index = bisect.bisect_left(keyframes, cut - half_frame)
+        if index < len(keyframes) and keyframes[index] - cut < 1.0 / fps:
+            keyframe = keyframes[index]
+            boundaries.append(SmartCutBoundary(keyframe, keyframe, keyframe, True))
+            continue
+        before = keyframes[index - 1] if index > 0 else 0.0
+        after = keyframes[index] if index < len(keyframes) else duration
+        boundaries.append(SmartCutBoundary(cut, before, after, False))
+
+    for previous, following in zip(boundaries, boundaries[1:]):
+        if previous.keyframe_after > following.keyframe_before:
+            return None
+
+    copy_points = sorted(
+        {
+            t
+            for b in boundaries
+            for t in (b.keyframe_before, b.keyframe_after)
+            if 0.0 < t < duration
+        }
+    )
+    return SmartCutPlan(
+        boundaries=boundaries, copy_points=copy_points, duration=duration
+    )
+
+
+def _run(
+    cmd: list[str],
+    what: str,
+    duration: Optional[float] = None,
+    cancel: Optional[CancelToken] = None,
+    partial_outputs: tuple[Path, ...] = (),
+    on_progress: Optional[ProgressCallback] = None,
+) -> None:
+    proc = run_ffmpeg(
+        cmd,
+        stage=what,
+        duration=duration,
+        on_progress=on_progress,
+        cancel=cancel,
+        partial_outputs=partial_outputs,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg ({what}) a échoué:\n{proc.stderr}")
+
+
+def _encoder_args(
+    encoder: str, stream: VideoStreamInfo, profile: EncoderProfile = DEFAULT_PROFILE
+) -> list[str]:
+    """Paramètres d'encodage alignés sur la source pour que les morceaux se concatènent.
+
+    Le profil fixe preset/tune/threads; le CRF reste bas (18),
+    car ces GOP côtoient des GOP copiés.
+    """
+    args = [
+        "-c:v",
+        encoder,
+        "-preset",
+        profile.preset,
+        "-crf",
+        str(min(profile.crf, 18)),
+        *get_toolchain().passthrough_args(),
+    ]
+    if profile.tune:
+        args += ["-tune", profile.tune]
+    if profile.threads:
+        args += ["-threads", str(profile.threads)]
+    if stream.pix_fmt:
+        args += ["-pix_fmt", stream.pix_fmt]
+    h264_profile = _PROFILE_ARGS.get((stream.profile or "").lower())
+    if h264_profile is not None:
+        args += ["-profile:v", h264_profile]
+    return args
+
+
+def smart_cut(
+    ffmpeg_path: str,
+    input_path: Path,
+    out_dir: Path,
+    base: str,
+    plan: SmartCutPlan,
+    stream: VideoStreamInfo,
+    limit: Optional[int] = None,
+    profile: Optional[EncoderProfile] = None,
+    cancel: Optional[CancelToken] = None,
+    report: Optional[JobReporter] = None,
+) -> list[Path]:
+    """Découpe exacte en ne ré-encodant que le GOP qui contient chaque coupe.
+
+    1) une seule passe -c copy découpe la vidéo aux images clés entourant chaque coupe;
+    2) chaque GOP de bordure est ré-encodé et scindé exactement sur la coupe;
+    3) chaque segment = [début du GOP ré-encodé] + GOP copiés + [fin du GOP ré-encodé],
+       concaténés sans ré-encodage (le démuxeur concat remet SPS/PPS en bande
+       pour chaque morceau), puis remuxés avec l'audio copié de la source.
+       Seuls les morceaux réellement écrits (listes du muxer segment) sont
+       assemblés: une moitié de GOP sans image est omise.
+    Lève RuntimeError si un segment n'a aucun morceau:
+    split_video_ffmpeg ré-encode alors tout.
+    `report` reçoit l'avancement ffmpeg et chaque segment dès qu'il est assemblé.
+    """
+    encoder = SMARTCUT_ENCODERS[stream.codec]
+    on_progress = report.progress if report is not None else None
+    work_dir = out_dir / f".{base}_smartcut_{uuid4().hex}"
+    work_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        # 1) Copie des GOP entiers, découpés sur les images clés utiles
+        chunk_list = work_dir / "chunks.csv"
+        cmd_copy = [
+            ffmpeg_path,
+            "-y",
+            "-i",
+            str(input_path),
+            "-map",
+            "0:v:0",
+            "-c",
+            "copy",
+            "-f",
+            "segment",
+            "-segment_format",
+            "mp4",
+            "-segment_list",
+            str(chunk_list),
+            "-segment_list_type",
+            "csv",
+            "-reset_timestamps",
+            "1",
+        ]
+        if plan.copy_points:
+            cmd_copy += [
+                "-segment_times",
+                ",".join(f"{max(t - 0.001, 0.0):.6f}" for t in plan.copy_points),
+            ]
+        else:
+            cmd_copy += ["-segment_time", "1e9"]
+        cmd_copy.append(str(work_dir / "chunk_%05d.mp4"))
+        _run(
+            cmd_copy,
+            f"copie des GOP · {base}",
+            plan.duration,
+            cancel,
+            on_progress=on_progress,
+        )
+        chunks = read_segment_list(chunk_list)
+        if len(chunks) != len(plan.copy_points) + 1:
+            raise RuntimeError(
+                "Découpage intelligent: nombre de morceaux copiés inattendu"
+            )
+        chunk_starts = [0.0] + plan.copy_points
+        chunk_ends = plan.copy_points + [plan.duration]
+
+        # 2) Ré-encodage des GOP de bordure, scindés exactement sur la coupe
+        heads: dict[int, Path] = {}
+        tails: dict[int, Path] = {}
+        n_segments = len(plan.boundaries) + 1
+        needed = n_segments if limit is None else min(limit, n_segments)
+        for index, boundary in enumerate(plan.boundaries):
+            if boundary.aligned or index >= needed:
+                continue
+            # Marge d'1 ms: l'image pile sur la coupe ouvre le morceau suivant
+            split_at = max(boundary.cut - boundary.keyframe_before - 0.001, 0.0)
+            cmd_gop = [
+                ffmpeg_path,
+                "-y",
+                "-ss",
+                f"{boundary.keyframe_before:.6f}",
+                "-i",
+                str(input_path),
+                "-t",
+                f"{boundary.keyframe_after - boundary.keyframe_before:.6f}",
+                "-map",
+                "0:v:0",
+                "-an",
+                *_encoder_args(encoder, stream, profile or DEFAULT_PROFILE),
+                "-force_key_frames",
+                f"{split_at:.6f}",
+                "-f",
+                "segment",
+                "-segment_format",
+                "mp4",
+                "-segment_times",
+                f"{split_at:.6f}",
+                "-segment_list",
+                str(work_dir / f"gop{index:04d}.csv"),
+                "-segment_list_type",
+                "csv",
+                "-reset_timestamps",
+                "1",
+                str(work_dir / f"gop{index:04d}_%d.mp4"),
+            ]
+            _run(
+                cmd_gop,
+                f"ré-encodage des bordures · {base}",
+                boundary.keyframe_after - boundary.keyframe_before,
+                cancel,
+                on_progress=on_progress,
+            )
+            # Moitié sans image (aucune entre la coupe et l'image clé): non écrite
+            written = {
+                name
+                for name, _, _ in read_segment_list(work_dir / f"gop{index:04d}.csv")
+            }
+            if f"gop{index:04d}_0.mp4" in written:
+                tails[index] = work_dir / f"gop{index:04d}_0.mp4"
+            if f"gop{index:04d}_1.mp4" in written:
+                heads[index] = work_dir / f"gop{index:04d}_1.mp4"
+
+        # 3) Assemblage de chaque segment
+        parts: list[Path] = []
+        for seg_index in range(needed):
+            start_boundary = plan.boundaries[seg_index - 1] if seg_index > 0 else None
+            end_boundary = (
+                plan.boundaries[seg_index] if seg_index < len(plan.boundaries) else None
+            )
+            start = start_boundary.cut if start_boundary else 0.0
+            end = end_boundary.cut if end_boundary else plan.duration
+            copy_start = start_boundary.keyframe_after if start_boundary else 0.0
+            copy_end = end_boundary.keyframe_before if end_boundary else plan.duration
+
+            pieces: list[Path] = []
+            if start_boundary is not None and seg_index - 1 in heads:
+                pieces.append(heads[seg_index - 1])
+            for chunk_index, (chunk_start, chunk_end) in enumerate(
+                zip(chunk_starts, chunk_ends)
+            ):
+                if (
+                    chunk_start >= copy_start - 1e-6
+                    and chunk_end <= copy_end + 1e-6
+                    and chunk_end > chunk_start
+                ):
+                    pieces.append(work_dir / chunks[chunk_index][0])
+            if end_boundary is not None and seg_index in tails:
+                pieces.append(tails[seg_index])
+            if not pieces:
+                raise RuntimeError(
+                    f"Découpage intelligent: aucun morceau pour le segment {seg_index}"
+                )
+
+            concat_list = work_dir / f"concat_{seg_index:04d}.txt"
+            concat_list.write_text(
+                "".join(
+                    "file '" + piece.as_posix().replace("'", "'\\''") + "'\n"
+                    for piece in pieces
+                ),
+                encoding="utf-8",
+            )
+            out_path = out_dir / f"{base}_{seg_index:04d}.mp4"
+            cmd_mux = [
+                ffmpeg_path,
+                "-y",
+                "-f",
+                "concat",
+                "-safe",
+                "0",
+                "-i",
+                str(concat_list),
+                "-ss",
+                f"{start:.6f}",
+                "-t",
+                f"{end - start:.6f}",
+                "-i",
+                str(input_path),
+                "-map",
+                "0:v:0",
+                "-map",
+                "1:a?",
+                "-c",
+                "copy",
+                str(out_path),
+            ]
+            _run(
+                cmd_mux,
+                f"assemblage · {base}",
+                end - start,
+                cancel,
+                (out_path,),
+                on_progress,
+            )
+            parts.append(out_path)
+            if report is not None:
+                report.segment(out_path, seg_index + 1, needed)
+        return parts
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
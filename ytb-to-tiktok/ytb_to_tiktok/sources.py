@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import glob
+import os
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+# Extensions reconnues comme vidéos
+# (contenu des dossiers, motifs glob, URL HTTP directes)
+MEDIA_EXTENSIONS = (
+    ".mp4",
+    ".m4v",
+    ".mov",
+    ".mkv",
+    ".webm",
+    ".avi",
+    ".ts",
+    ".flv",
+    ".mpg",
+    ".mpeg",
+    ".wmv",
+)
+
+# Types de source: page vidéo lue par yt-dlp (YouTube ou autre site),
+# fichier local, URL HTTP directe
+SOURCE_KINDS = ("ytdlp", "file", "http")
+
+_GLOB_CHARS = ("*", "?", "[")
+
+
+def source_kind(entry: str) -> str:
+    """Type de source d'une entrée (URL ou chemin), déduit sans accès réseau.
+
+    Un chemin existant, un motif glob ou un chemin de fichier vidéo sont locaux
+    ("file"); une URL http(s) dont le chemin finit par une extension vidéo est
+    directe ("http"); tout le reste (page YouTube, autre site, "ytsearch:...", ID
+    seul) passe par yt-dlp.
+    """
+    if os.path.exists(os.path.expanduser(entry)):
+        return "file"
+    parsed = urlparse(entry)
+    if parsed.scheme in ("http", "https"):
+        return (
+            "http"
+            if Path(unquote(parsed.path)).suffix.lower() in MEDIA_EXTENSIONS
+            else "ytdlp"
+        )
+    if parsed.scheme == "file":
+        return "file"
+    # Une lettre seule est un lecteur Windows (C:\...), pas un schéma d'URL
+    if len(parsed.scheme) > 1:
+        return "ytdlp"
+    if any(ch in entry for ch in _GLOB_CHARS) or "/" in entry or os.sep in entry:
+        return "file"
+    return "file" if Path(entry).suffix.lower() in MEDIA_EXTENSIONS else "ytdlp"
+
+
+def local_path(entry: str) -> Path:
+    """Chemin absolu d'une entrée locale (chemin relatif, ~ ou URL file://)."""
+    parsed = urlparse(entry)
+    if parsed.scheme == "file":
+        entry = unquote(parsed.path)
+    return Path(entry).expanduser().resolve()
+
+
+def is_local_collection(entry: str) -> bool:
+    """Dossier ou motif glob local: plusieurs vidéos, traitées comme un lot."""
+    if source_kind(entry) != "file":
+        return False
+    if os.path.isdir(os.path.expanduser(entry)):
+        return True
+    return not os.path.exists(os.path.expanduser(entry)) and any(
+        ch in entry for ch in _GLOB_CHARS
+    )
+
+
+def expand_local_sources(entry: str) -> list[str]:
+    """Fichiers vidéo d'une entrée locale, en chemins absolus triés.
+
+    Un fichier donne lui-même, un dossier ses vidéos (sans descendre dans les
+    sous-dossiers), un motif glob ses correspondances ("**" parcourt les sous-dossiers).
+    Lève RuntimeError si aucune vidéo ne correspond.
+    """
+    path = local_path(entry)
+    if path.is_file():
+        return [str(path)]
+    if path.is_dir():
+        found = [
+            child
+            for child in path.iterdir()
+            if child.is_file() and child.suffix.lower() in MEDIA_EXTENSIONS
+        ]
+    elif any(ch in entry for ch in _GLOB_CHARS):
+        pattern = os.path.expanduser(entry)
+        found = [
+            Path(match)
+            for match in glob.glob(pattern, recursive=True)
+            if os.path.isfile(match) and Path(match).suffix.lower() in MEDIA_EXTENSIONS
+        ]
+    else:
+        raise RuntimeError(f"Fichier introuvable: {entry}")
+    if not found:
+        raise RuntimeError(f"Aucune vidéo trouvée: {entry}")
+    return sorted({str(match.resolve()) for match in found})
+
+
+def open_local_file(path: Path, out_dir: Path, link: bool = False) -> Path:
+    """Fichier local sans copie: lu sur place, ou lien physique dans out_dir si `link`.
+
+    Si le lien est impossible (autre disque, système de fichiers sans liens), le fichier
+    est lu sur place: une source locale n'est jamais recopiée.
+    """
+    if not path.is_file():
+        raise RuntimeError(f"Fichier introuvable: {path}")
+    if not link:
+        return path
+    target = out_dir / path.name
+    try:
+        if target.exists():
+            if target.samefile(path):
+                return target
+            return path
+        out_dir.mkdir(parents=True, exist_ok=True)
+        os.link(path, target)
+    except OSError:
+        return path
+    return target
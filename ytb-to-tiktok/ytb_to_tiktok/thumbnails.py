@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import bisect
+import os
+import re
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Sequence
+from uuid import uuid4
+
+from .cancel import CancelToken
+from .runner import run_ffmpeg
+from .toolchain import get_toolchain
+
+# Image retenue pour la miniature de chaque segment:
+# première, milieu, ou la plus nette du début
+THUMBNAIL_CHOICES = ("first", "middle", "sharpest")
+THUMBNAIL_FORMATS = ("jpg", "webp")
+
+# sharpest: candidats échantillonnés à SHARPNESS_FPS images/s;
+# netteté mesurée sur une copie réduite à SHARPNESS_WIDTH px
+# (la miniature écrite reste en pleine résolution)
+SHARPNESS_FPS = 4
+SHARPNESS_WIDTH = 320
+
+# Marge des coupes du ré-encodage (voir split_video_ffmpeg):
+# un segment commence 1 ms avant sa coupe
+_CUT_MARGIN = 0.001
+
+
+@dataclass(frozen=True)
+class ThumbnailOptions:
+    """Miniature de couverture par segment: image retenue, format et, pour
+    "sharpest", secondes examinées au début du segment."""
+
+    choice: str = "first"
+    format: str = "jpg"
+    window: float = 2.0
+
+    def __post_init__(self) -> None:
+        if self.choice not in THUMBNAIL_CHOICES:
+            raise ValueError(
+                f"Miniature inconnue: {self.choice}"
+                f" (attendu: {', '.join(THUMBNAIL_CHOICES)})"
+            )
+        if self.format not in THUMBNAIL_FORMATS:
+            raise ValueError(
+                f"Format de miniature inconnu: {self.format}"
+                f" (attendu: {', '.join(THUMBNAIL_FORMATS)})"
+            )
+        if self.window <= 0:
+            raise ValueError(
+                "La fenêtre de la miniature la plus nette doit être positive"
+            )
+
+    def encoder_args(self) -> list[str]:
+        if self.format == "webp":
+            return ["-c:v", "libwebp", "-quality", "80"]
+        return ["-c:v", "mjpeg", "-q:v", "3"]
+
+
+def thumbnail_path(part: Path, options: ThumbnailOptions) -> Path:
+    """Miniature d'un segment: même dossier et même nom, extension du format."""
+    return part.with_suffix(f".{options.format}")
+
+
+def paired_thumbnails(
+    parts: Sequence[Path], options: Optional[ThumbnailOptions]
+) -> list[tuple[Path, Optional[Path]]]:
+    """Chaque segment avec sa miniature (None si aucune n'a été demandée ou écrite)."""
+    pairs: list[tuple[Path, Optional[Path]]] = []
+    for part in parts:
+        thumb = thumbnail_path(part, options) if options is not None else None
+        pairs.append((part, thumb if thumb is not None and thumb.is_file() else None))
+    return pairs
+
+
+class ThumbnailBranch:
+    """Branche "miniatures" à greffer sur le graphe de filtres d'un décodage existant.
+
+    `windows` donne (début, fin) de chaque segment (fin None pour le dernier:
+    `duration`). La branche ne laisse passer que les images candidates (une par segment
+    pour first/middle, SHARPNESS_FPS/s sur les `window` premières secondes pour
+    sharpest), les écrit dans `work_dir` et note leur instant (et leur netteté) via
+    metadata=print sur stderr: passer `on_stderr_line` à run_ffmpeg, puis `finish()`
+    range la meilleure de chaque segment.
+    """
+
+    def __init__(
+        self,
+        options: ThumbnailOptions,
+        windows: Sequence[tuple[float, Optional[float]]],
+        duration: float,
+        work_dir: Path,
+        blurdetect: bool = True,
+    ) -> None:
+        self.options = options
+        self.windows = [
+            (start, end if end is not None else duration) for start, end in windows
+        ]
+        self.work_dir = work_dir
+        self.blurdetect = blurdetect
+        self._frames: list[list[float]] = []
+
+    def _select_expr(self) -> str:
+        terms = []
+        if self.options.choice == "sharpest":
+            step = 1.0 / SHARPNESS_FPS - _CUT_MARGIN
+            for start, end in self.windows:
+                low = max(start - _CUT_MARGIN, 0.0)
+                high = min(start + self.options.window, end - _CUT_MARGIN)
+                terms.append(
+                    f"gte(t,{low:.6f})*lt(t,{high:.6f})"
+                    f"*(isnan(prev_selected_t)+gte(t-prev_selected_t,{step:.6f}))"
+                )
+        else:
+            for start, end in self.windows:
+                target = start if self.options.choice == "first" else (start + end) / 2
+                target = max(target - _CUT_MARGIN, 0.0)
+                terms.append(
+                    f"gte(t,{target:.6f})"
+                    f"*(isnan(prev_selected_t)+lt(prev_selected_t,{target:.6f}))"
+                )
+        return "+".join(terms)
+
+    @property
+    def read_until(self) -> float:
+        """Instant après lequel la branche ne retient rien (-t d'une passe dédiée)."""
+        start, end = self.windows[-1]
+        if self.options.choice == "first":
+            return start + 1.0
+        if self.options.choice == "middle":
+            return (start + end) / 2 + 1.0
+        return min(start + self.options.window, end) + 1.0
+
+    def graph(self, source: str) -> str:
+        """Fragment de graphe lisant `source` (ex: "[v]", "[0:v:0]") jusqu'à [thumb]."""
+        select = f"{source}select='{self._select_expr()}'"
+        if self.options.choice != "sharpest":
+            return (
+                f"{select},metadata=add:key=thumb:value=1,"
+                "metadata=print:key=thumb[thumb]"
+            )
+        if self.blurdetect:
+            measure = "blurdetect,metadata=print:key=lavfi.blur"
+        else:
+            measure = "edgedetect,signalstats,metadata=print:key=lavfi.signalstats.YAVG"
+        return (
+            f"{select},split=2[thumb][thumbm];"
+            f"[thumbm]scale={SHARPNESS_WIDTH}:-2:flags=fast_bilinear,format=gray,"
+            f"{measure},nullsink"
+        )
+
+    def output_args(self) -> list[str]:
+        return [
+            "-map",
+            "[thumb]",
+            *get_toolchain().passthrough_args(),
+            *self.options.encoder_args(),
+            "-start_number",
+            "0",
+            str(self.work_dir / f"thumb_%06d.{self.options.format}"),
+        ]
+
+    def on_stderr_line(self, line: bytes) -> None:
+        # metadata=print écrit "frame:N pts:P pts_time:T",
+        # puis la clé suivie ("lavfi.blur=B"...)
+        time_match = re.search(rb"pts_time:\s*(-?[0-9.]+)", line)
+        if time_match:
+            self._frames.append([float(time_match.group(1)), 0.0])
+            return
+        score_match = re.search(
+            rb"(lavfi\.blur|lavfi\.signalstats\.YAVG)=(-?[0-9.]+)", line
+        )
+        if score_match and self._frames:
+            value = float(score_match.group(2))
+            # blurdetect: plus la valeur est haute, plus l'image est floue
+            self._frames[-1][1] = (
+                -value if score_match.group(1) == b"lavfi.blur" else value
+            )
+
+    def finish(self, parts: Sequence[Path]) -> list[Optional[Path]]:
+        """Range la meilleure candidate de chaque segment à côté de `parts[i]`."""
+        best: dict[int, tuple[float, int]] = {}
+        starts = [max(start - _CUT_MARGIN, 0.0) for start, _ in self.windows]
+        for index, (seconds, score) in enumerate(self._frames):
+            segment = max(bisect.bisect_right(starts, seconds) - 1, 0)
+            if segment not in best or score > best[segment][0]:
+                best[segment] = (score, index)
+        thumbnails: list[Optional[Path]] = []
+        for segment, part in enumerate(parts):
+            candidate = (
+                self.work_dir / f"thumb_{best[segment][1]:06d}.{self.options.format}"
+                if segment in best
+                else None
+            )
+            if candidate is None or not candidate.is_file():
+                thumbnails.append(None)
+                continue
+            target = thumbnail_path(part, self.options)
+            os.replace(candidate, target)
+            thumbnails.append(target)
+        return thumbnails
+
+
+def copy_thumbnails(
+    thumbnails: Sequence[Optional[Path]],
+    parts: Sequence[Path],
+    options: ThumbnailOptions,
+) -> None:
+    """Reprend des miniatures écrites pour d'autres segments (ex: autres déclinaisons).
+
+    Lien physique si possible, copie sinon.
+    """
+    for thumb, part in zip(thumbnails, parts):
+        if thumb is None:
+            continue
+        target = thumbnail_path(part, options)
+        if target == thumb:
+            continue
+        target.unlink(missing_ok=True)
+        try:
+            os.link(thumb, target)
+        except OSError:
+            shutil.copyfile(thumb, target)
+
+
+def extract_thumbnails(
+    ffmpeg_path: str,
+    input_path: Path,
+    parts: Sequence[Path],
+    windows: Sequence[tuple[float, Optional[float]]],
+    options: ThumbnailOptions,
+    duration: float,
+    blurdetect: bool = True,
+    cancel: Optional[CancelToken] = None,
+) -> list[Optional[Path]]:
+    """Miniatures de segments déjà écrits par un chemin sans décodage complet (copie de
+    flux, découpe intelligente, encodages parallèles): une seule passe de décodage de la
+    source, vidéo seule, arrêtée après la dernière image utile. Même choix d'image que
+    ThumbnailBranch.
+    """
+    out_dir = parts[0].parent
+    work_dir = out_dir / f".{input_path.stem}_thumbs_{uuid4().hex}"
+    work_dir.mkdir(parents=True, exist_ok=True)
+    branch = ThumbnailBranch(
+        options, windows[: len(parts)], duration, work_dir, blurdetect=blurdetect
+    )
+    filter_script = work_dir / "filters.txt"
+    filter_script.write_text(branch.graph("[0:v:0]"), encoding="utf-8")
+    cmd = [
+        ffmpeg_path,
+        "-y",
+        "-t",
+        f"{branch.read_until:.3f}",
+        "-an",
+        "-sn",
+        "-dn",
+        "-i",
+        str(input_path),
+    ]
+    cmd += ["-filter_complex_script", str(filter_script), *branch.output_args()]
+    try:
+        proc = run_ffmpeg(
+            cmd,
+            stage=f"miniatures · {input_path.stem}",
+            duration=min(branch.read_until, duration),
+            cancel=cancel,
+            on_stderr_line=branch.on_stderr_line,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"ffmpeg (miniatures) a échoué:\n{proc.stderr}")
+        return branch.finish(parts)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
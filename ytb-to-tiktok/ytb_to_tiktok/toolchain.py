@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from .cache import default_cache_dir
+from .runner import run_process
+
+# Noms possibles de ffprobe à côté du binaire ffmpeg d'imageio-ffmpeg
+_FFPROBE_NAMES = ["ffprobe-win-x86_64-v7.1.exe", "ffprobe.exe", "ffprobe"]
+
+
+@dataclass
+class ToolchainCapabilities:
+    encoders: set[str] = field(default_factory=set)
+    filters: set[str] = field(default_factory=set)
+    muxers: set[str] = field(default_factory=set)
+    fontconfig: bool = False
+    fps_mode: bool = False
+
+    def to_dict(self) -> dict:
+        return {
+            "encoders": sorted(self.encoders),
+            "filters": sorted(self.filters),
+            "muxers": sorted(self.muxers),
+            "fontconfig": self.fontconfig,
+            "fps_mode": self.fps_mode,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ToolchainCapabilities":
+        return cls(
+            encoders=set(data.get("encoders") or []),
+            filters=set(data.get("filters") or []),
+            muxers=set(data.get("muxers") or []),
+            fontconfig=bool(data.get("fontconfig")),
+            fps_mode=bool(data.get("fps_mode")),
+        )
+
+
+@dataclass
+class Toolchain:
+    """ffmpeg/ffprobe résolus une fois par processus, capacités sondées à la demande."""
+
+    ffmpeg: str
+    ffprobe: Optional[str]
+    resolve_error: Optional[str] = None
+    _capabilities: Optional[ToolchainCapabilities] = None
+
+    def capabilities(self) -> ToolchainCapabilities:
+        if self._capabilities is None:
+            self._capabilities = _probe_capabilities(self.ffmpeg)
+            _save_state(self)
+        return self._capabilities
+
+    def has_encoder(self, name: str) -> bool:
+        return name in self.capabilities().encoders
+
+    def has_filter(self, name: str) -> bool:
+        return name in self.capabilities().filters
+
+    def has_muxer(self, name: str) -> bool:
+        return name in self.capabilities().muxers
+
+    def drawtext_usable(self, fontfile: Optional[str]) -> bool:
+        """drawtext existe et trouve une police (fichier explicite ou fontconfig)."""
+        caps = self.capabilities()
+        return "drawtext" in caps.filters and (fontfile is not None or caps.fontconfig)
+
+    def passthrough_args(self) -> list[str]:
+        """Horodatages gardés tels quels: -fps_mode (ffmpeg >= 5.1), sinon -vsync."""
+        option = "-fps_mode" if self.capabilities().fps_mode else "-vsync"
+        return [option, "passthrough"]
+
+
+def _run_listing(ffmpeg_path: str, *options: str) -> str:
+    proc = run_process(
+        [ffmpeg_path, "-hide_banner", *options],
+        stage=" ".join(options),
+        capture_stdout=True,
+    )
+    return proc.stdout if proc.returncode == 0 else ""
+
+
+def _probe_capabilities(ffmpeg_path: str) -> ToolchainCapabilities:
+    """Liste encodeurs, filtres et muxers; détecte fontconfig (build) et -fps_mode."""
+    caps = ToolchainCapabilities()
+    for line in _run_listing(ffmpeg_path, "-encoders").splitlines():
+        match = re.match(r"^\s*[VAS][A-Z.]{5}\s+(\S+)", line)
+        if match and match.group(1) != "=":
+            caps.encoders.add(match.group(1))
+    for line in _run_listing(ffmpeg_path, "-filters").splitlines():
+        match = re.match(r"^\s*[T.][S.][C.]\s+(\S+)\s+\S+->\S+", line)
+        if match:
+            caps.filters.add(match.group(1))
+    listing = _run_listing(ffmpeg_path, "-muxers")
+    body = listing.split("---", 1)[1] if "---" in listing else ""
+    for line in body.splitlines():
+        match = re.match(r"^\s*D?E\S*\s+(\S+)", line)
+        if match:
+            caps.muxers.update(match.group(1).split(","))
+    buildconf = _run_listing(ffmpeg_path, "-buildconf")
+    caps.fontconfig = (
+        "--enable-fontconfig" in buildconf or "--enable-libfontconfig" in buildconf
+    )
+    caps.fps_mode = "-fps_mode" in _run_listing(ffmpeg_path, "-h", "long")
+    return caps
+
+
+def _resolve_binaries() -> Toolchain:
+    """Localise ffmpeg via imageio-ffmpeg (ffprobe: même dossier, s'il existe)."""
+    try:
+        import imageio_ffmpeg
+
+        ffmpeg_path = imageio_ffmpeg.get_ffmpeg_exe()
+        ffmpeg_dir = Path(ffmpeg_path).parent
+        ffprobe_path: Optional[Path] = None
+        for name in _FFPROBE_NAMES:
+            candidate = ffmpeg_dir / name
+            if candidate.exists():
+                ffprobe_path = candidate
+                break
+        # Sans ffprobe, les sondes passent par ffmpeg -i
+        return Toolchain(
+            ffmpeg=str(ffmpeg_path), ffprobe=str(ffprobe_path) if ffprobe_path else None
+        )
+    except Exception as exc:  # pragma: no cover - defensive
+        return Toolchain(ffmpeg="ffmpeg", ffprobe="ffprobe", resolve_error=str(exc))
+
+
+def _state_path() -> Path:
+    return default_cache_dir() / "toolchain.json"
+
+
+def _binary_key(path: str) -> Optional[list]:
+    try:
+        stat = Path(path).stat()
+    except OSError:
+        return None
+    return [path, stat.st_size, stat.st_mtime_ns]
+
+
+def _load_state() -> Optional[Toolchain]:
+    """Relit résolution et capacités persistées si les binaires n'ont pas changé."""
+    try:
+        state = json.loads(_state_path().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if state.get("env") != os.environ.get("IMAGEIO_FFMPEG_EXE", ""):
+        return None
+    ffmpeg_path = state.get("ffmpeg")
+    if not ffmpeg_path or _binary_key(ffmpeg_path) != state.get("ffmpeg_key"):
+        return None
+    ffprobe_path = state.get("ffprobe")
+    if ffprobe_path is not None and _binary_key(ffprobe_path) is None:
+        return None
+    caps = state.get("capabilities")
+    return Toolchain(
+        ffmpeg=ffmpeg_path,
+        ffprobe=ffprobe_path,
+        _capabilities=(
+            ToolchainCapabilities.from_dict(caps) if caps is not None else None
+        ),
+    )
+
+
+def _save_state(toolchain: Toolchain) -> None:
+    key = _binary_key(toolchain.ffmpeg)
+    if key is None or toolchain.resolve_error is not None:
+        return
+    state = {
+        "env": os.environ.get("IMAGEIO_FFMPEG_EXE", ""),
+        "ffmpeg": toolchain.ffmpeg,
+        "ffmpeg_key": key,
+        "ffprobe": toolchain.ffprobe,
+        "capabilities": (
+            None
+            if toolchain._capabilities is None
+            else toolchain._capabilities.to_dict()
+        ),
+    }
+    try:
+        path = _state_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+_toolchain: Optional[Toolchain] = None
+_toolchain_lock = threading.Lock()
+
+
+def get_toolchain() -> Toolchain:
+    """Toolchain du processus: mémoire, puis état persisté, puis résolution complète."""
+    global _toolchain
+    with _toolchain_lock:
+        if _toolchain is None:
+            toolchain = _load_state()
+            if toolchain is None:
+                toolchain = _resolve_binaries()
+                _save_state(toolchain)
+            _toolchain = toolchain
+        return _toolchain
+
+
+def reset_toolchain() -> None:
+    """Oublie la toolchain résolue (ex: nouveau --cache-dir ou nouveau binaire)."""
+    global _toolchain
+    with _toolchain_lock:
+        _toolchain = None